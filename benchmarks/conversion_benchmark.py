@@ -0,0 +1,96 @@
+"""
+Conversion Benchmark Module
+
+This script measures PDF conversion throughput on a corpus of synthetic resumes, comparing
+the in-thread load documents pipeline with the process-pool conversion engine at several
+worker counts. Each engine is warmed up before timing, so the one-off cost of starting the
+worker processes is not counted.
+
+Usage:
+    python -m benchmarks.conversion_benchmark --files 8 --pages 30 --workers 1 2 4
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake-benchmark")
+
+from benchmarks.corpus import make_resume_pdf
+
+def write_corpus(directory: Path, num_files: int, num_pages: int) -> List[str]:
+    """
+    Write a corpus of synthetic resume PDFs.
+
+    Args:
+        directory (Path): Directory where the files are written
+        num_files (int): Number of files to generate
+        num_pages (int): Number of pages per file
+
+    Returns:
+        List[str]: Paths of the generated files
+    """
+    paths = []
+    for seed in range(num_files):
+        path = directory / f"resume_{seed}.pdf"
+        path.write_bytes(make_resume_pdf(num_pages=num_pages, seed=seed))
+        paths.append(str(path))
+    return paths
+
+def run_benchmark(num_files: int, num_pages: int, worker_counts: List[int], pages_per_task: int) -> Dict[str, Any]:
+    """
+    Time the conversion of a synthetic corpus with the pipeline and with the engine.
+
+    Returns:
+        Dict[str, Any]: Seconds per configuration and speedups over the pipeline
+    """
+    from pipelines import create_load_documents_pipeline
+    from exec.conversion_engine import ConversionEngine
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_corpus(Path(directory), num_files, num_pages)
+
+        load_documents_pipeline = create_load_documents_pipeline()
+        started = time.perf_counter()
+        load_documents_pipeline.run({"file_type_router": {"sources": paths}})
+        baseline = time.perf_counter() - started
+        report: Dict[str, Any] = {
+            "files": num_files,
+            "pages_per_file": num_pages,
+            "cpu_count": os.cpu_count(),
+            "pipeline_s": round(baseline, 3),
+            "engine": []
+        }
+
+        for workers in worker_counts:
+            engine = ConversionEngine(workers=workers, pages_per_task=pages_per_task, timeout=600)
+            try:
+                engine.convert(paths[:1])
+                started = time.perf_counter()
+                engine.convert(paths)
+                elapsed = time.perf_counter() - started
+            finally:
+                engine.shutdown()
+            report["engine"].append({
+                "workers": workers,
+                "seconds": round(elapsed, 3),
+                "speedup": round(baseline / elapsed, 2)
+            })
+    return report
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark PDF conversion across worker processes")
+    parser.add_argument("--files", type=int, default=8, help="Number of PDF files in the corpus")
+    parser.add_argument("--pages", type=int, default=30, help="Pages per PDF file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to benchmark")
+    parser.add_argument("--pages-per-task", type=int, default=8, help="PDF pages extracted per task")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.files, args.pages, args.workers, args.pages_per_task), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Benchmark Corpus Module
+
+This module generates synthetic resume documents for the benchmark and load-test
+scripts, so they can run without any real candidate data. PDFs are written directly
+with a minimal PDF serializer (one text stream per page), which keeps the generator
+free of extra dependencies while producing files PyPDF can parse. DOCX files are written
+with python-docx, which the service already depends on.
+"""
+
+import io
+import random
+from datetime import datetime
+from typing import List, Tuple
+
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+TITLES = ["Software Engineer", "Senior Python Developer", "Data Scientist", "DevOps Engineer", "Tech Lead"]
+SKILLS = ["Python", "AWS", "Docker", "Kubernetes", "PostgreSQL", "FastAPI", "machine learning", "Terraform"]
+
+def _escape_pdf_text(text: str) -> str:
+    """Escape characters that have special meaning inside PDF string literals."""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def make_pdf(pages: List[str]) -> bytes:
+    """
+    Serialize a list of page texts into a minimal PDF file.
+
+    Args:
+        pages (List[str]): Text of each page; lines are separated by newlines
+
+    Returns:
+        bytes: The PDF file content
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages object, filled once the page object ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for text in pages:
+        lines = ["BT", "/F1 10 Tf", "12 TL", "50 750 Td"]
+        for line in text.splitlines():
+            lines.append(f"({_escape_pdf_text(line)}) Tj T*")
+        lines.append("ET")
+        stream = "\n".join(lines).encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+def make_resume_pages(num_pages: int, seed: int = 0) -> List[str]:
+    """
+    Generate the text of a synthetic resume.
+
+    Args:
+        num_pages (int): Number of pages to generate
+        seed (int): Seed for the random generator, so corpora are reproducible
+
+    Returns:
+        List[str]: Text of each page
+    """
+    rng = random.Random(seed)
+    header = [
+        f"Jane Candidate {seed}",
+        f"jane.candidate{seed}@example.com | +1 (555) 010-{seed % 10000:04d}",
+        f"linkedin.com/in/jane-candidate-{seed}",
+    ]
+    pages = []
+    for page_number in range(num_pages):
+        lines = list(header) if page_number == 0 else []
+        for _ in range(8):
+            start_year = rng.randint(2005, 2020)
+            lines.append(f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)} ({rng.randint(1, 12):02d}/{start_year} - {rng.randint(1, 12):02d}/{start_year + rng.randint(1, 4)})")
+            for _ in range(4):
+                lines.append(f"Built and operated services with {rng.choice(SKILLS)} and {rng.choice(SKILLS)} for {rng.randint(2, 40)} teams.")
+        pages.append("\n".join(lines))
+    return pages
+
+def make_resume_pdf(num_pages: int = 1, seed: int = 0) -> bytes:
+    """
+    Generate a synthetic resume as a PDF file.
+
+    Args:
+        num_pages (int): Number of pages to generate
+        seed (int): Seed for the random generator
+
+    Returns:
+        bytes: The PDF file content
+    """
+    return make_pdf(make_resume_pages(num_pages, seed))
+
+def make_docx(pages: List[str]) -> bytes:
+    """
+    Serialize a list of page texts into a DOCX file, one paragraph per line.
+
+    Args:
+        pages (List[str]): Text of each page; lines are separated by newlines
+
+    Returns:
+        bytes: The DOCX file content
+    """
+    from docx import Document as DocxDocument
+
+    document = DocxDocument()
+    # Fixed timestamps keep the files byte-for-byte reproducible
+    document.core_properties.created = document.core_properties.modified = datetime(2024, 1, 1)
+    for page_number, text in enumerate(pages):
+        if page_number > 0:
+            document.add_page_break()
+        for line in text.splitlines():
+            document.add_paragraph(line)
+    output = io.BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+def make_resume_docx(num_pages: int = 1, seed: int = 0) -> bytes:
+    """
+    Generate a synthetic resume as a DOCX file.
+
+    Args:
+        num_pages (int): Number of pages to generate
+        seed (int): Seed for the random generator
+
+    Returns:
+        bytes: The DOCX file content
+    """
+    return make_docx(make_resume_pages(num_pages, seed))
+
+# Pages of the resumes of a mixed corpus: mostly short resumes, some long ones
+CORPUS_PAGE_COUNTS = [1, 1, 2, 2, 3, 5, 10, 20]
+
+def make_corpus(num_files: int, seed: int = 0) -> List[Tuple[str, bytes]]:
+    """
+    Generate a reproducible corpus of PDF and DOCX resumes of varying size.
+
+    Args:
+        num_files (int): Number of files to generate
+        seed (int): Seed of the corpus; the same seed always produces the same files
+
+    Returns:
+        List[Tuple[str, bytes]]: Filename and content of each file
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(num_files):
+        num_pages = rng.choice(CORPUS_PAGE_COUNTS)
+        file_seed = seed * 100000 + index
+        # About one resume in four is a Word document
+        if rng.random() < 0.25:
+            corpus.append((f"resume_{index}.docx", make_resume_docx(num_pages, file_seed)))
+        else:
+            corpus.append((f"resume_{index}.pdf", make_resume_pdf(num_pages, file_seed)))
+    return corpus
@@ -0,0 +1,414 @@
+"""
+Fake OpenAI Module
+
+This module provides a local stand-in for the OpenAI chat completions API, so the service
+can be benchmarked end to end (HTTP client, connection pool, scheduler, parsing) without
+spending API quota. It answers POST /v1/chat/completions with valid JSON for the prompts
+of the service:
+
+- Candidate data extraction: a CandidateData object, with the name, contacts and
+  experiences found in the documents of the prompt
+- Requirement assessment: a RequirementAssessment for the requirement of the prompt
+- Batched assessment: one indexed assessment per requirement listed in the prompt
+
+Each reply takes a random latency (log-normal around a median) plus a delay proportional
+to its prompt and completion tokens, and a configurable share of the calls fail with a
+429 or a 500. Like OpenAI's prompt caching, the longest run of leading messages already
+seen in an earlier prompt of at least 1024 tokens is reported as cached tokens (in 128-token
+increments) and adds no prompt token delay. Randomness is seeded by the request body and its attempt number, so the
+same run produces the same latencies and failures.
+
+Streamed requests are answered with server-sent chunks, the completion token delay spread
+over them, and a final usage chunk when the request asks for it. A configurable share of the
+replies is malformed the way LLMs do it (prose and fences around the JSON, a trailing comma,
+Python literals, or a reply cut short), to exercise the local repair of the service.
+
+Usage:
+    python -m benchmarks.fake_openai --port 8900 --latency 0.5 --rate-limit-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 uvicorn main:app
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pipelines import estimate_tokens
+
+@dataclass
+class FakeOpenAIConfig:
+    """
+    Behaviour of the fake OpenAI API.
+
+    Attributes:
+        latency_median (float): Median of the base latency of a call, in seconds
+        latency_sigma (float): Sigma of the log-normal base latency (0 for a fixed latency)
+        seconds_per_prompt_token (float): Extra latency per prompt token
+        seconds_per_completion_token (float): Extra latency per completion token
+        rate_limit_rate (float): Share of the calls answered with a 429
+        error_rate (float): Share of the calls answered with a 500
+        malformed_rate (float): Share of the replies that are malformed JSON
+        retry_after (float): Retry-After of the 429 responses, in seconds
+        prompt_cache (bool): Whether to simulate prompt caching of repeated prefixes
+        seed (int): Seed of the random latencies and failures
+    """
+    latency_median: float = 0.5
+    latency_sigma: float = 0.3
+    seconds_per_prompt_token: float = 0.00002
+    seconds_per_completion_token: float = 0.005
+    rate_limit_rate: float = 0.0
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    retry_after: float = 0.5
+    prompt_cache: bool = True
+    seed: int = 0
+
+# Characters of the content of each streamed chunk
+STREAM_CHUNK_CHARS = 16
+
+# Prompt caching applies from this many prompt tokens, in increments of PROMPT_CACHE_INCREMENT
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_INCREMENT = 128
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+def _match(requirement: str, documents: str) -> float:
+    # Share of the longer words of the requirement that appear in the documents
+    words = [word for word in re.findall(r"[A-Za-z]+", requirement.lower()) if len(word) > 3]
+    return sum(word in documents for word in words) / len(words) if words else 0.0
+
+def _assessment(requirement: str, documents: str, with_confidence: bool = False) -> Dict[str, Any]:
+    # A requirement is met when one of its longer words appears in the documents
+    match = _match(requirement, documents)
+    present = match > 0
+    assessment = {
+        "requirement": requirement,
+        "present_in_documents": present,
+        "inquiry": None if present else f"Can you describe your experience with: {requirement}?"
+    }
+    if with_confidence:
+        assessment["confidence"] = round(match if present else 1 - match, 2)
+    return assessment
+
+def fake_reply(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the JSON reply of the service's prompts.
+
+    Args:
+        messages (List[Dict[str, Any]]): The messages of the chat completion request
+
+    Returns:
+        Dict[str, Any]: The object the model would have answered with
+    """
+    system = " ".join(_message_text(message) for message in messages if message.get("role") == "system")
+    prompt = "\n".join(_message_text(message) for message in messages if message.get("role") != "system")
+    # The documents follow this sentence in every assessment prompt, before or without the requirement
+    marker = "going to review to do your assessment are the following:"
+    documents = prompt.split(marker, 1)[-1].split("requirement you need to assess", 1)[0].lower()
+
+    if "extracts data" in system:
+        name = re.search(r"^\s*([A-Z][a-z]+) ([A-Z][a-z]+(?: \d+)?)\s*$", prompt, re.MULTILINE)
+        email = re.search(r"[\w.+-]+@[\w-]+\.[\w.]+", prompt)
+        phone = re.search(r"\+\d[\d ()-]{7,}\d", prompt)
+        linkedin = re.search(r"linkedin\.com/in/[\w-]+", prompt)
+        experiences = [
+            {
+                "company": company,
+                "title": title,
+                "start_date": start,
+                "end_date": end,
+                "description": f"{title} at {company}"
+            }
+            for title, company, start, end in re.findall(r"^\s*(.+?) - (.+?) \((\d\d/\d{4}) - (\d\d/\d{4})\)", prompt, re.MULTILINE)[:20]
+        ]
+        return {
+            "first_name": name.group(1) if name else None,
+            "last_name": name.group(2) if name else None,
+            "email": email.group(0) if email else None,
+            "phone": phone.group(0) if phone else None,
+            "linkedin": linkedin.group(0) if linkedin else None,
+            "experiences": experiences
+        }
+
+    indexed = re.findall(r"^\s*\[(\d+)\] (.+?)\s*$", prompt, re.MULTILINE)
+    if '"assessments"' in prompt and indexed:
+        return {"assessments": [{**_assessment(requirement, documents), "index": int(index)} for index, requirement in indexed]}
+
+    requirement = re.search(r"requirement you need to assess:\s*```\s*(.*?)\s*```", prompt, re.DOTALL)
+    return _assessment(requirement.group(1) if requirement else "requirement", documents, with_confidence='"confidence"' in prompt)
+
+def malform(content: str, rng: random.Random) -> str:
+    """
+    Break a JSON reply like an LLM sometimes does.
+
+    Args:
+        content (str): The valid JSON reply
+        rng (random.Random): The random source picking the kind of damage
+
+    Returns:
+        str: The reply wrapped in prose and a code fence, with a trailing comma, written
+            with Python literals, or cut short
+    """
+    kind = rng.randrange(4)
+    if kind == 0:
+        return f"Here is the JSON you asked for:\n```json\n{content}\n```\nLet me know if you need anything else."
+    if kind == 1:
+        return content[:-1] + ",}"
+    if kind == 2:
+        return repr(json.loads(content))
+    return content[:max(1, len(content) * 2 // 3)]
+
+class FakeOpenAIServer:
+    """
+    A threaded HTTP server answering like the OpenAI chat completions API.
+
+    Attributes:
+        config (FakeOpenAIConfig): Behaviour of the fake API
+        base_url (str): Base URL to give the OpenAI client, once started
+    """
+
+    def __init__(self, config: Optional[FakeOpenAIConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeOpenAIConfig()
+        self._attempts: Dict[str, int] = {}
+        self._prefixes: Set[str] = set()
+        self._stats = {"requests": 0, "ok": 0, "rate_limited": 0, "errors": 0, "malformed": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self.base_url = f"http://{host}:{self._server.server_address[1]}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the counters of the server.
+
+        Returns:
+            Dict[str, int]: Requests received, answered, rate limited and failed, replies
+                malformed, and tokens (prompt, cached prompt and completion)
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    def _random(self, body: bytes) -> random.Random:
+        # Seed by request and attempt, so a retried request may succeed
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            attempt = self._attempts.get(digest, 0)
+            self._attempts[digest] = attempt + 1
+        return random.Random(f"{self.config.seed}:{digest}:{attempt}")
+
+    def _cached_tokens(self, messages: List[Dict[str, Any]], message_tokens: List[int]) -> int:
+        # Find the longest run of leading messages seen before, then remember every prefix
+        digest = hashlib.sha256()
+        cached = 0
+        with self._lock:
+            for count, message in enumerate(messages[:-1], start=1):
+                digest.update(json.dumps(message, sort_keys=True).encode())
+                key = digest.hexdigest()
+                if key in self._prefixes:
+                    cached = sum(message_tokens[:count])
+                else:
+                    self._prefixes.add(key)
+        if cached < PROMPT_CACHE_MIN_TOKENS:
+            return 0
+        return cached - cached % PROMPT_CACHE_INCREMENT
+
+    def respond(self, body: bytes) -> Tuple[int, Dict[str, str], Dict[str, Any], float]:
+        """
+        Compute the response to a chat completion request.
+
+        Args:
+            body (bytes): The JSON body of the request
+
+        Returns:
+            Tuple: Status, extra headers, JSON payload and the seconds to wait before answering
+        """
+        config = self.config
+        rng = self._random(body)
+        request = json.loads(body)
+        self._count(requests=1)
+
+        base_latency = config.latency_median * rng.lognormvariate(0, config.latency_sigma) if config.latency_sigma > 0 else config.latency_median
+        outcome = rng.random()
+        if outcome < config.rate_limit_rate:
+            self._count(rate_limited=1)
+            # Rate limits are answered fast, like the real API
+            return 429, {"retry-after": str(config.retry_after)}, {
+                "error": {"message": "Rate limit reached (fake)", "type": "requests", "code": "rate_limit_exceeded"}
+            }, min(base_latency, 0.05)
+        if outcome < config.rate_limit_rate + config.error_rate:
+            self._count(errors=1)
+            return 500, {}, {"error": {"message": "Internal error (fake)", "type": "server_error"}}, base_latency
+
+        messages = request.get("messages", [])
+        content = json.dumps(fake_reply(messages))
+        if rng.random() < config.malformed_rate:
+            self._count(malformed=1)
+            content = malform(content, rng)
+        message_tokens = [estimate_tokens(_message_text(message)) for message in messages]
+        prompt_tokens = sum(message_tokens)
+        cached_tokens = self._cached_tokens(messages, message_tokens) if config.prompt_cache else 0
+        completion_tokens = estimate_tokens(content)
+        self._count(ok=1, prompt_tokens=prompt_tokens, cached_tokens=cached_tokens, completion_tokens=completion_tokens)
+        delay = (
+            base_latency
+            + (prompt_tokens - cached_tokens) * config.seconds_per_prompt_token
+            + completion_tokens * config.seconds_per_completion_token
+        )
+        return 200, {}, {
+            "id": f"chatcmpl-fake-{rng.getrandbits(32):08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content}
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens}
+            }
+        }, delay
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so the service's connection pool is exercised like with the real API
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {}, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                status, headers, payload, delay = server.respond(body)
+                if status == 200 and json.loads(body).get("stream"):
+                    completion_delay = payload["usage"]["completion_tokens"] * server.config.seconds_per_completion_token
+                    time.sleep(max(0.0, delay - completion_delay))
+                    try:
+                        self._send_stream(payload, json.loads(body), completion_delay)
+                    except (BrokenPipeError, ConnectionResetError):
+                        # The client stopped reading, like the service does once the JSON is complete
+                        self.close_connection = True
+                    return
+                time.sleep(delay)
+                try:
+                    self._send(status, headers, payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on the call, such as a hedged call that lost or a call past its deadline
+                    self.close_connection = True
+
+            def _send_stream(self, payload: Dict[str, Any], request: Dict[str, Any], completion_delay: float) -> None:
+                content = payload["choices"][0]["message"]["content"]
+                parts = [content[index:index + STREAM_CHUNK_CHARS] for index in range(0, len(content), STREAM_CHUNK_CHARS)]
+                base = {"id": payload["id"], "object": "chat.completion.chunk", "created": payload["created"], "model": payload["model"]}
+                events = [
+                    {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": part}, "finish_reason": None}]}
+                    for part in parts
+                ]
+                events.append({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                if (request.get("stream_options") or {}).get("include_usage"):
+                    events.append({**base, "choices": [], "usage": payload["usage"]})
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for event in events:
+                    if event["choices"] and event["choices"][0]["delta"].get("content"):
+                        time.sleep(completion_delay / max(1, len(parts)))
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+                self._write_chunk(b"data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send(self, status: int, headers: Dict[str, str], payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def main() -> None:
+    defaults = FakeOpenAIConfig()
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI chat completions API")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to listen on")
+    parser.add_argument("--port", type=int, default=8900, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=defaults.latency_median, help="Median base latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma, help="Sigma of the log-normal latency")
+    parser.add_argument("--prompt-token-delay", type=float, default=defaults.seconds_per_prompt_token, help="Seconds per prompt token")
+    parser.add_argument("--completion-token-delay", type=float, default=defaults.seconds_per_completion_token, help="Seconds per completion token")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate, help="Share of calls answered with a 429")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Share of calls answered with a 500")
+    parser.add_argument("--malformed-rate", type=float, default=defaults.malformed_rate, help="Share of replies that are malformed JSON")
+    parser.add_argument("--no-prompt-cache", action="store_true", help="Don't simulate prompt caching")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Seed of latencies and failures")
+    args = parser.parse_args()
+
+    config = FakeOpenAIConfig(
+        latency_median=args.latency,
+        latency_sigma=args.latency_sigma,
+        seconds_per_prompt_token=args.prompt_token_delay,
+        seconds_per_completion_token=args.completion_token_delay,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        prompt_cache=not args.no_prompt_cache,
+        seed=args.seed
+    )
+    server = FakeOpenAIServer(config, host=args.host, port=args.port)
+    print(f"Fake OpenAI API listening on {server.base_url} with {json.dumps(asdict(config))}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
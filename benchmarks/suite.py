@@ -0,0 +1,290 @@
+"""
+Benchmark Suite Module
+
+This script runs scripted scenarios against the service with the OpenAI API replaced by
+the local fake of benchmarks.fake_openai. Every LLM call goes over real HTTP through the
+service's connection pool, scheduler and parsers, so no API quota is spent.
+
+Scenarios:
+    - single: Sequential /process calls, one resume each
+    - concurrent: Many concurrent /process calls over a mixed PDF/DOCX corpus
+    - large_requirements: /process calls with a long list of job requirements
+    - assessment: exec_assessment on already loaded documents, without HTTP
+    - conversion: exec_load_documents over the whole corpus, without LLM calls
+
+Each scenario reports its throughput, p50/p95/p99 latency, the tokens sent to the fake
+API (and the prompt tokens it served from its simulated prompt cache) and the peak RSS of the process. The caches are disabled, so every run measures the
+full path. Results can be saved and compared with a previous run: scenarios whose latency
+grew or whose throughput dropped by more than the tolerance are reported as regressions,
+and the script exits with status 1.
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --scenarios assessment conversion --baseline results.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+# The caches would turn repeated calls into lookups; the suite measures the full path
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake-benchmark")
+os.environ.setdefault("DOCUMENT_CACHE_MAX_ENTRIES", "0")
+os.environ.setdefault("HAYSTACK_TELEMETRY_ENABLED", "False")
+
+import httpx
+
+from benchmarks.corpus import make_corpus
+from benchmarks.fake_openai import FakeOpenAIConfig, FakeOpenAIServer
+from benchmarks.load_test import percentile
+
+SCENARIOS = ["single", "concurrent", "large_requirements", "assessment", "conversion"]
+
+# Metrics compared with the baseline, and whether higher values are better
+COMPARED_METRICS = {"p50_s": False, "p95_s": False, "requests_per_second": True}
+
+REQUIREMENTS = [
+    "5+ years of Python development experience",
+    "Experience with AWS cloud services",
+    "Hands-on experience with Kubernetes",
+    "Strong background in machine learning",
+    "Experience designing PostgreSQL schemas",
+    "Familiarity with Terraform",
+    "Experience leading a team as Tech Lead",
+    "Experience with Rust systems programming",
+]
+
+def make_requirements(count: int) -> List[str]:
+    """Build a list of job requirements of the given length."""
+    return [f"{REQUIREMENTS[index % len(REQUIREMENTS)]} ({index})" for index in range(count)]
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+async def measure(
+    name: str,
+    server: FakeOpenAIServer,
+    operations: int,
+    concurrency: int,
+    operation: Callable[[int], Awaitable[Any]]
+) -> Dict[str, Any]:
+    """
+    Run operations with the given concurrency and report their latency and throughput.
+
+    Args:
+        name (str): Name of the scenario
+        server (FakeOpenAIServer): The fake API, whose counters give the tokens sent
+        operations (int): Number of operations to run
+        concurrency (int): Number of operations running at once
+        operation (Callable): Coroutine function running the operation of the given number
+
+    Returns:
+        Dict[str, Any]: The report of the scenario
+    """
+    before = server.stats()
+    latencies: List[float] = []
+    errors = 0
+    pending = list(range(operations))
+
+    async def worker():
+        nonlocal errors
+        while pending:
+            number = pending.pop(0)
+            started = time.perf_counter()
+            try:
+                await operation(number)
+            except Exception as e:
+                errors += 1
+                print(f"[{name}] operation {number} failed: {e}", file=sys.stderr)
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    after = server.stats()
+
+    return {
+        "operations": operations,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "p50_s": round(percentile(latencies, 50), 4),
+        "p95_s": round(percentile(latencies, 95), 4),
+        "p99_s": round(percentile(latencies, 99), 4),
+        "mean_s": round(statistics.mean(latencies), 4) if latencies else 0.0,
+        "llm_calls": after["requests"] - before["requests"],
+        "rate_limited": after["rate_limited"] - before["rate_limited"],
+        "malformed": after["malformed"] - before["malformed"],
+        "prompt_tokens": after["prompt_tokens"] - before["prompt_tokens"],
+        "cached_tokens": after["cached_tokens"] - before["cached_tokens"],
+        "completion_tokens": after["completion_tokens"] - before["completion_tokens"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+async def run_suite(scenarios: List[str], scale: float, corpus_size: int, seed: int, server: FakeOpenAIServer) -> Dict[str, Any]:
+    """
+    Run the given scenarios in order.
+
+    Args:
+        scenarios (List[str]): Names of the scenarios to run
+        scale (float): Multiplier of the number of operations of each scenario
+        corpus_size (int): Number of resumes in the corpus
+        seed (int): Seed of the corpus
+        server (FakeOpenAIServer): The running fake API
+
+    Returns:
+        Dict[str, Any]: The report of each scenario
+    """
+    from haystack.dataclasses import ByteStream
+    from main import app
+    from exec import exec_assessment, exec_load_documents, run_in_executor
+
+    corpus = make_corpus(corpus_size, seed=seed)
+    mime_types = {
+        "pdf": "application/pdf",
+        "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    }
+
+    def count(base: int) -> int:
+        return max(1, round(base * scale))
+
+    async def process(client: httpx.AsyncClient, number: int, requirements: List[str]) -> None:
+        filename, data = corpus[number % len(corpus)]
+        response = await client.post(
+            "/process",
+            data={"process_input": json.dumps({"job_requirements": requirements, "bypass_cache": True})},
+            files=[("files", (filename, data, mime_types[filename.rsplit(".", 1)[1]]))]
+        )
+        response.raise_for_status()
+
+    def load(files: List[Any]) -> List[Any]:
+        return exec_load_documents(
+            [ByteStream(data=data, mime_type=mime_types[filename.rsplit(".", 1)[1]]) for filename, data in files],
+            [{"file_path": filename} for filename, _ in files]
+        )
+
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for scenario in scenarios:
+            if scenario == "single":
+                requirements = make_requirements(5)
+                results[scenario] = await measure(scenario, server, count(10), 1, lambda n: process(client, n, requirements))
+            elif scenario == "concurrent":
+                requirements = make_requirements(5)
+                results[scenario] = await measure(scenario, server, count(64), 16, lambda n: process(client, n, requirements))
+            elif scenario == "large_requirements":
+                requirements = make_requirements(50)
+                results[scenario] = await measure(scenario, server, count(4), 1, lambda n: process(client, n, requirements))
+            elif scenario == "assessment":
+                documents = await run_in_executor(load, corpus[:1])
+                requirements = make_requirements(20)
+                results[scenario] = await measure(
+                    scenario, server, count(5), 1,
+                    lambda n: exec_assessment(documents, requirements, bypass_cache=True)
+                )
+            elif scenario == "conversion":
+                results[scenario] = await measure(scenario, server, count(5), 1, lambda n: run_in_executor(load, corpus))
+            else:
+                raise ValueError(f"Unknown scenario {scenario}")
+            print(f"[{scenario}] {json.dumps(results[scenario])}", file=sys.stderr)
+    return results
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare the scenarios of a run with a baseline run.
+
+    Args:
+        results (Dict[str, Any]): Scenario reports of the current run
+        baseline (Dict[str, Any]): Scenario reports of the baseline run
+        tolerance (float): Relative change allowed before a metric counts as a regression
+
+    Returns:
+        List[str]: A description of each regression
+    """
+    regressions = []
+    for scenario, report in results.items():
+        previous = baseline.get(scenario)
+        if not previous:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = previous.get(metric), report.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(f"{scenario}.{metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+def main() -> None:
+    defaults = FakeOpenAIConfig()
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite against a fake OpenAI API")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS, help="Scenarios to run, in order")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier of the operations of each scenario")
+    parser.add_argument("--corpus-size", type=int, default=16, help="Resumes in the generated corpus")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the corpus and of the fake API")
+    parser.add_argument("--latency", type=float, default=0.2, help="Median latency of the fake API, in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma, help="Sigma of the log-normal latency")
+    parser.add_argument("--completion-token-delay", type=float, default=0.001, help="Fake API seconds per completion token")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of fake API calls answered with a 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake API calls answered with a 500")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of fake API replies that are malformed JSON")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with the results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative change counted as a regression")
+    args = parser.parse_args()
+
+    config = FakeOpenAIConfig(
+        latency_median=args.latency,
+        latency_sigma=args.latency_sigma,
+        seconds_per_completion_token=args.completion_token_delay,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed
+    )
+    server = FakeOpenAIServer(config).start()
+    # Route every OpenAI client of the service to the fake API
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    try:
+        scenarios = asyncio.run(run_suite(args.scenarios, args.scale, args.corpus_size, args.seed, server))
+    finally:
+        server.stop()
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {**vars(args), "output": None, "baseline": None},
+        "scenarios": scenarios,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(scenarios, baseline.get("scenarios", {}), args.tolerance)
+        if regressions:
+            print("Performance regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+        print(f"No regression beyond {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
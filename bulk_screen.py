@@ -0,0 +1,519 @@
+"""
+Better ATS Service - Bulk Screening CLI
+
+This script screens a whole directory of candidates against one ProcessInput offline,
+through the OpenAI Batch API instead of the /process endpoint. It runs in four resumable
+stages, all checkpointed in a work directory:
+
+1. convert: The documents of every candidate are converted on the process pool of the
+   conversion engine (and through the document cache), and appended to documents.jsonl.
+2. prepare: The candidate extraction and assessment prompts of every candidate are rendered
+   with the service's own pipelines and written as Batch API JSONL shards. Prompts already
+   answered in the LLM cache are resolved right away and never sent.
+3. batch: Each shard is submitted to the Batch API (or to a local file-based stand-in) and
+   polled until it completes. The batch id of each shard is saved as soon as it is
+   submitted, so a resumed run polls it again instead of submitting it twice.
+4. join: The replies are parsed with the service's models and joined back into one
+   CandidateProcessOutput per candidate, appended to the output JSONL. The replies are
+   stored in the LLM cache, so the service answers the same prompts without a call.
+
+An interrupted run resumes where it stopped when started again with the same arguments.
+The run reports its throughput in candidates per minute.
+
+Candidates are the PDF/DOCX files at the top of the directory (the candidate id is the
+file name), and its subdirectories (the candidate id is the directory name, and every
+PDF/DOCX file in it is one of its documents).
+
+Usage:
+    python bulk_screen.py resumes/ --process-input job.json --output results.jsonl
+    python bulk_screen.py resumes/ --process-input job.json --output results.jsonl --backend local
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+from dotenv import load_dotenv
+from haystack import Document
+from haystack.dataclasses import ChatMessage
+from cache import cache_model, get_cached_model, llm_cache_key
+from exec import (
+    UploadedFile,
+    assessment_config,
+    assessment_inputs,
+    candidate_data_chunks,
+    candidate_data_inputs,
+    exec_load_uploaded_documents,
+    merge_candidate_data,
+    render_prompt,
+    shutdown_conversion_engine,
+    shutdown_runtime
+)
+from models import CandidateData, CandidateProcessOutput, ProcessOutput, RequirementAssessment
+from models.process_input import ProcessInput
+from pipelines import get_format_instructions, get_document_token_budget, pack_documents
+from pipelines.llm_to_model_component import LLMToModel
+
+# Load environment variables at module initialization
+load_dotenv()
+
+logger = logging.getLogger("bulk_screen")
+
+# File types converted by the service
+DOCUMENT_SUFFIXES = {".pdf", ".docx"}
+
+# Limits of a single Batch API input file
+MAX_REQUESTS_PER_BATCH = 50000
+MAX_BATCH_BYTES = 190 * 1024 * 1024
+
+# Batch statuses after which a batch won't change anymore
+FINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+def find_candidates(directory: Path) -> List[Tuple[str, List[Path]]]:
+    """
+    Find the candidates of a directory.
+
+    Args:
+        directory (Path): The directory of the candidates
+
+    Returns:
+        List[Tuple[str, List[Path]]]: The id and document files of each candidate, sorted by id
+    """
+    candidates = []
+    for entry in sorted(directory.iterdir()):
+        if entry.is_file() and entry.suffix.lower() in DOCUMENT_SUFFIXES:
+            candidates.append((entry.name, [entry]))
+        elif entry.is_dir():
+            files = sorted(path for path in entry.iterdir() if path.is_file() and path.suffix.lower() in DOCUMENT_SUFFIXES)
+            if files:
+                candidates.append((entry.name, files))
+    return candidates
+
+def _hash_path(path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(1024 * 1024):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def _write_json(path: Path, data: Any) -> None:
+    # Write then rename, so an interruption never leaves a truncated checkpoint
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(data, indent=2))
+    os.replace(tmp_path, path)
+
+def _read_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    if not path.exists():
+        return
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # The last line of an interrupted append
+                logger.warning("Skipping a truncated line of %s", path)
+
+def _custom_id(candidate_id: str, kind: str, index: int) -> str:
+    return f"{candidate_id}|{kind}|{index}"
+
+def _parse_custom_id(custom_id: str) -> Tuple[str, str, int]:
+    candidate_id, kind, index = custom_id.rsplit("|", 2)
+    return candidate_id, kind, int(index)
+
+class OpenAIBatchBackend:
+    """Submits batch files to the OpenAI Batch API."""
+
+    def __init__(self, completion_window: str = "24h"):
+        from openai import OpenAI
+        self.client = OpenAI(base_url=os.getenv("OPENAI_BASE_URL") or None)
+        self.completion_window = completion_window
+
+    def submit(self, path: Path) -> str:
+        """Upload a batch input file and create its batch, returning the batch id."""
+        with open(path, "rb") as file:
+            input_file = self.client.files.create(file=file, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        """Get the status of a batch."""
+        return self.client.batches.retrieve(batch_id).status
+
+    def download(self, batch_id: str, path: Path) -> None:
+        """Write the output (and error) lines of a finished batch to a file."""
+        batch = self.client.batches.retrieve(batch_id)
+        with open(path, "wb") as file:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    file.write(self.client.files.content(file_id).read())
+
+class LocalBatchBackend:
+    """
+    A file-based stand-in for the Batch API, answering every request with the fake replies
+    of the benchmark suite. Batches complete as soon as they are submitted.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def submit(self, path: Path) -> str:
+        """Answer every request of a batch input file, returning the batch id."""
+        from benchmarks.fake_openai import fake_reply
+
+        batch_id = f"local-{uuid.uuid4().hex}"
+        tmp_path = self.directory / f"{batch_id}.jsonl.tmp"
+        with open(path) as requests, open(tmp_path, "w") as output:
+            for line in requests:
+                request = json.loads(line)
+                content = json.dumps(fake_reply(request["body"]["messages"]))
+                output.write(json.dumps({
+                    "id": f"batch_req_{uuid.uuid4().hex}",
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "model": request["body"]["model"],
+                            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}]
+                        }
+                    },
+                    "error": None
+                }) + "\n")
+        os.replace(tmp_path, self.directory / f"{batch_id}.jsonl")
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        """Get the status of a batch."""
+        return "completed" if (self.directory / f"{batch_id}.jsonl").exists() else "failed"
+
+    def download(self, batch_id: str, path: Path) -> None:
+        """Copy the output lines of a finished batch to a file."""
+        shutil.copyfile(self.directory / f"{batch_id}.jsonl", path)
+
+class BulkScreening:
+    """
+    A resumable bulk screening run.
+
+    Attributes:
+        candidates (List[Tuple[str, List[Path]]]): The id and document files of each candidate
+        process_input (ProcessInput): The job requirements
+        work_dir (Path): The checkpoint directory of the run
+        output (Path): The CandidateProcessOutput JSONL file
+    """
+
+    def __init__(self, candidates: List[Tuple[str, List[Path]]], process_input: ProcessInput, work_dir: Path, output: Path,
+                 backend: Any, workers: int, max_requests: int, max_bytes: int, poll_interval: float):
+        self.candidates = candidates
+        self.process_input = process_input
+        self.work_dir = work_dir
+        self.output = output
+        self.backend = backend
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self.documents_path = work_dir / "documents.jsonl"
+        self.cached_path = work_dir / "cached.jsonl"
+        self.keys_path = work_dir / "keys.jsonl"
+        self.state_path = work_dir / "state.json"
+        self.state: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+
+    def fingerprint(self) -> str:
+        """Identify the inputs of the run, so a work directory isn't resumed with other inputs."""
+        return hashlib.sha256(json.dumps([
+            self.process_input.job_requirements,
+            [(candidate_id, [str(path) for path in paths]) for candidate_id, paths in self.candidates],
+            [os.getenv("CANDIDATE_DATA_MODEL"), os.getenv("CANDIDATE_EXTRACTION_MODE"), *assessment_config()],
+            [get_document_token_budget(os.getenv(name, "gpt-4")) for name in ("CANDIDATE_DATA_MODEL", "ASSESSMENT_MODEL")]
+        ]).encode()).hexdigest()
+
+    def load_state(self) -> None:
+        """Load the checkpoint of the run, or start a new one."""
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        fingerprint = self.fingerprint()
+        if self.state_path.exists():
+            self.state = json.loads(self.state_path.read_text())
+            if self.state.get("fingerprint") != fingerprint:
+                raise SystemExit(f"{self.work_dir} holds a run with other inputs; remove it or choose another --work-dir")
+            logger.info("Resuming the run in %s", self.work_dir)
+        else:
+            self.state = {"fingerprint": fingerprint, "prepared": False, "shards": []}
+            _write_json(self.state_path, self.state)
+
+    def save_state(self) -> None:
+        _write_json(self.state_path, self.state)
+
+    def convert(self) -> None:
+        """Convert the documents of the candidates not converted yet."""
+        converted = {item["candidate_id"] for item in _read_jsonl(self.documents_path)}
+        pending = [(candidate_id, paths) for candidate_id, paths in self.candidates if candidate_id not in converted]
+        if not pending:
+            return
+        logger.info("Converting the documents of %s candidates (%s already done)", len(pending), len(converted))
+
+        def load(candidate: Tuple[str, List[Path]]) -> Tuple[str, List[Document]]:
+            candidate_id, paths = candidate
+            uploads = [UploadedFile(filename=path.name, sha256=_hash_path(path), size=path.stat().st_size, path=str(path)) for path in paths]
+            return candidate_id, exec_load_uploaded_documents(uploads)
+
+        started = time.perf_counter()
+        # Threads keep the process pool of the conversion engine busy with several candidates
+        with ThreadPoolExecutor(max_workers=self.workers * 2) as executor, open(self.documents_path, "a") as file:
+            for done, (candidate_id, documents) in enumerate(executor.map(load, pending), start=1):
+                file.write(json.dumps({
+                    "candidate_id": candidate_id,
+                    "documents": [{"content": document.content, "meta": document.meta} for document in documents]
+                }, default=str) + "\n")
+                if done % 100 == 0:
+                    file.flush()
+                    rate = done / (time.perf_counter() - started) * 60
+                    logger.info("Converted %s/%s candidates (%.0f candidates/min)", done, len(pending), rate)
+
+    def _candidate_documents(self) -> Iterator[Tuple[str, List[Document]]]:
+        for item in _read_jsonl(self.documents_path):
+            yield item["candidate_id"], [Document(content=document["content"], meta=document["meta"]) for document in item["documents"]]
+
+    def _requests(self, candidate_id: str, documents: List[Document]) -> Iterator[Tuple[str, str, List[ChatMessage], type]]:
+        for index, chunk in enumerate(candidate_data_chunks(documents)):
+            yield (_custom_id(candidate_id, "candidate_data", index), *render_prompt("candidate_data", "candidate_prompt", candidate_data_inputs(chunk)))
+        format_instructions = get_format_instructions(RequirementAssessment)
+        documents = pack_documents(documents, get_document_token_budget(os.getenv("ASSESSMENT_MODEL", "gpt-4")))
+        prefix = None
+        for index, requirement in enumerate(self.process_input.job_requirements):
+            inputs = assessment_inputs(documents, requirement, format_instructions, prefix)
+            prefix = inputs.get("prefix")
+            yield (_custom_id(candidate_id, "assessment", index), *render_prompt("assessment", "assessment_prompt", inputs))
+
+    def prepare(self) -> None:
+        """Render every prompt into Batch API shards, resolving the ones in the LLM cache."""
+        if self.state["prepared"]:
+            return
+        logger.info("Rendering the prompts of every candidate")
+        shards_dir = self.work_dir / "shards"
+        shards_dir.mkdir(exist_ok=True)
+        shards: List[Dict[str, Any]] = []
+        shard_file = None
+        cached = 0
+
+        def open_shard():
+            path = shards_dir / f"shard-{len(shards):05d}.jsonl"
+            shards.append({"path": str(path), "requests": 0, "bytes": 0, "batch_id": None, "status": "pending", "output": None})
+            return open(path, "w")
+
+        with open(self.cached_path, "w") as cached_file, open(self.keys_path, "w") as keys_file:
+            for candidate_id, documents in self._candidate_documents():
+                if not documents:
+                    continue
+                for custom_id, model_name, messages, model_class in self._requests(candidate_id, documents):
+                    key = llm_cache_key(model_name, messages)
+                    model = None if self.process_input.bypass_cache else get_cached_model(key, model_class)
+                    if model is not None:
+                        cached_file.write(json.dumps({"custom_id": custom_id, "model": model.model_dump()}) + "\n")
+                        cached += 1
+                        continue
+                    # The Batch API rejects unknown fields, so the cache keys are kept aside
+                    keys_file.write(json.dumps({"custom_id": custom_id, "key": key}) + "\n")
+                    line = json.dumps({
+                        "custom_id": custom_id,
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": {
+                            "model": model_name,
+                            "messages": [{"role": message.role.value, "content": message.content} for message in messages]
+                        }
+                    }) + "\n"
+                    size = len(line.encode())
+                    if shard_file is None or shards[-1]["requests"] >= self.max_requests or shards[-1]["bytes"] + size > self.max_bytes:
+                        if shard_file is not None:
+                            shard_file.close()
+                        shard_file = open_shard()
+                    shard_file.write(line)
+                    shards[-1]["requests"] += 1
+                    shards[-1]["bytes"] += size
+        if shard_file is not None:
+            shard_file.close()
+
+        self.state["shards"] = shards
+        self.state["prepared"] = True
+        self.save_state()
+        logger.info("Wrote %s requests in %s shards, %s answered from the LLM cache", sum(shard["requests"] for shard in shards), len(shards), cached)
+
+    def run_batches(self) -> None:
+        """Submit the shards not submitted yet and wait for every batch to finish."""
+        outputs_dir = self.work_dir / "outputs"
+        outputs_dir.mkdir(exist_ok=True)
+        for shard in self.state["shards"]:
+            if shard["batch_id"] is None:
+                shard["batch_id"] = self.backend.submit(Path(shard["path"]))
+                shard["status"] = "submitted"
+                self.save_state()
+                logger.info("Submitted %s as batch %s", Path(shard["path"]).name, shard["batch_id"])
+
+        while True:
+            waiting = [shard for shard in self.state["shards"] if shard["status"] not in FINAL_BATCH_STATUSES]
+            for shard in waiting:
+                status = self.backend.status(shard["batch_id"])
+                if status in FINAL_BATCH_STATUSES:
+                    output = outputs_dir / Path(shard["path"]).name
+                    self.backend.download(shard["batch_id"], output)
+                    shard["output"] = str(output)
+                    shard["status"] = status
+                    self.save_state()
+                    logger.info("Batch %s is %s", shard["batch_id"], status)
+            if not any(shard["status"] not in FINAL_BATCH_STATUSES for shard in self.state["shards"]):
+                return
+            time.sleep(self.poll_interval)
+
+    def _results(self) -> Dict[str, Dict[str, Any]]:
+        # Replies by candidate and custom id: a parsed model, or the error of the request
+        parsers = {"candidate_data": LLMToModel(model_class=CandidateData), "assessment": LLMToModel(model_class=RequirementAssessment)}
+        results: Dict[str, Dict[str, Any]] = {}
+        keys = {item["custom_id"]: item["key"] for item in _read_jsonl(self.keys_path)}
+        for item in _read_jsonl(self.cached_path):
+            candidate_id, kind, _ = _parse_custom_id(item["custom_id"])
+            results.setdefault(candidate_id, {})[item["custom_id"]] = parsers[kind].model_class(**item["model"])
+        for shard in self.state["shards"]:
+            for item in _read_jsonl(Path(shard["output"])) if shard["output"] else []:
+                candidate_id, kind, _ = _parse_custom_id(item["custom_id"])
+                response = item.get("response") or {}
+                try:
+                    if item.get("error") or response.get("status_code") != 200:
+                        raise ValueError((item.get("error") or {}).get("message") or f"status {response.get('status_code')}")
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    result = parsers[kind].run(replies=[ChatMessage.from_assistant(content)])["model"]
+                    # The service then answers the same prompts from the LLM cache
+                    if item["custom_id"] in keys:
+                        cache_model(keys[item["custom_id"]], result)
+                except Exception as e:
+                    result = e
+                results.setdefault(candidate_id, {})[item["custom_id"]] = result
+        return results
+
+    def join(self) -> int:
+        """
+        Write the output of every candidate not written yet.
+
+        Returns:
+            int: The number of candidates written by this run
+        """
+        written = {item["candidate_id"] for item in _read_jsonl(self.output)}
+        results = self._results()
+        requirements = self.process_input.job_requirements
+        count = 0
+        with open(self.output, "a") as file:
+            for candidate_id, documents in self._candidate_documents():
+                if candidate_id in written:
+                    continue
+                replies = results.get(candidate_id, {})
+                try:
+                    if not documents:
+                        raise ValueError("No document could be converted")
+                    chunks = len(candidate_data_chunks(documents))
+                    parts = [replies.get(_custom_id(candidate_id, "candidate_data", index)) for index in range(chunks)]
+                    assessments = [replies.get(_custom_id(candidate_id, "assessment", index)) for index in range(len(requirements))]
+                    for reply in parts + assessments:
+                        if reply is None:
+                            raise ValueError("A request of the candidate has no reply")
+                        if isinstance(reply, Exception):
+                            raise reply
+                    candidate_data = parts[0] if len(parts) == 1 else merge_candidate_data(parts)
+                    output = CandidateProcessOutput(
+                        candidate_id=candidate_id,
+                        result=ProcessOutput(candidate_data=candidate_data, requirements_assessment=assessments)
+                    )
+                except Exception as e:
+                    output = CandidateProcessOutput(candidate_id=candidate_id, error=str(e))
+                file.write(output.model_dump_json() + "\n")
+                count += 1
+        return count
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run (or resume) every stage of the screening.
+
+        Returns:
+            Dict[str, Any]: The throughput report of the run
+        """
+        started = time.perf_counter()
+        self.load_state()
+        for name, step in (("convert", self.convert), ("prepare", self.prepare), ("batch", self.run_batches), ("join", self.join)):
+            stage_started = time.perf_counter()
+            result = step()
+            self.timings[name] = round(time.perf_counter() - stage_started, 2)
+        elapsed = time.perf_counter() - started
+        return {
+            "candidates": len(self.candidates),
+            "written": result,
+            "elapsed_s": round(elapsed, 2),
+            "candidates_per_minute": round(result / elapsed * 60, 1) if elapsed > 0 else 0.0,
+            "stages_s": self.timings
+        }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Screen a directory of candidates offline through the OpenAI Batch API")
+    parser.add_argument("directory", type=Path, help="Directory of PDF/DOCX files, or of one subdirectory per candidate")
+    parser.add_argument("--process-input", required=True, help="ProcessInput JSON, or the path of a file holding it")
+    parser.add_argument("--output", type=Path, default=Path("bulk_results.jsonl"), help="CandidateProcessOutput JSONL file")
+    parser.add_argument("--work-dir", type=Path, help="Checkpoint directory (defaults to the output path with a .work suffix)")
+    parser.add_argument("--backend", choices=["openai", "local"], default="openai", help="Batch API, or the local stand-in")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Conversion worker processes")
+    parser.add_argument("--max-requests-per-batch", type=int, default=MAX_REQUESTS_PER_BATCH)
+    parser.add_argument("--max-batch-bytes", type=int, default=MAX_BATCH_BYTES)
+    parser.add_argument("--poll-interval", type=float, default=30, help="Seconds between batch status checks")
+    parser.add_argument("--completion-window", default="24h", help="Completion window of the batches")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s: %(message)s")
+    logging.getLogger("pypdf").setLevel(logging.ERROR)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    process_input_path = Path(args.process_input)
+    raw_input = process_input_path.read_text() if process_input_path.is_file() else args.process_input
+    process_input = ProcessInput(**json.loads(raw_input))
+
+    # Conversion runs on the process pool of the conversion engine
+    os.environ["CONVERSION_WORKERS"] = str(max(1, args.workers))
+    work_dir = args.work_dir or args.output.with_name(args.output.name + ".work")
+    backend = LocalBatchBackend(work_dir / "local_batches") if args.backend == "local" else OpenAIBatchBackend(args.completion_window)
+
+    screening = BulkScreening(
+        find_candidates(args.directory),
+        process_input,
+        work_dir,
+        args.output,
+        backend,
+        workers=max(1, args.workers),
+        max_requests=args.max_requests_per_batch,
+        max_bytes=args.max_batch_bytes,
+        poll_interval=args.poll_interval
+    )
+    try:
+        report = screening.run()
+    finally:
+        shutdown_conversion_engine()
+        shutdown_runtime(wait=False)
+    logger.info(
+        "Screened %s candidates in %.1fs (%.1f candidates/min)",
+        report["written"], report["elapsed_s"], report["candidates_per_minute"]
+    )
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from .tiered_cache import TieredCache
+from .document_cache import document_cache, hash_file, get_cached_documents, cache_documents
+from .llm_cache import llm_cache, llm_cache_key, get_cached_model, cache_model
+from .session_cache import session_cache, CandidateSession, normalize_requirement, get_session, save_session, delete_session
+
+__all__ = [
+    "TieredCache",
+    "document_cache", "hash_file", "get_cached_documents", "cache_documents",
+    "llm_cache", "llm_cache_key", "get_cached_model", "cache_model",
+    "session_cache", "CandidateSession", "normalize_requirement", "get_session", "save_session", "delete_session"
+]
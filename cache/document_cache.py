@@ -0,0 +1,88 @@
+"""
+Document Cache Module
+
+This module provides a content-addressed cache of converted documents. Uploaded files
+are keyed by the SHA-256 of their bytes, so a resume uploaded again (for example when it
+is re-screened against another job posting) skips PDF/DOCX conversion entirely.
+
+Only what derives from the bytes of a file is cached. The meta of an upload (its filename)
+belongs to whoever uploaded it, so it is left out of the cache and given back by the
+caller on a hit.
+
+The cache is configured with the following environment variables:
+    - DOCUMENT_CACHE_MAX_ENTRIES: Maximum number of files kept in memory
+    - DOCUMENT_CACHE_MAX_BYTES: Maximum size of the cached text, per tier
+    - DOCUMENT_CACHE_TTL: Seconds a converted file stays cached (0 disables expiry)
+    - DOCUMENT_CACHE_PATH: SQLite file for the on-disk tier (empty disables it)
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from haystack import Document
+from .tiered_cache import TieredCache
+
+# Load environment variables at module initialization
+load_dotenv()
+
+# Meta of the upload rather than of its content, not cached
+UPLOAD_META_KEYS = ("file_path",)
+
+document_cache = TieredCache(
+    name="documents",
+    max_entries=int(os.getenv("DOCUMENT_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    ttl=float(os.getenv("DOCUMENT_CACHE_TTL", "86400")),
+    path=os.getenv("DOCUMENT_CACHE_PATH") or None
+)
+
+def hash_file(content: bytes) -> str:
+    """
+    Compute the content address of an uploaded file.
+
+    Args:
+        content (bytes): The raw bytes of the file
+
+    Returns:
+        str: The hex SHA-256 digest of the content
+    """
+    return hashlib.sha256(content).hexdigest()
+
+def _json_default(value: Any) -> Any:
+    """Serialize converter metadata that is not JSON-native (dataclasses, datetimes)"""
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    return str(value)
+
+def get_cached_documents(file_hash: str, meta: Optional[Dict[str, Any]] = None) -> Optional[List[Document]]:
+    """
+    Get the documents converted from a file, if they are cached.
+
+    Args:
+        file_hash (str): The SHA-256 of the file bytes
+        meta (Optional[Dict[str, Any]]): The meta of the current upload, such as its file_path
+
+    Returns:
+        Optional[List[Document]]: Fresh Document objects with the cached content and meta,
+            and the meta of the current upload, or None if the file is not cached
+    """
+    value = document_cache.get(file_hash)
+    if value is None:
+        return None
+    return [Document(content=item["content"], meta={**item["meta"], **(meta or {})}) for item in json.loads(value)]
+
+def cache_documents(file_hash: str, documents: List[Document]) -> None:
+    """
+    Store the documents converted from a file, without the meta of its upload.
+
+    Args:
+        file_hash (str): The SHA-256 of the file bytes
+        documents (List[Document]): The documents produced by converting the file
+    """
+    document_cache.put(file_hash, json.dumps([
+        {"content": document.content, "meta": {key: value for key, value in document.meta.items() if key not in UPLOAD_META_KEYS}}
+        for document in documents
+    ], default=_json_default))
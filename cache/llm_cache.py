@@ -0,0 +1,77 @@
+"""
+LLM Cache Module
+
+This module provides a cache of parsed LLM responses. Entries are keyed by the model
+name plus a hash of the fully rendered prompt messages (which include the format
+instructions), and hold the validated Pydantic model, so a hit skips both the OpenAI
+call and the parsing of its reply.
+
+The cache is configured with the following environment variables:
+    - LLM_CACHE_MAX_ENTRIES: Maximum number of responses kept in memory
+    - LLM_CACHE_MAX_BYTES: Maximum size of the cached responses, per tier
+    - LLM_CACHE_TTL: Seconds a response stays cached (0 disables expiry)
+    - LLM_CACHE_PATH: SQLite file for the persistent tier (empty disables it)
+"""
+
+import hashlib
+import json
+import os
+from typing import List, Optional, Type
+from dotenv import load_dotenv
+from haystack.dataclasses import ChatMessage
+from pydantic import BaseModel
+from .tiered_cache import TieredCache
+
+# Load environment variables at module initialization
+load_dotenv()
+
+llm_cache = TieredCache(
+    name="llm",
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("LLM_CACHE_TTL", "604800")),
+    path=os.getenv("LLM_CACHE_PATH") or None
+)
+
+def llm_cache_key(model: str, messages: List[ChatMessage]) -> str:
+    """
+    Compute the cache key of an LLM call.
+
+    Args:
+        model (str): The name of the model the messages are sent to
+        messages (List[ChatMessage]): The rendered prompt messages
+
+    Returns:
+        str: The hex SHA-256 digest of the model name and messages
+    """
+    payload = json.dumps(
+        [model, [[message.role.value, message.content] for message in messages]],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_cached_model(key: str, model_class: Type[BaseModel]) -> Optional[BaseModel]:
+    """
+    Get a cached LLM response, parsed into its model.
+
+    Args:
+        key (str): The cache key of the LLM call
+        model_class (Type[BaseModel]): The Pydantic model the response was parsed into
+
+    Returns:
+        Optional[BaseModel]: The cached model, or None on a miss
+    """
+    value = llm_cache.get(key)
+    if value is None:
+        return None
+    return model_class.model_validate_json(value)
+
+def cache_model(key: str, model: BaseModel) -> None:
+    """
+    Store a parsed LLM response.
+
+    Args:
+        key (str): The cache key of the LLM call
+        model (BaseModel): The model parsed from the response
+    """
+    llm_cache.put(key, model.model_dump_json())
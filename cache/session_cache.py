@@ -0,0 +1,119 @@
+"""
+Candidate Session Cache Module
+
+This module stores candidate sessions: the loaded documents and extracted candidate data of
+a candidate, with the assessments of the requirements it was last assessed against. When a
+job posting changes, the candidate is assessed again from its session, without uploading or
+converting its files nor extracting its data again, and only the added or changed
+requirements reach the LLM.
+
+Sessions live in a TieredCache, so they expire by TTL (counted from their last update) and
+are evicted, least recently used first, once they exceed the memory budget.
+
+The cache is configured with the following environment variables:
+    - SESSION_MAX_ENTRIES: Maximum number of sessions kept in memory
+    - SESSION_MAX_BYTES: Memory budget of the sessions, per tier
+    - SESSION_TTL: Seconds a session stays available after its last update (0 disables expiry)
+    - SESSION_CACHE_PATH: SQLite file for the on-disk tier, shared by every worker (empty disables it)
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from haystack import Document
+from .document_cache import _json_default
+from .tiered_cache import TieredCache
+
+# Load environment variables at module initialization
+load_dotenv()
+
+session_cache = TieredCache(
+    name="sessions",
+    max_entries=int(os.getenv("SESSION_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("SESSION_TTL", "3600")),
+    path=os.getenv("SESSION_CACHE_PATH") or None
+)
+
+@dataclass
+class CandidateSession:
+    """
+    The documents and results of a candidate, reused when it is assessed again.
+
+    Attributes:
+        id (str): The candidate id
+        documents (List[Document]): The documents loaded from the candidate's files
+        candidate_data (Dict[str, Any]): The extracted CandidateData, as a dict
+        assessments (Dict[str, Dict[str, Any]]): The RequirementAssessment of each requirement
+            of the last assessment, as dicts keyed by normalized requirement
+        assessment_config (List[Optional[str]]): The assessment configuration the assessments
+            were made with; they are discarded when it changes
+        created_at (float): The time the session was created, as a UNIX timestamp
+    """
+    id: str
+    documents: List[Document]
+    candidate_data: Dict[str, Any]
+    assessments: Dict[str, Dict[str, Any]]
+    assessment_config: List[Optional[str]]
+    created_at: float
+
+def normalize_requirement(requirement: str) -> str:
+    """
+    Normalize a requirement for comparisons, so rewrapped or re-spaced requirements match.
+
+    Args:
+        requirement (str): The job requirement
+
+    Returns:
+        str: The requirement with its whitespace collapsed
+    """
+    return " ".join(requirement.split())
+
+def get_session(candidate_id: str) -> Optional[CandidateSession]:
+    """
+    Get a candidate session, if it exists and has not expired.
+
+    Args:
+        candidate_id (str): The candidate id
+
+    Returns:
+        Optional[CandidateSession]: The session, or None if it doesn't exist or was evicted
+    """
+    value = session_cache.get(candidate_id)
+    if value is None:
+        return None
+    item = json.loads(value)
+    return CandidateSession(
+        id=candidate_id,
+        documents=[Document(content=document["content"], meta=document["meta"]) for document in item["documents"]],
+        candidate_data=item["candidate_data"],
+        assessments=item["assessments"],
+        assessment_config=item["assessment_config"],
+        created_at=item["created_at"]
+    )
+
+def save_session(session: CandidateSession) -> None:
+    """
+    Store a candidate session, restarting its TTL.
+
+    Args:
+        session (CandidateSession): The session
+    """
+    session_cache.put(session.id, json.dumps({
+        "documents": [{"content": document.content, "meta": document.meta} for document in session.documents],
+        "candidate_data": session.candidate_data,
+        "assessments": session.assessments,
+        "assessment_config": session.assessment_config,
+        "created_at": session.created_at
+    }, default=_json_default))
+
+def delete_session(candidate_id: str) -> None:
+    """
+    Remove a candidate session.
+
+    Args:
+        candidate_id (str): The candidate id
+    """
+    session_cache.invalidate(candidate_id)
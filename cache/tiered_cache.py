@@ -0,0 +1,198 @@
+"""
+Tiered Cache Module
+
+This module provides a small two-tier cache for serialized values: an in-memory LRU
+tier and an optional SQLite-backed disk tier. Both tiers evict entries by age (TTL)
+and by total size, and the cache keeps hit/miss counters so callers can expose them.
+
+Values are stored as strings (typically JSON), which keeps the disk tier compact and
+lets each caller decide how to serialize its own objects.
+
+The SQLite file is opened on first use rather than at import, and opened again in a process
+forked after that, so the workers of a preloaded server never share a connection.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+class TieredCache:
+    """
+    A thread-safe string cache with an in-memory LRU tier and an optional SQLite tier.
+
+    Attributes:
+        name (str): Name of the cache, used when reporting statistics
+        max_entries (int): Maximum number of entries in the memory tier
+        max_bytes (int): Maximum total size of the values in each tier
+        ttl (float): Seconds after which an entry expires; 0 disables expiry
+        path (Optional[str]): Path to the SQLite file of the disk tier; None disables it
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 0,
+        path: Optional[str] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            name: Name of the cache, used when reporting statistics
+            max_entries: Maximum number of entries in the memory tier
+            max_bytes: Maximum total size, in bytes, of the values in each tier
+            ttl: Seconds after which an entry expires; 0 disables expiry
+            path: Path to the SQLite file of the disk tier; None disables the disk tier
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.path = path
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid: Optional[int] = None
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        # Called with the lock held; a forked process opens its own connection
+        if not self.path:
+            return None
+        if self._db is None or self._db_pid != os.getpid():
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db_pid = os.getpid()
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a value, promoting disk hits into the memory tier.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Optional[str]: The cached value, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                self._remove_from_memory(key)
+
+            db = self._connect()
+            if db is not None:
+                row = db.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if not self._expired(created_at, now):
+                        db.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        db.commit()
+                        self._put_in_memory(key, value, created_at)
+                        self._stats["disk_hits"] += 1
+                        return value
+                    db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    db.commit()
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        """
+        Store a value in every enabled tier, evicting old entries as needed.
+
+        Args:
+            key: The cache key
+            value: The serialized value to store
+        """
+        now = time.time()
+        with self._lock:
+            self._put_in_memory(key, value, now)
+            db = self._connect()
+            if db is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value), now, now)
+                )
+                self._evict_disk(now)
+                db.commit()
+
+    def invalidate(self, key: str) -> None:
+        """
+        Remove a key from every tier.
+
+        Args:
+            key: The cache key
+        """
+        with self._lock:
+            self._remove_from_memory(key)
+            db = self._connect()
+            if db is not None:
+                db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters and current size.
+
+        Returns:
+            Dict[str, int]: Hit, miss and eviction counters plus the size of the memory tier
+        """
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            return {
+                **self._stats,
+                "hits": hits,
+                "entries": len(self._memory),
+                "bytes": self._memory_bytes,
+            }
+
+    def _put_in_memory(self, key: str, value: str, created_at: float) -> None:
+        self._remove_from_memory(key)
+        if len(value) > self.max_bytes:
+            return
+        self._memory[key] = (value, created_at)
+        self._memory_bytes += len(value)
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            oldest_key = next(iter(self._memory))
+            self._remove_from_memory(oldest_key)
+            self._stats["evictions"] += 1
+
+    def _remove_from_memory(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[0])
+
+    def _evict_disk(self, now: float) -> None:
+        if self.ttl > 0:
+            self._db.execute("DELETE FROM cache WHERE created_at < ?", (now - self.ttl,))
+        total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        while total_bytes > self.max_bytes:
+            row = self._db.execute("SELECT key, size FROM cache ORDER BY accessed_at LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM cache WHERE key = ?", (row[0],))
+            total_bytes -= row[1]
+            self._stats["evictions"] += 1
@@ -1,5 +1,17 @@
-from .exec_load_documents import exec_load_documents
-from .exec_candidate_data import exec_candidate_data
-from .exec_assessment import exec_assessment
+from .exec_load_documents import exec_load_documents, exec_load_uploaded_documents, UploadedFile
+from .exec_candidate_data import exec_candidate_data, candidate_data_inputs, candidate_data_chunks, merge_candidate_data
+from .exec_assessment import exec_assessment, iter_assessments, assessment_config, assessment_inputs
+from .cached_pipeline import render_prompt
+from .exec_batch import exec_batch
+from .exec_session import exec_create_session, exec_session_assessment
+from .exec_stream import exec_stream
+from .conversion_engine import get_conversion_engine, shutdown_conversion_engine
+from .executor import run_in_executor, shutdown_executor
+from .runtime import get_runtime, shutdown_runtime, warm_up_runtime, preload_imports
+from .scheduler import Priority, LatencyWindow, get_scheduler
+from .deadline import DEADLINE_HEADER, DeadlineExceeded, deadline_scope, deadline_margin, request_deadline, time_remaining, record_deadline_outcome, deadline_stats
+from .cascade import cascade_stats
+from .admission import AdmissionController, AdmissionRejected, AdmissionTicket, estimate_cost, get_admission_controller
+from .single_flight import SingleFlight, request_flight, llm_flight, coalescing_stats
 
-__all__ = ["exec_load_documents", "exec_candidate_data", "exec_assessment"]
\ No newline at end of file
+__all__ = ["exec_load_documents", "exec_load_uploaded_documents", "UploadedFile", "exec_candidate_data", "candidate_data_inputs", "candidate_data_chunks", "merge_candidate_data", "exec_assessment", "iter_assessments", "assessment_config", "assessment_inputs", "render_prompt", "exec_batch", "exec_create_session", "exec_session_assessment", "exec_stream", "get_conversion_engine", "shutdown_conversion_engine", "run_in_executor", "shutdown_executor", "get_runtime", "shutdown_runtime", "warm_up_runtime", "preload_imports", "Priority", "LatencyWindow", "get_scheduler", "DEADLINE_HEADER", "DeadlineExceeded", "deadline_scope", "deadline_margin", "request_deadline", "time_remaining", "record_deadline_outcome", "deadline_stats", "cascade_stats", "AdmissionController", "AdmissionRejected", "AdmissionTicket", "estimate_cost", "get_admission_controller", "SingleFlight", "request_flight", "llm_flight", "coalescing_stats"]
\ No newline at end of file
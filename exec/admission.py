@@ -0,0 +1,291 @@
+"""
+Admission Control Module
+
+This module decides which synchronous processing requests the service takes on, so a burst
+of traffic queues or gets shed at the door instead of multiplying memory, executor work and
+OpenAI calls until the node falls over.
+
+Each request is given an estimated cost, from its number of requirements and the size of its
+documents. A request is admitted while the requests in flight stay under both the in-flight
+limit and the cost budget; otherwise it waits in a bounded FIFO queue. Requests are shed
+with a Retry-After hint when the queue is full (429) or when they waited too long (503).
+The admission state also drives the readiness reported by /health.
+
+The upload endpoints are admitted before their body is read, when the number of requirements
+is not known yet: they are costed with a default requirement count, and the cost is
+corrected once the request is parsed (see routes/admission.py).
+
+Admission is configured with the following environment variables:
+    - ADMISSION_MAX_IN_FLIGHT: Requests processed at once (0 disables admission control)
+    - ADMISSION_MAX_COST: Total estimated cost of the requests processed at once
+    - ADMISSION_MAX_QUEUE: Requests waiting for admission before new ones are shed
+    - ADMISSION_QUEUE_TIMEOUT: Seconds a request waits for admission before it is shed
+    - ADMISSION_COST_BYTES: Bytes of uploaded documents counted as one unit of document size
+    - ADMISSION_READY_QUEUE: Waiting requests from which /health reports the node as not ready
+      (defaults to half of ADMISSION_MAX_QUEUE)
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from observability import ADMISSION_DECISIONS
+
+# Load environment variables at module initialization
+load_dotenv()
+
+# Bounds of the Retry-After hint, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 120
+
+# Weight of the latest request in the moving average of the processing time
+DURATION_SMOOTHING = 0.2
+
+def estimate_cost(requirements: int, document_bytes: int) -> int:
+    """
+    Estimate the cost of a processing request.
+
+    Every requirement is an LLM call whose prompt carries the documents, plus one call for
+    the candidate data, so the cost grows with the number of requirements times the size of
+    the documents.
+
+    Args:
+        requirements (int): The number of job requirements
+        document_bytes (int): The total size of the uploaded documents
+
+    Returns:
+        int: The estimated cost, at least 1
+    """
+    unit_bytes = int(os.getenv("ADMISSION_COST_BYTES", str(256 * 1024)))
+    return (requirements + 1) * max(1, math.ceil(document_bytes / unit_bytes))
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is shed by admission control.
+
+    Attributes:
+        status_code (int): 429 when the queue is full, 503 when the request timed out in it
+        reason (str): queue_full or queue_timeout
+        retry_after (int): Seconds the client should wait before retrying
+    """
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"The service is over capacity ({reason.replace('_', ' ')}), retry in {retry_after}s")
+
+class AdmissionTicket:
+    """
+    The admission of one request, released when the request is done.
+
+    Attributes:
+        cost (int): The estimated cost of the request
+        waited (float): Seconds the request waited for its admission
+    """
+
+    def __init__(self, controller: "AdmissionController", cost: int):
+        self.cost = cost
+        self.waited = 0.0
+        self._controller = controller
+        self._started = time.monotonic()
+        self._released = False
+
+    def resize(self, cost: int) -> None:
+        """
+        Correct the estimated cost of the request once it is known better.
+
+        The request stays admitted: a higher cost only holds back the requests admitted
+        after it, and a lower one may admit waiting requests.
+
+        Args:
+            cost (int): The new estimated cost of the request
+        """
+        if not self._released:
+            self._controller._resize(self, max(1, cost))
+
+    def release(self) -> None:
+        """Give the capacity of the request back. Safe to call more than once."""
+        if not self._released:
+            self._released = True
+            self._controller._release(self, time.monotonic() - self._started)
+
+    async def __aenter__(self) -> "AdmissionTicket":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+class AdmissionController:
+    """
+    In-flight limit, cost budget and bounded wait queue of the processing requests.
+
+    All methods run on the event loop, so no locking is needed.
+
+    Attributes:
+        max_in_flight (int): Requests processed at once; 0 admits every request
+        max_cost (int): Total estimated cost of the requests processed at once
+        max_queue (int): Requests waiting for admission before new ones are shed
+        queue_timeout (float): Seconds a request waits for admission before it is shed
+        ready_queue (int): Waiting requests from which the node is reported as not ready
+    """
+
+    def __init__(self, max_in_flight: int, max_cost: int, max_queue: int, queue_timeout: float, ready_queue: Optional[int] = None):
+        self.max_in_flight = max_in_flight
+        self.max_cost = max(1, max_cost)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.ready_queue = ready_queue if ready_queue is not None else max(1, max_queue // 2)
+        self._in_flight = 0
+        self._cost = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+        self._mean_duration = 1.0
+        self._stats = {"admitted": 0, "queued": 0, "queue_full": 0, "queue_timeout": 0}
+
+    def _fits(self, cost: int) -> bool:
+        # A request over the whole budget is still admitted alone, so it can't wait forever
+        return self._in_flight < self.max_in_flight and (self._cost == 0 or self._cost + cost <= self.max_cost)
+
+    def _grant(self, cost: int) -> AdmissionTicket:
+        self._in_flight += 1
+        self._cost += cost
+        self._stats["admitted"] += 1
+        ADMISSION_DECISIONS.labels(outcome="admitted").inc()
+        return AdmissionTicket(self, cost)
+
+    def _reject(self, status_code: int, reason: str) -> AdmissionRejected:
+        self._stats[reason] += 1
+        ADMISSION_DECISIONS.labels(outcome=reason).inc()
+        return AdmissionRejected(status_code, reason, self.retry_after())
+
+    async def acquire(self, cost: int) -> AdmissionTicket:
+        """
+        Wait for the admission of a request.
+
+        Args:
+            cost: The estimated cost of the request
+
+        Returns:
+            AdmissionTicket: The admission, to release (or use as an async context manager)
+                once the request is done
+
+        Raises:
+            AdmissionRejected: If the wait queue is full, or the request waited longer than
+                the queue timeout
+        """
+        cost = max(1, cost)
+        if self.max_in_flight <= 0:
+            return AdmissionTicket(self, 0)
+        if not self._waiters and self._fits(cost):
+            return self._grant(cost)
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject(429, "queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (cost, future)
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+        queued = time.monotonic()
+        try:
+            ticket = await asyncio.wait_for(future, self.queue_timeout)
+            ticket.waited = time.monotonic() - queued
+            return ticket
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            # The request may have been admitted just as it gave up waiting
+            if future.done() and not future.cancelled():
+                future.result().release()
+            self._wake()
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject(503, "queue_timeout") from None
+            raise
+
+    def _release(self, ticket: AdmissionTicket, duration: float) -> None:
+        if ticket.cost == 0 and self.max_in_flight <= 0:
+            return
+        self._in_flight -= 1
+        self._cost -= ticket.cost
+        self._mean_duration += DURATION_SMOOTHING * (duration - self._mean_duration)
+        self._wake()
+
+    def _resize(self, ticket: AdmissionTicket, cost: int) -> None:
+        if ticket.cost == 0 and self.max_in_flight <= 0:
+            return
+        self._cost += cost - ticket.cost
+        ticket.cost = cost
+        self._wake()
+
+    def _wake(self) -> None:
+        # First in, first out: a large request at the head isn't overtaken by smaller ones
+        while self._waiters and self._fits(self._waiters[0][0]):
+            cost, future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(self._grant(cost))
+
+    def retry_after(self) -> int:
+        """
+        Estimate when a shed request should be retried.
+
+        Returns:
+            int: Seconds for the waiting requests to drain at the current processing time
+        """
+        slots = max(1, self.max_in_flight)
+        seconds = self._mean_duration * (len(self._waiters) + 1) / slots
+        return min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(seconds)))
+
+    def ready(self) -> bool:
+        """
+        Tell whether the node should receive more traffic.
+
+        Returns:
+            bool: False while the wait queue holds ready_queue requests or more
+        """
+        return self.max_in_flight <= 0 or len(self._waiters) < self.ready_queue
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the admission state and counters.
+
+        Returns:
+            Dict[str, Any]: Requests and cost in flight with their limits, the queue depth,
+                the mean processing time, readiness, and the admitted, queued and shed counters
+        """
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "cost_in_flight": self._cost,
+            "max_cost": self.max_cost,
+            "queue_depth": len(self._waiters),
+            "max_queue": self.max_queue,
+            "mean_duration_s": round(self._mean_duration, 4),
+            "ready": self.ready(),
+            **self._stats
+        }
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Get the process-wide admission controller, created from the environment on first use.
+
+    Returns:
+        AdmissionController: The controller shared by every processing request
+    """
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            ready_queue = os.getenv("ADMISSION_READY_QUEUE")
+            _controller = AdmissionController(
+                max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32")),
+                max_cost=int(os.getenv("ADMISSION_MAX_COST", "512")),
+                max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "64")),
+                queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30")),
+                ready_queue=int(ready_queue) if ready_queue else None
+            )
+        return _controller
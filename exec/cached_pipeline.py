@@ -0,0 +1,137 @@
+"""
+Cached Pipeline Execution Module
+
+This module runs the LLM pipelines (prompt builder -> OpenAI generator -> LLMToModel)
+through the LLM response cache and the OpenAI call scheduler. The prompt is rendered first
+to compute the cache key; on a hit the cached model is returned without calling OpenAI,
+and on a miss the call waits for its turn in the scheduler, the pipeline runs and its parsed
+model is stored. Identical prompts already in flight (from this request or any other) are
+coalesced into a single OpenAI call. Each run checks out its own pipeline instance from the
+runtime's pool.
+
+A reply that can't be parsed, even after local repair, is re-asked once: the same prompt
+is sent again with the reply and its parse error appended, asking for the corrected JSON
+object only. Only that one call is retried, not the request.
+
+Calls running past the hedge percentile of their model get a hedged duplicate (see the
+scheduler). A caller with a deadline stops waiting for its call at the deadline; the call
+itself, shared with the identical calls of other requests, runs without that deadline.
+
+The re-ask is configured with the following environment variable:
+    - LLM_REASK: Whether to re-ask a reply that can't be parsed once (true/false)
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple, Type
+from dotenv import load_dotenv
+from haystack import Pipeline
+from haystack.dataclasses import ChatMessage
+from pydantic import BaseModel
+from cache import llm_cache_key, get_cached_model, cache_model
+from pipelines import LLMParseError, estimate_tokens, parse_reply
+from observability import stage, record_llm_parse
+from .deadline import within_deadline, without_deadline
+from .executor import run_in_executor
+from .runtime import get_runtime
+from .scheduler import Priority, get_scheduler
+from .single_flight import llm_flight
+
+# Load environment variables at module initialization
+load_dotenv()
+
+# Longest part of a parse error quoted in a re-ask
+REASK_ERROR_CHARS = 1000
+
+def render_prompt(pipeline_name: str, prompt_component: str, inputs: Dict[str, Any]) -> Tuple[str, List[ChatMessage], Type[BaseModel]]:
+    """
+    Render the prompt of an LLM pipeline without running it.
+
+    Args:
+        pipeline_name (str): Name of the runtime pipeline pool
+        prompt_component (str): Name of the prompt builder component of the pipeline
+        inputs (Dict[str, Any]): The template variables of the prompt
+
+    Returns:
+        Tuple[str, List[ChatMessage], Type[BaseModel]]: The model of the pipeline's generator,
+            the rendered messages, and the model class its replies are parsed into
+    """
+    with get_runtime().pipeline(pipeline_name) as pipeline:
+        messages = pipeline.get_component(prompt_component).run(**inputs)["prompt"]
+        return pipeline.get_component("openai_generator").model, messages, pipeline.get_component("llm_to_model").model_class
+
+def _lookup(pipeline_name: str, prompt_component: str, inputs: Dict[str, Any], bypass_cache: bool) -> Tuple[str, str, int, Optional[BaseModel]]:
+    with stage("prompt_render", pipeline=pipeline_name):
+        model_name, messages, model_class = render_prompt(pipeline_name, prompt_component, inputs)
+        key = llm_cache_key(model_name, messages)
+        cached = None if bypass_cache else get_cached_model(key, model_class)
+    tokens = sum(estimate_tokens(message.content) for message in messages)
+    return model_name, key, tokens, cached
+
+def _reask(pipeline: Pipeline, prompt_component: str, inputs: Dict[str, Any], error: LLMParseError) -> BaseModel:
+    """Ask the model of the pipeline to correct a reply that couldn't be parsed."""
+    model_class = pipeline.get_component("llm_to_model").model_class
+    messages = pipeline.get_component(prompt_component).run(**inputs)["prompt"]
+    messages = messages + [
+        ChatMessage.from_assistant(error.reply),
+        ChatMessage.from_user(
+            f"Your reply could not be parsed: {str(error)[:REASK_ERROR_CHARS]}\n"
+            "Reply again with only the corrected JSON object, following the format instructions above."
+        )
+    ]
+    replies = pipeline.get_component("openai_generator").run(messages=messages)["replies"]
+    with stage("llm_parse", model_class=model_class.__name__):
+        try:
+            model, _ = parse_reply(replies[0].content, model_class)
+        except LLMParseError:
+            record_llm_parse(model_class.__name__, "reask_failed")
+            raise
+    record_llm_parse(model_class.__name__, "reasked")
+    return model
+
+def _run_pipeline(pipeline_name: str, prompt_component: str, inputs: Dict[str, Any]) -> BaseModel:
+    with get_runtime().pipeline(pipeline_name) as pipeline:
+        try:
+            return pipeline.run(inputs)["llm_to_model"]["model"]
+        except LLMParseError as e:
+            if os.getenv("LLM_REASK", "true").lower() != "true":
+                raise
+            # The re-ask runs in the scheduler slot of the call it corrects
+            return _reask(pipeline, prompt_component, inputs, e)
+
+async def run_cached_pipeline(
+    pipeline_name: str,
+    prompt_component: str,
+    inputs: Dict[str, Any],
+    bypass_cache: bool = False,
+    priority: Priority = Priority.ASSESSMENT
+) -> BaseModel:
+    """
+    Run an LLM pipeline, serving the parsed model from the LLM cache when possible.
+
+    The blocking steps run on the shared executor, so this never blocks the event loop.
+
+    Args:
+        pipeline_name (str): Name of the runtime pipeline pool to run. Its pipeline must
+            contain an "openai_generator" and an "llm_to_model" component.
+        prompt_component (str): Name of the ChatPromptBuilder component of the pipeline
+        inputs (Dict[str, Any]): The template variables of the prompt
+        bypass_cache (bool): Skip the cache lookup; the fresh result is still stored. An
+            identical call already in flight is still joined, as its reply is fresh.
+        priority (Priority): Priority of the OpenAI call in the scheduler
+
+    Returns:
+        BaseModel: The model parsed from the LLM reply
+    """
+    model_name, key, tokens, cached = await run_in_executor(_lookup, pipeline_name, prompt_component, inputs, bypass_cache)
+    if cached is not None:
+        return cached
+
+    async def call() -> BaseModel:
+        # The call is shared by every caller of the prompt, so the deadline of the one starting it doesn't apply
+        with without_deadline():
+            model = await get_scheduler().run_hedged(model_name, tokens, priority, lambda: run_in_executor(_run_pipeline, pipeline_name, prompt_component, inputs))
+        cache_model(key, model)
+        return model
+
+    # The cache key covers the model and the whole prompt, so identical calls share one reply
+    return await within_deadline(llm_flight.run(key, call))
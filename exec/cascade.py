@@ -0,0 +1,326 @@
+"""
+Assessment Cascade Module
+
+This module screens requirements with cheap tiers before they reach ASSESSMENT_MODEL.
+The tiers listed in ASSESSMENT_CASCADE are tried in order for each requirement:
+
+- keyword: A local, deterministic matcher looking for the keywords of the requirement
+  (and their synonyms) in the documents. It only confirms requirements whose every
+  keyword is found together in one sentence, line or bullet point without a negation
+  ("no", "never", "without"...), and never screens requirements with a quantity (such as
+  "5+ years"), which keywords can't verify. A keyword is only matched by spellings at
+  least as specific as itself: ambiguous short words ("go", "node", "ml") are never
+  searched for, and a degree level is only met by that level.
+- Any other tier is a cheaper model, asked for a ScreeningAssessment with its confidence.
+
+A tier only settles a requirement when it finds it present with enough confidence. Absent
+requirements and unsure answers escalate to the next tier and, at the end of the cascade,
+to ASSESSMENT_MODEL, so the expensive model still decides every hard or negative case.
+
+The cascade is configured with the following environment variables:
+    - ASSESSMENT_CASCADE: Comma-separated screening tiers, cheapest first (empty disables it)
+    - ASSESSMENT_KEYWORD_MIN_CONFIDENCE: Share of the keywords of a requirement the keyword
+      matcher must find in one sentence to confirm it
+    - ASSESSMENT_CASCADE_MIN_CONFIDENCE: Confidence a model tier must report to confirm a requirement
+"""
+
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+from haystack import Document
+from haystack.dataclasses import ChatMessage
+from models import RequirementAssessment, ScreeningAssessment
+from pipelines import (
+    KEYWORD_TIER,
+    RequirementRetriever,
+    get_assessment_cascade,
+    get_assessment_prompt_layout,
+    get_format_instructions,
+    render_assessment_prefix
+)
+from observability import CASCADE_DECISIONS, stage
+from .executor import run_in_executor
+from .runtime import screening_pipeline_name
+
+# Load environment variables at module initialization
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Name of the last tier (ASSESSMENT_MODEL) in the statistics
+FINAL_TIER = "final"
+
+# Tokens: words, versions and names such as c++, c#, node.js or ci/cd
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*")
+
+# Words of a requirement that say nothing about the skill itself
+STOPWORDS = {
+    "a", "an", "and", "or", "the", "of", "in", "on", "at", "to", "for", "with", "as", "by", "from",
+    "is", "are", "be", "have", "has", "into", "other", "such", "like", "etc", "e.g", "i.e",
+    "experience", "experienced", "years", "year", "strong", "solid", "good", "great", "excellent",
+    "proven", "deep", "knowledge", "background", "understanding", "familiarity", "familiar",
+    "skills", "skill", "ability", "able", "hands-on", "hands", "working", "work", "professional",
+    "expertise", "proficiency", "proficient", "plus", "least", "minimum", "using", "use",
+    "including", "related", "relevant", "similar", "equivalent", "preferred", "required", "must",
+    "nice", "environment", "environments", "level", "development", "developing",
+}
+
+# Boundaries of the spans in which every keyword of a requirement must appear: sentences,
+# lines and bullet points (the periods of abbreviations such as "B.S." or "M.Sc." end no sentence)
+SPAN_PATTERN = re.compile(r"(?<=[A-Za-z0-9)]{2}[.!?])(?<!\.[A-Za-z]{2}\.)\s+|(?<=;)\s+|\s*\n\s*|\s*[•▪●◦]\s*")
+
+# Words that turn a span against the keywords it mentions ("no Kubernetes", "never used Java")
+NEGATIONS = {"no", "not", "without", "never", "lack", "lacks", "lacking", "none", "nor", "neither"}
+
+# Degree levels, each only met by its own spellings
+DEGREE_LEVELS = [
+    {"bachelor", "bachelors", "b.s", "b.sc", "bsc", "b.a", "b.eng", "beng"},
+    {"master", "masters", "m.s", "m.sc", "msc", "m.a", "m.eng", "meng", "mba"},
+    {"phd", "ph.d", "doctorate", "doctoral"},
+]
+
+# Interchangeable spellings of common skills
+SYNONYM_GROUPS = [*DEGREE_LEVELS, 
+    {"kubernetes", "k8s"},
+    {"javascript", "js", "ecmascript"},
+    {"typescript", "ts"},
+    {"postgresql", "postgres"},
+    {"aws", "amazon web services"},
+    {"gcp", "google cloud", "google cloud platform"},
+    {"azure", "microsoft azure"},
+    {"ml", "machine learning"},
+    {"ai", "artificial intelligence"},
+    {"nlp", "natural language processing"},
+    {"golang", "go"},
+    {"ci/cd", "cicd", "continuous integration"},
+    {"node.js", "nodejs", "node"},
+    {"react", "react.js", "reactjs"},
+    {"c#", "csharp"},
+    {"c++", "cpp"},
+    {"cs", "computer science"},
+]
+SYNONYMS: Dict[str, Set[str]] = {term: group for group in SYNONYM_GROUPS for term in group}
+
+# Abbreviations and ordinary words that mean something else in prose ("willing to go the
+# extra mile"): a requirement naming them is only confirmed by their unambiguous spellings
+LOOSE_ALIASES = {"go", "node", "js", "ts", "cs", "ai", "ml"}
+
+# Keywords also met by more specific terms: any degree level is a degree
+NARROWER_TERMS: Dict[str, Set[str]] = {"degree": set().union(*DEGREE_LEVELS)}
+
+# Requirements with a quantity ("5+ years", "3-5 years", "two years") can't be verified by keywords
+QUANTITY_PATTERN = re.compile(
+    r"\b\d+(?:\.\d+)?\s*\+"
+    r"|\b\d+(?:\.\d+)?\s*(?:-\s*\d+\s*)?(?:years?|yrs?|months?)\b"
+    r"|\b(?:one|two|three|four|five|six|seven|eight|nine|ten)\+?\s+(?:years?|months?)\b",
+    re.IGNORECASE
+)
+
+# Possessives, so "Master's degree" has the keywords master and degree
+POSSESSIVE_PATTERN = re.compile(r"['’]s\b")
+
+def _tokens(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(POSSESSIVE_PATTERN.sub("", text.lower()).replace("n't", " not").replace("n’t", " not"))
+
+def _normalize(text: str) -> str:
+    return " " + " ".join(_tokens(text)) + " "
+
+def _search_terms(keyword: str) -> List[str]:
+    """The normalized spellings that confirm a keyword, never looser than the keyword itself."""
+    terms = SYNONYMS.get(keyword, {keyword}) | NARROWER_TERMS.get(keyword, set())
+    return [_normalize(term) for term in sorted(terms - LOOSE_ALIASES)]
+
+class KeywordMatcher:
+    """
+    Deterministic keyword and synonym matching of requirements against documents.
+    """
+
+    def __init__(self, documents: List[Document]):
+        """
+        Index the documents of a request.
+
+        Args:
+            documents: The documents of the candidate
+        """
+        spans = (_normalize(span) for document in documents for span in SPAN_PATTERN.split(document.content or ""))
+        # A span with a negation can't confirm anything it mentions
+        self._spans = [span for span in dict.fromkeys(spans) if span.strip() and not NEGATIONS.intersection(span.split())]
+
+    def keywords(self, requirement: str) -> List[str]:
+        """
+        Get the keywords of a requirement.
+
+        Args:
+            requirement: The job requirement
+
+        Returns:
+            List[str]: Its tokens, without stopwords and numbers, in order
+        """
+        tokens = _tokens(requirement)
+        return list(dict.fromkeys(token for token in tokens if token not in STOPWORDS and not token.isdigit()))
+
+    def match(self, requirement: str) -> Tuple[float, List[str]]:
+        """
+        Match a requirement against the documents.
+
+        Args:
+            requirement: The job requirement
+
+        Returns:
+            Tuple[float, List[str]]: The largest share of its keywords found together in one
+                span of the documents without a negation (0 when it has a quantity or no
+                keyword), and the keywords missing from that span
+        """
+        keywords = self.keywords(requirement)
+        if not keywords or QUANTITY_PATTERN.search(requirement):
+            return 0.0, keywords
+        terms = {keyword: _search_terms(keyword) for keyword in keywords}
+        best = keywords
+        for span in self._spans:
+            missing = [keyword for keyword in keywords if not any(term in span for term in terms[keyword])]
+            if len(missing) < len(best):
+                best = missing
+                if not best:
+                    break
+        return 1 - len(best) / len(keywords), best
+
+class _CascadeStats:
+    """Thread-safe counters of the decisions of each tier"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, Dict[str, int]] = {}
+
+    def record(self, tier: str, outcome: str) -> None:
+        CASCADE_DECISIONS.labels(tier=tier, outcome=outcome).inc()
+        with self._lock:
+            counters = self._tiers.setdefault(tier, {"attempts": 0, "accepted": 0, "escalated": 0, "errors": 0})
+            counters["attempts"] += 1
+            counters[outcome] += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                tier: {**counters, "hit_rate": round(counters["accepted"] / counters["attempts"], 4) if counters["attempts"] else 0.0}
+                for tier, counters in self._tiers.items()
+            }
+
+_stats = _CascadeStats()
+
+def cascade_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Get the decisions of each tier of the cascade since startup.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per tier (and "final" for ASSESSMENT_MODEL), the number of
+            requirements it received, accepted, escalated or failed on, and its hit rate
+    """
+    return _stats.stats()
+
+class AssessmentCascade:
+    """
+    The screening tiers of the assessments of one request.
+
+    Attributes:
+        tiers (List[str]): The screening tiers, in order
+    """
+
+    def __init__(self, documents: List[Document], tiers: List[str], bypass_cache: bool = False, retriever: Optional[RequirementRetriever] = None):
+        """
+        Initialize the cascade. Call prepare before screening requirements.
+
+        Args:
+            documents: The documents of the candidate
+            tiers: The screening tiers, in order
+            bypass_cache: Skip the LLM response cache lookup of the model tiers
+            retriever: The request's chunk index, when retrieval is enabled
+        """
+        self.tiers = tiers
+        self._documents = documents
+        self._bypass_cache = bypass_cache
+        self._retriever = retriever
+        self._matcher: Optional[KeywordMatcher] = None
+        self._format_instructions = get_format_instructions(ScreeningAssessment)
+        self._prefix: Optional[List[ChatMessage]] = None
+        self._keyword_min_confidence = float(os.getenv("ASSESSMENT_KEYWORD_MIN_CONFIDENCE", "1.0"))
+        self._model_min_confidence = float(os.getenv("ASSESSMENT_CASCADE_MIN_CONFIDENCE", "0.8"))
+
+    async def prepare(self) -> None:
+        """Index the documents for the keyword tier and render the shared prompt prefix of the model tiers."""
+        if KEYWORD_TIER in self.tiers:
+            self._matcher = await run_in_executor(KeywordMatcher, self._documents)
+        if self._retriever is None and get_assessment_prompt_layout() == "prefix" and any(tier != KEYWORD_TIER for tier in self.tiers):
+            self._prefix = await run_in_executor(render_assessment_prefix, self._documents, self._format_instructions)
+
+    async def screen(self, requirement: str) -> Optional[RequirementAssessment]:
+        """
+        Try to settle a requirement with the screening tiers.
+
+        Args:
+            requirement: The job requirement
+
+        Returns:
+            Optional[RequirementAssessment]: The assessment of the first tier that confirmed
+                the requirement, or None when it must go to ASSESSMENT_MODEL
+        """
+        for tier in self.tiers:
+            with stage("screening", tier=tier):
+                try:
+                    assessment = await self._screen_with(tier, requirement)
+                except Exception as e:
+                    logger.warning('Screening tier %s failed on requirement "%s": %s', tier, requirement, e)
+                    _stats.record(tier, "errors")
+                    continue
+            if assessment is not None:
+                _stats.record(tier, "accepted")
+                return assessment
+            _stats.record(tier, "escalated")
+        return None
+
+    def record_final(self) -> None:
+        """Count a requirement assessed by ASSESSMENT_MODEL after the screening tiers."""
+        _stats.record(FINAL_TIER, "accepted")
+
+    async def _screen_with(self, tier: str, requirement: str) -> Optional[RequirementAssessment]:
+        if tier == KEYWORD_TIER:
+            confidence, _ = self._matcher.match(requirement)
+            if confidence >= self._keyword_min_confidence:
+                return RequirementAssessment(requirement=requirement, present_in_documents=True, inquiry=None)
+            return None
+
+        # Imported here, as exec_assessment uses the cascade
+        from .exec_assessment import process_requirement
+        result: ScreeningAssessment = await process_requirement(
+            self._documents,
+            requirement,
+            self._format_instructions,
+            self._bypass_cache,
+            self._retriever,
+            self._prefix,
+            pipeline_name=screening_pipeline_name(tier)
+        )
+        if result.present_in_documents and result.confidence >= self._model_min_confidence:
+            return RequirementAssessment(requirement=requirement, present_in_documents=True, inquiry=None)
+        return None
+
+async def create_cascade(documents: List[Document], bypass_cache: bool = False, retriever: Optional[RequirementRetriever] = None) -> Optional[AssessmentCascade]:
+    """
+    Create and prepare the cascade of a request, as configured by ASSESSMENT_CASCADE.
+
+    Args:
+        documents (List[Document]): The documents of the candidate
+        bypass_cache (bool): Skip the LLM response cache lookup of the model tiers
+        retriever (Optional[RequirementRetriever]): The request's chunk index, when retrieval is enabled
+
+    Returns:
+        Optional[AssessmentCascade]: The cascade, or None when it is disabled
+    """
+    tiers = get_assessment_cascade()
+    if not tiers:
+        return None
+    cascade = AssessmentCascade(documents, tiers, bypass_cache=bypass_cache, retriever=retriever)
+    await cascade.prepare()
+    return cascade
@@ -0,0 +1,312 @@
+"""
+Conversion Engine Module
+
+This module converts PDF and DOCX files into Haystack Documents on a pool of worker
+processes, so CPU-bound text extraction neither pins the server's core nor blocks the
+event loop. Several files are converted concurrently, and large PDFs are split into page
+ranges, once in the server process, extracted in parallel and reassembled in order.
+
+A task that runs past the timeout can't be cancelled, so its file is skipped and the pool's
+workers are killed and replaced; the unfinished tasks of the other files run again on the
+new pool. A task whose worker process crashed is retried once, on a new pool.
+
+The engine produces the same Documents as the load documents pipeline: PDF pages are joined
+with form feeds like PyPDFToDocument, DOCX files go through DOCXToDocument, and the source
+meta (including file_path) is kept.
+
+The engine is configured with the following environment variables:
+    - CONVERSION_WORKERS: Number of worker processes (0 converts in-thread with the pipeline)
+    - CONVERSION_PAGES_PER_TASK: Number of PDF pages extracted by a single task
+    - CONVERSION_TIMEOUT: Seconds a conversion task (a DOCX file, or a page range of a PDF)
+      may run in a worker before its file is skipped
+"""
+
+import io
+import logging
+import mimetypes
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from dotenv import load_dotenv
+from haystack import Document
+from haystack.dataclasses import ByteStream
+
+# Load environment variables at module initialization
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PDF_MIME_TYPE = "application/pdf"
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Seconds between checks of the tasks not handed to a worker yet
+POLL_INTERVAL = 0.1
+
+def _extract_pdf_pages(data: bytes) -> List[str]:
+    """Extract the text of every page of a PDF, or of a range of its pages (runs in a worker process)."""
+    from pypdf import PdfReader
+
+    return [page.extract_text() for page in PdfReader(io.BytesIO(data)).pages]
+
+def _convert_docx(data: bytes, meta: Dict[str, Any]) -> List[Document]:
+    """Convert a DOCX file with Haystack's converter (runs in a worker process)."""
+    from haystack.components.converters.docx import DOCXToDocument
+
+    return DOCXToDocument().run(sources=[ByteStream(data=data, meta=meta)])["documents"]
+
+@dataclass(eq=False)
+class _Task:
+    """A conversion task of a file: the whole file, or one page range of a PDF."""
+    file: int
+    index: int
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    crashes: int = 0
+    running_since: Optional[float] = None
+
+class ConversionEngine:
+    """
+    Converts documents on a process pool, with per-page parallelism for large PDFs.
+
+    Attributes:
+        workers (int): Number of worker processes
+        pages_per_task (int): Number of PDF pages extracted by a single task
+        timeout (float): Seconds a single task may run before its file is skipped
+    """
+
+    def __init__(self, workers: int, pages_per_task: int = 8, timeout: float = 60):
+        """
+        Initialize the engine and its process pool.
+
+        Args:
+            workers: Number of worker processes
+            pages_per_task: Number of PDF pages extracted by a single task
+            timeout: Seconds a single task may run before its file is skipped
+        """
+        self.workers = workers
+        self.pages_per_task = max(1, pages_per_task)
+        self.timeout = timeout
+        self._pool = self._new_pool()
+        self._pool_lock = threading.Lock()
+        # Pools killed on purpose, whose broken tasks didn't crash a worker themselves
+        self._killed: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # Spawned workers don't inherit the server's threads and locks
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def convert(self, sources: List[Union[str, Path, ByteStream]], meta: Optional[List[Dict[str, Any]]] = None) -> List[Document]:
+        """
+        Convert PDF and DOCX sources into Documents.
+
+        All files are submitted to the pool before any result is awaited, so they convert
+        concurrently. Files with an unsupported type or that fail to convert are skipped with
+        a warning, like the converters of the pipeline do. A file is also skipped when one of
+        its tasks runs longer than the timeout: the pool is then replaced, since a running
+        task can't be cancelled, and the other unfinished tasks run again on the new pool.
+        A task whose worker crashed is retried once on a new pool.
+
+        Args:
+            sources: File paths or ByteStreams to convert
+            meta: Metadata to add to the documents of each source
+
+        Returns:
+            List[Document]: One Document per converted file, in the order of the sources
+        """
+        # Importing the converters imports every converter library, so it waits for the first conversion
+        from haystack.components.converters.utils import get_bytestream_from_source
+
+        files: List[Tuple[Any, ByteStream, str]] = []
+        tasks: List[_Task] = []
+        for source, source_meta in zip(sources, meta or [{}] * len(sources)):
+            try:
+                bytestream = get_bytestream_from_source(source)
+            except Exception as e:
+                logger.warning("Could not read %s. Skipping it. Error: %s", source, e)
+                continue
+            # Guess the type from the path before meta may replace the file_path
+            mime_type = bytestream.mime_type or mimetypes.guess_type(str(bytestream.meta.get("file_path", "")))[0]
+            bytestream.meta.update(source_meta)
+            if mime_type == PDF_MIME_TYPE:
+                ranges = self._split_pdf(bytestream.data)
+                tasks.extend(_Task(len(files), index, _extract_pdf_pages, (data,)) for index, data in enumerate(ranges))
+            elif mime_type == DOCX_MIME_TYPE:
+                tasks.append(_Task(len(files), 0, _convert_docx, (bytestream.data, bytestream.meta)))
+            else:
+                logger.warning("Unsupported file type %s for %s. Skipping it.", mime_type, source)
+                continue
+            files.append((source, bytestream, mime_type))
+
+        results: Dict[int, Dict[int, Any]] = {file: {} for file in range(len(files))}
+        skipped: Set[int] = set()
+        # Tasks that were on a worker when it crashed are retried one at a time, to find the culprit
+        suspects: List[_Task] = []
+        pool, pending = self._submit(tasks)
+        while pending or suspects:
+            if suspects and not any(task.crashes for task in pending.values()):
+                suspect = suspects.pop(0)
+                if suspect.file not in skipped:
+                    pool, submitted = self._submit([suspect])
+                    pending.update(submitted)
+                continue
+            # A task's clock starts when it is handed to a worker, not when its file was submitted
+            now = time.monotonic()
+            for future, task in pending.items():
+                if task.running_since is None and future.running():
+                    task.running_since = now
+            waits = [task.running_since + self.timeout - now for task in pending.values() if task.running_since is not None]
+            done, _ = wait(pending, timeout=max(0.0, min(waits + [POLL_INTERVAL])), return_when=FIRST_COMPLETED)
+
+            broken: List[_Task] = []
+            for future in done:
+                task = pending.pop(future)
+                if task.file in skipped:
+                    continue
+                try:
+                    results[task.file][task.index] = future.result()
+                except BrokenProcessPool:
+                    broken.append(task)
+                except Exception as e:
+                    logger.warning("Could not convert %s. Skipping it. Error: %s", files[task.file][0], e)
+                    skipped.add(task.file)
+
+            now = time.monotonic()
+            timed_out = False
+            for task in pending.values():
+                if task.running_since is not None and now - task.running_since > self.timeout and task.file not in skipped:
+                    logger.warning("Converting %s took more than %ss. Skipping it.", files[task.file][0], self.timeout)
+                    skipped.add(task.file)
+                    timed_out = True
+
+            if broken or timed_out:
+                # Running tasks can't be cancelled, so the workers of a timed out task are killed;
+                # the unfinished tasks of the other files run again on the new pool
+                crashed = bool(broken) and not self._was_killed(pool)
+                self._replace_pool(pool, kill=timed_out)
+                retry = []
+                for task in broken + list(pending.values()):
+                    if task.file in skipped:
+                        continue
+                    # Any task on a worker may have crashed it; the ones still queued didn't
+                    if crashed and task.running_since is not None:
+                        task.crashes += 1
+                    if task.crashes > 1:
+                        logger.warning("Converting %s crashed a worker process twice. Skipping it.", files[task.file][0])
+                        skipped.add(task.file)
+                        continue
+                    task.running_since = None
+                    (suspects if task.crashes else retry).append(task)
+                pool, pending = self._submit(retry)
+            else:
+                pending = {future: task for future, task in pending.items() if task.file not in skipped}
+
+        documents = []
+        for file, (source, bytestream, mime_type) in enumerate(files):
+            if file in skipped:
+                continue
+            parts = [results[file][index] for index in sorted(results[file])]
+            if mime_type == DOCX_MIME_TYPE:
+                documents.extend(parts[0])
+            else:
+                # Reassemble the page ranges in order, joined like PyPDFToDocument does
+                pages = [page for page_range in parts for page in page_range]
+                documents.append(Document(content="\f".join(pages), meta=dict(bytestream.meta)))
+        return documents
+
+    def _split_pdf(self, data: bytes) -> List[bytes]:
+        # Split in the parent, so each task only parses its own pages
+        from pypdf import PdfReader, PdfWriter
+
+        try:
+            reader = PdfReader(io.BytesIO(data))
+            if len(reader.pages) <= self.pages_per_task:
+                return [data]
+            ranges = []
+            for start in range(0, len(reader.pages), self.pages_per_task):
+                writer = PdfWriter()
+                for page in reader.pages[start:start + self.pages_per_task]:
+                    writer.add_page(page)
+                buffer = io.BytesIO()
+                writer.write(buffer)
+                ranges.append(buffer.getvalue())
+            return ranges
+        except Exception:
+            # Let the worker surface the parsing error for this file
+            return [data]
+
+    def _submit(self, tasks: List[_Task]) -> Tuple[ProcessPoolExecutor, Dict[Future, _Task]]:
+        for attempt in range(2):
+            with self._pool_lock:
+                pool = self._pool
+            try:
+                return pool, {pool.submit(task.fn, *task.args): task for task in tasks}
+            except (BrokenProcessPool, RuntimeError):
+                # The pool broke, or was replaced by another conversion, since it was picked
+                if attempt:
+                    raise
+                self._replace_pool(pool, kill=False)
+
+    def _replace_pool(self, pool: ProcessPoolExecutor, kill: bool) -> None:
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = self._new_pool()
+            if kill:
+                self._killed.add(pool)
+        if kill:
+            # ProcessPoolExecutor can't stop a running task, short of killing its workers
+            kill_workers = getattr(pool, "kill_workers", None)
+            if kill_workers is not None:
+                kill_workers()
+            else:
+                # Before Python 3.14, the workers are only reachable through the pool's internals
+                for process in list((getattr(pool, "_processes", None) or {}).values()):
+                    process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _was_killed(self, pool: ProcessPoolExecutor) -> bool:
+        with self._pool_lock:
+            return pool in self._killed
+
+    def shutdown(self) -> None:
+        """Shut down the worker processes."""
+        with self._pool_lock:
+            pool = self._pool
+        pool.shutdown(wait=False, cancel_futures=True)
+
+_engine: Optional[ConversionEngine] = None
+_engine_lock = threading.Lock()
+
+def get_conversion_engine() -> Optional[ConversionEngine]:
+    """
+    Get the process-wide conversion engine, creating it on first use.
+
+    Returns:
+        Optional[ConversionEngine]: The engine, or None when CONVERSION_WORKERS is 0
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            workers = int(os.getenv("CONVERSION_WORKERS", "0"))
+            if workers <= 0:
+                return None
+            _engine = ConversionEngine(
+                workers=workers,
+                pages_per_task=int(os.getenv("CONVERSION_PAGES_PER_TASK", "8")),
+                timeout=float(os.getenv("CONVERSION_TIMEOUT", "60"))
+            )
+        return _engine
+
+def shutdown_conversion_engine() -> None:
+    """Shut down the conversion engine, if it was created."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.shutdown()
+            _engine = None
@@ -0,0 +1,166 @@
+"""
+Deadline Module
+
+This module carries the deadline of a request through everything it runs. The deadline is
+held in a context variable, so the tasks a request starts and the executor threads its
+pipelines run on (which copy the context of their caller) all see it:
+
+- The request stops waiting for each of its LLM calls at the deadline. An LLM call may be
+  shared with other requests sending the same prompt, so the call itself runs without the
+  deadline of any of them, and is only cancelled once no request waits for it anymore.
+- /process stops waiting shortly before the deadline and returns the results it has, with
+  the unfinished requirements listed as pending.
+
+A request sets its deadline with the X-Request-Timeout header or the deadline_seconds field
+of its ProcessInput, in seconds from its arrival; the shorter one wins.
+
+Deadlines are configured with the following environment variables:
+    - REQUEST_DEADLINE: Deadline in seconds of the requests that don't set one (0 for none)
+    - DEADLINE_MARGIN: Seconds before the deadline at which /process returns what it has,
+      leaving time to send the response
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterator, Optional, TypeVar
+from dotenv import load_dotenv
+from observability import DEADLINE_OUTCOMES
+
+# Load environment variables at module initialization
+load_dotenv()
+
+T = TypeVar("T")
+
+# Header a client sets its deadline with, in seconds
+DEADLINE_HEADER = "X-Request-Timeout"
+
+# The deadline of the current request on the monotonic clock, or None without one
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work of a request would start past its deadline."""
+
+def request_deadline(*seconds: Optional[float]) -> Optional[float]:
+    """
+    Get the deadline of a request from the deadlines it set.
+
+    Args:
+        *seconds (Optional[float]): The deadlines set by the request, in seconds, or None
+            where it set none
+
+    Returns:
+        Optional[float]: The shortest deadline set, else REQUEST_DEADLINE, or None when
+            there is no deadline
+    """
+    deadlines = [value for value in seconds if value is not None and value > 0]
+    if deadlines:
+        return min(deadlines)
+    default = float(os.getenv("REQUEST_DEADLINE", "0"))
+    return default if default > 0 else None
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Set the deadline of the work run inside the block.
+
+    A deadline already set by an enclosing scope is kept when it is earlier.
+
+    Args:
+        seconds (Optional[float]): Seconds from now until the deadline, or None for no deadline
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def time_remaining() -> Optional[float]:
+    """
+    Get the time left until the deadline of the current request.
+
+    Returns:
+        Optional[float]: Seconds until the deadline (negative once it has passed), or None
+            when the request has no deadline
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+@contextmanager
+def without_deadline() -> Iterator[None]:
+    """Clear the deadline of the work run inside the block, such as work shared with other requests."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """
+    Wait for an awaitable until the deadline of the current request.
+
+    Args:
+        awaitable (Awaitable[T]): The work to wait for; it is cancelled at the deadline
+
+    Returns:
+        T: The result of the awaitable
+
+    Raises:
+        DeadlineExceeded: If the deadline is reached first
+    """
+    remaining = time_remaining()
+    if remaining is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=max(0.0, remaining))
+    except asyncio.TimeoutError as e:
+        raise DeadlineExceeded("Request deadline exceeded") from e
+
+def deadline_margin() -> float:
+    """
+    Get the seconds before the deadline at which a request returns what it has.
+
+    Returns:
+        float: The value of DEADLINE_MARGIN
+    """
+    return float(os.getenv("DEADLINE_MARGIN", "0.5"))
+
+# Outcomes of the requests with a deadline since startup, for the stats endpoint
+_stats: Dict[str, int] = {"complete": 0, "partial": 0, "pending_requirements": 0, "pending_candidate_data": 0}
+_stats_lock = threading.Lock()
+
+def record_deadline_outcome(pending_requirements: int, pending_candidate_data: bool) -> None:
+    """
+    Count the outcome of a request with a deadline.
+
+    Args:
+        pending_requirements (int): The requirements left unassessed at the deadline
+        pending_candidate_data (bool): Whether the candidate data was left unextracted
+    """
+    partial = pending_requirements > 0 or pending_candidate_data
+    DEADLINE_OUTCOMES.labels(outcome="partial" if partial else "complete").inc()
+    with _stats_lock:
+        _stats["partial" if partial else "complete"] += 1
+        _stats["pending_requirements"] += pending_requirements
+        _stats["pending_candidate_data"] += int(pending_candidate_data)
+
+def deadline_stats() -> Dict[str, Any]:
+    """
+    Get the outcomes of the requests with a deadline since startup.
+
+    Returns:
+        Dict[str, Any]: The requests completed before their deadline and the ones returned
+            partial, the requirements and candidate data left pending, and the share of
+            partial requests
+    """
+    with _stats_lock:
+        requests = _stats["complete"] + _stats["partial"]
+        return {**_stats, "partial_rate": round(_stats["partial"] / requests, 4) if requests else 0.0}
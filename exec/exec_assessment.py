@@ -2,22 +2,125 @@
 Assessment Execution Module
 
 This module handles the parallel processing of job requirements against candidate documents.
-It uses a ThreadPoolExecutor to process multiple requirements concurrently while respecting
-a configurable maximum number of worker threads.
+Each requirement runs on the shared pipeline executor as its own asyncio task, so assessments
+overlap without blocking the event loop, while a semaphore caps the number of concurrent
+assessments per request. Across requests, every OpenAI call goes through the process-wide
+scheduler, which enforces the rate limits of each model. Results can be consumed all at
+once (exec_assessment) or one by one as they complete (iter_assessments).
+
+When ASSESSMENT_BATCH_SIZE is greater than 1, requirements are assessed in batches through
+a single LLM call per batch, and any requirement missing or malformed in a batched reply
+falls back to its own per-requirement call.
+
+When ASSESSMENT_RETRIEVAL is enabled, the documents are split and indexed once per request,
+and each assessment only receives the chunks most relevant to its requirements, within
+a configurable token budget.
+
+When ASSESSMENT_PROMPT_LAYOUT is "prefix", the system prompt, format instructions and
+documents are rendered once per request as a shared prompt prefix, and each assessment only
+appends its requirement, so OpenAI can serve the prefix from its prompt cache.
+
+When ASSESSMENT_CASCADE is set, each requirement is first screened by cheaper tiers (a local
+keyword matcher and/or cheaper models), and only the requirements they can't confirm are
+sent to ASSESSMENT_MODEL.
+
+Without retrieval, the documents are packed into the document token budget of
+ASSESSMENT_MODEL (DOCUMENT_TOKEN_BUDGET or DOCUMENT_TOKEN_BUDGET_<MODEL>) once per request,
+truncating the largest ones from their end.
 """
 
-from pipelines import assessment_pipeline, get_format_instructions
-from models import RequirementAssessment
-from typing import List
+from pipelines import get_format_instructions, get_assessment_prompt_layout, render_assessment_prefix, RequirementRetriever, pack_documents, get_document_token_budget, tokens_saved
+from models import RequirementAssessment, IndexedRequirementAssessment
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from haystack import Document
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from haystack.dataclasses import ChatMessage
+from .executor import run_in_executor
+from .cached_pipeline import run_cached_pipeline
+from .cascade import create_cascade
+from observability import stage, record_tokens_saved
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
 
 # Load environment variables at module initialization
 load_dotenv()
 
-def process_requirement(documents: List[Document], requirement: str, format_instructions: str) -> RequirementAssessment:
+logger = logging.getLogger(__name__)
+
+# Configuration that changes the assessments, compared before reusing or sharing results
+ASSESSMENT_CONFIG_VARIABLES = (
+    "ASSESSMENT_MODEL",
+    "ASSESSMENT_PROMPT_LAYOUT",
+    "ASSESSMENT_CASCADE",
+    "ASSESSMENT_BATCH_SIZE",
+    "ASSESSMENT_RETRIEVAL",
+    "DOCUMENT_NORMALIZATION",
+    "DOCUMENT_TOKEN_BUDGET"
+)
+
+def assessment_config() -> List[Optional[str]]:
+    """
+    Get the current assessment configuration.
+
+    Returns:
+        List[Optional[str]]: The value of each of ASSESSMENT_CONFIG_VARIABLES
+    """
+    return [os.getenv(name) for name in ASSESSMENT_CONFIG_VARIABLES]
+
+def select_documents(documents: List[Document], requirements: List[str], retriever: Optional[RequirementRetriever]) -> List[Document]:
+    """
+    Select the documents or chunks to send to the LLM for some requirements.
+    
+    Args:
+        documents (List[Document]): The full documents of the candidate
+        requirements (List[str]): The requirements assessed in the LLM call
+        retriever (Optional[RequirementRetriever]): The request's chunk index, or None when
+            retrieval is disabled
+    
+    Returns:
+        List[Document]: The union of the chunks relevant to each requirement, or the full
+            documents when retrieval is disabled or finds nothing for a requirement
+    """
+    if retriever is None:
+        return documents
+    
+    top_k = int(os.getenv("RETRIEVAL_TOP_K", "5"))
+    token_budget = int(os.getenv("RETRIEVAL_TOKEN_BUDGET", "1500"))
+    selected: Dict[str, Document] = {}
+    for requirement in requirements:
+        chunks = retriever.retrieve(requirement, top_k=top_k, token_budget=token_budget)
+        if chunks is retriever.documents:
+            return documents
+        for chunk in chunks:
+            selected.setdefault(chunk.id, chunk)
+    return sorted(selected.values(), key=lambda chunk: (chunk.meta.get("source_id", ""), chunk.meta.get("split_id", 0)))
+
+def assessment_inputs(documents: List[Document], requirement: str, format_instructions: str, prefix: Optional[List[ChatMessage]] = None) -> Dict[str, Any]:
+    """
+    Get the prompt inputs of the assessment of a requirement, for the configured prompt layout.
+
+    Args:
+        documents (List[Document]): The documents sent with the requirement
+        requirement (str): The job requirement to assess
+        format_instructions (str): Instructions for formatting the assessment output
+        prefix (Optional[List[ChatMessage]]): The shared prompt prefix, with the prefix layout.
+            Rendered from the documents when None.
+
+    Returns:
+        Dict[str, Any]: The inputs of the "assessment_prompt" component
+    """
+    if get_assessment_prompt_layout() == "prefix":
+        if prefix is None:
+            prefix = render_assessment_prefix(documents, format_instructions)
+        return {"prefix": prefix, "requirement": requirement}
+    return {
+        "documents": documents,
+        "requirement": requirement,
+        "format_instructions": format_instructions
+    }
+
+async def process_requirement(documents: List[Document], requirement: str, format_instructions: str, bypass_cache: bool = False, retriever: Optional[RequirementRetriever] = None, prefix: Optional[List[ChatMessage]] = None, pipeline_name: str = "assessment") -> RequirementAssessment:
     """
     Process a single job requirement against the provided documents.
     
@@ -25,61 +128,222 @@ def process_requirement(documents: List[Document], requirement: str, format_inst
         documents (List[Document]): List of Haystack documents containing candidate information
         requirement (str): The job requirement to assess
         format_instructions (str): Instructions for formatting the assessment output
+        bypass_cache (bool): Skip the LLM response cache lookup
+        retriever (Optional[RequirementRetriever]): Chunk index used to send only the relevant
+            parts of the documents
+        prefix (Optional[List[ChatMessage]]): The prompt prefix shared by the assessments of the
+            request, with the prefix layout. Rendered for this call when None.
+        pipeline_name (str): The assessment pipeline to run, such as the screening pipeline of
+            a cascade tier
     
     Returns:
         RequirementAssessment: Assessment result for the given requirement
     """
-    requirement_result = assessment_pipeline.run({
+    if retriever is not None:
+        documents = await run_in_executor(select_documents, documents, [requirement], retriever)
+    if get_assessment_prompt_layout() == "prefix" and (prefix is None or retriever is not None):
+        # Retrieved chunks differ per requirement, so their prefix can't be shared
+        prefix = await run_in_executor(render_assessment_prefix, documents, format_instructions)
+    inputs = assessment_inputs(documents, requirement, format_instructions, prefix)
+    return await run_cached_pipeline(pipeline_name, "assessment_prompt", inputs, bypass_cache=bypass_cache)
+
+async def process_requirement_batch(documents: List[Document], requirements: List[str], format_instructions: str, bypass_cache: bool = False, retriever: Optional[RequirementRetriever] = None) -> Dict[int, RequirementAssessment]:
+    """
+    Process a batch of job requirements against the provided documents in a single LLM call.
+    
+    Args:
+        documents (List[Document]): List of Haystack documents containing candidate information
+        requirements (List[str]): The job requirements to assess in this batch
+        format_instructions (str): Instructions for formatting each assessment of the batch
+        bypass_cache (bool): Skip the LLM response cache lookup
+        retriever (Optional[RequirementRetriever]): Chunk index used to send only the relevant
+            parts of the documents
+    
+    Returns:
+        Dict[int, RequirementAssessment]: Assessment results keyed by the index of the requirement
+            in the batch. Requirements missing from the reply, or whose item was malformed, are
+            not included.
+    """
+    if retriever is not None:
+        documents = await run_in_executor(select_documents, documents, requirements, retriever)
+    batch_result = await run_cached_pipeline("batch_assessment", "assessment_prompt", {
         "documents": documents,
-        "requirement": requirement,
+        "requirements": requirements,
         "format_instructions": format_instructions
-    })
-    return requirement_result["llm_to_model"]["model"]
+    }, bypass_cache=bypass_cache)
+    assessments = {}
+    for item in batch_result.assessments:
+        if 0 <= item.index < len(requirements) and item.index not in assessments:
+            assessments[item.index] = RequirementAssessment(
+                requirement=requirements[item.index],
+                present_in_documents=item.present_in_documents,
+                inquiry=item.inquiry
+            )
+    return assessments
 
-async def exec_assessment(documents: List[Document], requirements: List[str]) -> List[RequirementAssessment]:
+async def exec_assessment(documents: List[Document], requirements: List[str], bypass_cache: bool = False, semaphore: Optional[asyncio.Semaphore] = None) -> List[RequirementAssessment]:
     """
     Execute assessment of multiple job requirements in parallel.
     
-    This function processes multiple job requirements concurrently using a thread pool,
-    with the maximum number of concurrent operations controlled by the MAX_WORKERS
-    environment variable.
+    This function schedules every requirement on the shared pipeline executor without
+    blocking the event loop. The maximum number of concurrent assessments for the request
+    is controlled by the MAX_WORKERS environment variable, and the number of requirements
+    assessed per LLM call by the ASSESSMENT_BATCH_SIZE environment variable.
     
     Args:
         documents (List[Document]): List of Haystack documents containing candidate information
         requirements (List[str]): List of job requirements to assess
+        bypass_cache (bool): Skip the LLM response cache lookup for this request
+        semaphore (Optional[asyncio.Semaphore]): Concurrency budget shared with other requests,
+            such as the other candidates of a batch. Defaults to a per-request budget of MAX_WORKERS.
     
     Returns:
-        List[RequirementAssessment]: List of assessment results for each requirement
+        List[RequirementAssessment]: List of assessment results, in the same order as the requirements
+    
+    Raises:
+        Exception: If any requirement processing fails, with details about which requirement caused the error
+    """
+    results: Dict[int, RequirementAssessment] = {}
+    async for index, assessment in iter_assessments(documents, requirements, bypass_cache=bypass_cache, semaphore=semaphore):
+        results[index] = assessment
+    return [results[index] for index in range(len(requirements))]
+
+async def iter_assessments(documents: List[Document], requirements: List[str], bypass_cache: bool = False, semaphore: Optional[asyncio.Semaphore] = None) -> AsyncIterator[Tuple[int, RequirementAssessment]]:
+    """
+    Assess multiple job requirements in parallel, yielding each result as soon as it completes.
+    
+    Takes the same arguments and configuration as exec_assessment. If any requirement fails,
+    the remaining assessments are cancelled and the error is raised.
+    
+    Args:
+        documents (List[Document]): List of Haystack documents containing candidate information
+        requirements (List[str]): List of job requirements to assess
+        bypass_cache (bool): Skip the LLM response cache lookup for this request
+        semaphore (Optional[asyncio.Semaphore]): Concurrency budget shared with other requests
+    
+    Yields:
+        Tuple[int, RequirementAssessment]: The index of the requirement and its assessment,
+            in completion order
     
     Raises:
         Exception: If any requirement processing fails, with details about which requirement caused the error
     """
     # Get formatting instructions for the RequirementAssessment model
     format_instructions = get_format_instructions(RequirementAssessment)
-    results = []
     
     # Get max_workers from environment variable, default to 4 if not set
-    max_workers = int(os.getenv("MAX_WORKERS", "4"))
-    
-    # Using ThreadPoolExecutor with configured max_workers
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all requirements for processing
-        future_to_requirement = {
-            executor.submit(
-                process_requirement, 
-                documents, 
-                requirement, 
-                format_instructions
-            ): requirement for requirement in requirements
-        }
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_requirement):
-            requirement = future_to_requirement[future]
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                raise Exception(f'Error processing requirement "{requirement}": {str(e)}')
-
-    return results
+    if semaphore is None:
+        max_workers = int(os.getenv("MAX_WORKERS", "4"))
+        semaphore = asyncio.Semaphore(max_workers)
+    
+    # Get batch size from environment variable, default to 1 (one call per requirement)
+    batch_size = int(os.getenv("ASSESSMENT_BATCH_SIZE", "1"))
+    
+    # Split and index the documents once for the whole request when retrieval is enabled
+    retriever = None
+    if os.getenv("ASSESSMENT_RETRIEVAL", "false").lower() == "true":
+        retriever = await run_in_executor(
+            RequirementRetriever,
+            documents,
+            chunk_words=int(os.getenv("RETRIEVAL_CHUNK_WORDS", "120")),
+            chunk_overlap=int(os.getenv("RETRIEVAL_CHUNK_OVERLAP", "20"))
+        )
+    
+    # Without retrieval, every assessment carries the whole documents: pack them into the budget once
+    saved = 0
+    if retriever is None:
+        documents = await run_in_executor(pack_documents, documents, get_document_token_budget(os.getenv("ASSESSMENT_MODEL", "gpt-4")))
+        saved = tokens_saved(documents)
+    
+    # Render the shared prompt prefix once for every assessment of the request
+    prefix = None
+    if retriever is None and get_assessment_prompt_layout() == "prefix":
+        prefix = await run_in_executor(render_assessment_prefix, documents, format_instructions)
+    
+    # Screen requirements with the cheaper tiers first when the cascade is enabled
+    cascade = await create_cascade(documents, bypass_cache=bypass_cache, retriever=retriever)
+    
+    # Every assessment puts its (index, result) pair, or its error, on the queue when done
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def assess(index: int, screened: bool = False) -> None:
+        requirement = requirements[index]
+        async with semaphore:
+            with stage("assessment", index=index):
+                try:
+                    result = None
+                    if cascade is not None and not screened:
+                        result = await cascade.screen(requirement)
+                    if result is None:
+                        result = await process_requirement(
+                            documents,
+                            requirement,
+                            format_instructions,
+                            bypass_cache,
+                            retriever,
+                            prefix
+                        )
+                        record_tokens_saved("assessment", saved)
+                        if cascade is not None:
+                            cascade.record_final()
+                except Exception as e:
+                    queue.put_nowait(Exception(f'Error processing requirement "{requirement}": {str(e)}'))
+                    return
+        queue.put_nowait((index, result))
+    
+    batch_format_instructions = get_format_instructions(IndexedRequirementAssessment)
+    
+    async def assess_batch(start: int) -> None:
+        indexes = list(range(start, min(start + batch_size, len(requirements))))
+        if cascade is not None:
+            # Only the requirements the screening tiers can't confirm go into the batch
+            async def screen(index: int) -> Optional[RequirementAssessment]:
+                async with semaphore:
+                    return await cascade.screen(requirements[index])
+            screened = await asyncio.gather(*(screen(index) for index in indexes))
+            for index, result in zip(indexes, screened):
+                if result is not None:
+                    queue.put_nowait((index, result))
+            indexes = [index for index, result in zip(indexes, screened) if result is None]
+            if not indexes:
+                return
+        batch = [requirements[index] for index in indexes]
+        async with semaphore:
+            with stage("assessment_batch", start=start, requirements=len(batch)):
+                try:
+                    batch_results = await process_requirement_batch(
+                        documents,
+                        batch,
+                        batch_format_instructions,
+                        bypass_cache,
+                        retriever
+                    )
+                    record_tokens_saved("assessment", saved)
+                except Exception as e:
+                    logger.warning("Batched assessment failed, falling back to per-requirement calls: %s", e)
+                    batch_results = {}
+        for position, result in batch_results.items():
+            if cascade is not None:
+                cascade.record_final()
+            queue.put_nowait((indexes[position], result))
+        # Requirements missing or malformed in the batched reply get their own call
+        await asyncio.gather(*(assess(indexes[position], screened=True) for position in range(len(batch)) if position not in batch_results))
+    
+    if batch_size <= 1:
+        tasks = [asyncio.create_task(assess(index)) for index in range(len(requirements))]
+    else:
+        tasks = [asyncio.create_task(assess_batch(start)) for start in range(0, len(requirements), batch_size)]
+    
+    try:
+        for _ in range(len(requirements)):
+            item = await queue.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        # The cancelled assessments stop using the retriever before it is closed
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if retriever is not None:
+            retriever.close()
@@ -0,0 +1,73 @@
+"""
+Batch Execution Module
+
+This module handles the screening of many candidates against a single job posting.
+The documents of all candidates are loaded in parallel, every LLM call of the batch
+(candidate extraction and requirement assessments) shares one concurrency budget, and
+each candidate's result is yielded as soon as it is ready instead of buffering the
+whole batch.
+"""
+
+import asyncio
+import os
+from typing import AsyncIterator, Dict, List
+from dotenv import load_dotenv
+from models import ProcessOutput, CandidateProcessOutput
+from models.process_input import ProcessInput
+from .executor import run_in_executor
+from .exec_load_documents import exec_load_uploaded_documents, UploadedFile
+from .exec_candidate_data import exec_candidate_data
+from .exec_assessment import exec_assessment
+
+# Load environment variables at module initialization
+load_dotenv()
+
+async def exec_batch(
+    candidates: Dict[str, List[UploadedFile]],
+    process_input: ProcessInput
+) -> AsyncIterator[CandidateProcessOutput]:
+    """
+    Process many candidates against one set of job requirements.
+
+    The number of concurrent LLM calls across the whole batch is controlled by the
+    BATCH_MAX_CONCURRENCY environment variable.
+
+    Args:
+        candidates (Dict[str, List[UploadedFile]]): The uploaded files of each candidate,
+            keyed by candidate id
+        process_input (ProcessInput): The job requirements and processing parameters shared
+            by all candidates
+
+    Yields:
+        CandidateProcessOutput: The result of each candidate, in completion order. A candidate
+            that fails is reported with its error and doesn't stop the batch.
+
+    Example:
+        >>> async for output in exec_batch({"c1": uploads}, process_input):
+        ...     print(output.model_dump_json())
+    """
+    # One concurrency budget for every LLM call of the batch
+    semaphore = asyncio.Semaphore(int(os.getenv("BATCH_MAX_CONCURRENCY", "16")))
+
+    async def process_candidate(candidate_id: str, uploads: List[UploadedFile]) -> CandidateProcessOutput:
+        try:
+            documents = await run_in_executor(exec_load_uploaded_documents, uploads)
+            candidate_data, assessments = await asyncio.gather(
+                exec_candidate_data(documents, bypass_cache=process_input.bypass_cache, semaphore=semaphore),
+                exec_assessment(documents, process_input.job_requirements, bypass_cache=process_input.bypass_cache, semaphore=semaphore)
+            )
+            return CandidateProcessOutput(
+                candidate_id=candidate_id,
+                result=ProcessOutput(candidate_data=candidate_data, requirements_assessment=assessments)
+            )
+        except Exception as e:
+            return CandidateProcessOutput(candidate_id=candidate_id, error=str(e))
+
+    tasks = [asyncio.create_task(process_candidate(candidate_id, uploads)) for candidate_id, uploads in candidates.items()]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        # Stop the remaining work if the consumer goes away (e.g. the client disconnects)
+        for task in tasks:
+            task.cancel()
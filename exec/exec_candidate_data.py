@@ -2,15 +2,130 @@
 Candidate Data Extraction Module
 
 This module handles the extraction of structured candidate information from documents
-using the Haystack pipeline and LLM processing.
+using the Haystack pipeline and LLM processing. The pipeline runs on the shared executor
+so the extraction overlaps with the requirement assessments, and its OpenAI call has
+priority over theirs in the scheduler.
+
+When CANDIDATE_EXTRACTION_MODE is "map_reduce", documents longer than the chunk budget are
+split by file, page and section, the candidate data of each chunk is extracted concurrently,
+and the results are merged in Python: contact fields come from the first chunk that has
+them, and experiences are deduplicated by company, title and date range. Extraction time
+then depends on the concurrency rather than on the length of the documents.
+
+In single mode, the documents are packed into the document token budget of
+CANDIDATE_DATA_MODEL, truncating the largest ones from their end.
+
+The extraction is configured with the following environment variables:
+    - CANDIDATE_EXTRACTION_MODE: single (one call with every document) or map_reduce
+    - CANDIDATE_EXTRACTION_CHUNK_TOKENS: Maximum estimated tokens of a chunk in map_reduce mode
+    - DOCUMENT_TOKEN_BUDGET / DOCUMENT_TOKEN_BUDGET_<MODEL>: Token budget of the documents in single mode
 """
 
-from pipelines import candidate_data_pipeline, get_format_instructions
-from models import CandidateData
+import asyncio
+import contextlib
+import os
+import re
+from dotenv import load_dotenv
+from pipelines import get_format_instructions, split_candidate_documents, pack_documents, get_document_token_budget, tokens_saved
+from models import CandidateData, Experience
 from haystack import Document
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
+from .cached_pipeline import run_cached_pipeline
+from .executor import run_in_executor
+from .scheduler import Priority
+from observability import stage, record_tokens_saved
+
+# Load environment variables at module initialization
+load_dotenv()
+
+# Fields taken from the first chunk that has them
+CONTACT_FIELDS = ("first_name", "last_name", "email", "phone", "linkedin")
 
-async def exec_candidate_data(documents: List[Document]) -> CandidateData:
+# Words meaning an experience is ongoing, normalized to the same end date
+ONGOING_END_DATES = {"present", "current", "now", "today", "ongoing"}
+
+def _normalize(value: Optional[str]) -> str:
+    return re.sub(r"[^0-9a-z]+", " ", (value or "").lower()).strip()
+
+def _experience_key(experience: Experience) -> Tuple[str, str, str, str]:
+    end_date = _normalize(experience.end_date)
+    return (
+        _normalize(experience.company),
+        _normalize(experience.title),
+        _normalize(experience.start_date),
+        "present" if end_date in ONGOING_END_DATES else end_date
+    )
+
+def merge_candidate_data(parts: List[CandidateData]) -> CandidateData:
+    """
+    Merge the candidate data extracted from the chunks of the documents.
+
+    The merge is deterministic: contact fields come from the first chunk that has them,
+    and experiences keep the order of the chunks. Experiences with the same company, title
+    and date range (compared case-, punctuation- and whitespace-insensitively) are merged,
+    the first one found filling its missing fields from the others. Experiences without
+    company nor title, such as the tail of an experience cut by a chunk, are dropped.
+
+    Args:
+        parts (List[CandidateData]): The candidate data of each chunk, in document order
+
+    Returns:
+        CandidateData: The candidate data of the whole documents
+    """
+    contact = {
+        field: next((getattr(part, field) for part in parts if getattr(part, field)), None)
+        for field in CONTACT_FIELDS
+    }
+    experiences = {}
+    for part in parts:
+        for experience in part.experiences:
+            if not experience.company and not experience.title:
+                continue
+            key = _experience_key(experience)
+            if key not in experiences:
+                experiences[key] = experience.model_copy()
+                continue
+            merged = experiences[key]
+            for field, value in experience.model_dump().items():
+                if value and not getattr(merged, field):
+                    setattr(merged, field, value)
+    return CandidateData(**contact, experiences=list(experiences.values()))
+
+def candidate_data_inputs(documents: List[Document]) -> Dict[str, Any]:
+    """
+    Get the prompt inputs of the extraction of the candidate data of some documents.
+
+    Args:
+        documents (List[Document]): The documents, or the chunk, to extract from
+
+    Returns:
+        Dict[str, Any]: The inputs of the "candidate_prompt" component
+    """
+    return {"documents": documents, "format_instructions": get_format_instructions(CandidateData)}
+
+def candidate_data_chunks(documents: List[Document]) -> List[List[Document]]:
+    """
+    Split documents into the document lists extracted by separate calls, as configured by
+    CANDIDATE_EXTRACTION_MODE.
+
+    Args:
+        documents (List[Document]): The documents of the candidate
+
+    Returns:
+        List[List[Document]]: A single list with every document, packed into the token
+            budget of CANDIDATE_DATA_MODEL, in single mode (or when they fit in one chunk),
+            otherwise one list per chunk
+    """
+    if os.getenv("CANDIDATE_EXTRACTION_MODE", "single").lower() != "map_reduce":
+        return [pack_documents(documents, get_document_token_budget(os.getenv("CANDIDATE_DATA_MODEL", "gpt-4")))]
+    chunks = split_candidate_documents(documents, int(os.getenv("CANDIDATE_EXTRACTION_CHUNK_TOKENS", "2000")))
+    return [documents] if chunks is documents else [[chunk] for chunk in chunks]
+
+async def _extract(documents: List[Document], bypass_cache: bool) -> CandidateData:
+    # Every result needs the candidate data, so its call goes ahead of queued assessments
+    return await run_cached_pipeline("candidate_data", "candidate_prompt", candidate_data_inputs(documents), bypass_cache=bypass_cache, priority=Priority.CANDIDATE_DATA)
+
+async def exec_candidate_data(documents: List[Document], bypass_cache: bool = False, semaphore: Optional[asyncio.Semaphore] = None) -> CandidateData:
     """
     Extract structured candidate data from provided documents.
 
@@ -21,6 +136,10 @@ async def exec_candidate_data(documents: List[Document]) -> CandidateData:
         documents (List[Document]): List of Haystack documents containing the candidate's
             resume or other relevant documents. Each document should have content and
             metadata accessible.
+        bypass_cache (bool): Skip the LLM response cache lookup for this request.
+        semaphore (Optional[asyncio.Semaphore]): Concurrency budget shared with other LLM calls,
+            such as the one of a batch of candidates. In map_reduce mode, each chunk takes
+            its own slot.
 
     Returns:
         CandidateData: A structured object containing the extracted candidate information,
@@ -31,8 +150,17 @@ async def exec_candidate_data(documents: List[Document]) -> CandidateData:
         >>> candidate_data = await exec_candidate_data(docs)
         >>> print(f"Candidate name: {candidate_data.first_name} {candidate_data.last_name}")
     """
-    results = candidate_data_pipeline.run({
-        "documents": documents,
-        "format_instructions": get_format_instructions(CandidateData)
-    })
-    return results["llm_to_model"]["model"]
\ No newline at end of file
+    chunks = await run_in_executor(candidate_data_chunks, documents)
+    # Chunks carry the meta of their whole document, so the savings of split documents are the documents'
+    record_tokens_saved("candidate_data", tokens_saved(chunks[0] if len(chunks) == 1 else documents))
+
+    async def extract(chunk_documents: List[Document]) -> CandidateData:
+        async with semaphore or contextlib.nullcontext():
+            return await _extract(chunk_documents, bypass_cache)
+
+    with stage("candidate_data", documents=len(documents), chunks=len(chunks)):
+        # Documents that fit in one chunk are extracted with the same single call as before
+        if len(chunks) == 1:
+            return await extract(chunks[0])
+        parts = await asyncio.gather(*(extract(chunk) for chunk in chunks))
+        return merge_candidate_data(list(parts))
@@ -4,36 +4,174 @@ Document Loading Module
 This module handles the loading and initial processing of document files (PDFs, etc.)
 using Haystack's document processing pipeline. It converts various file formats into
 a unified Document representation for further processing.
+
+Uploaded files go through a content-addressed document cache first, so files that were
+already converted (same bytes) skip conversion entirely. The others are fed to the
+converters straight from memory as ByteStreams, or from their path when they are files
+on disk (such as the files of bulk screening). When CONVERSION_WORKERS is not 0, conversion runs on the
+process pool of the conversion engine instead of in-thread.
+
+When DOCUMENT_NORMALIZATION is enabled, the documents of each file are cleaned right after
+conversion, so the document cache holds cleaned documents. Near-duplicate documents and
+paragraphs are then dropped across the files of the request, which depends on every file
+and is never cached.
 """
 
-from typing import List
-from pipelines import load_documents_pipeline
+import mimetypes
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
 from haystack import Document
+from haystack.dataclasses import ByteStream
+from cache import get_cached_documents, cache_documents
+from pipelines import create_document_normalizer, normalization_enabled
+from .conversion_engine import get_conversion_engine
+from .runtime import get_runtime
+from observability import stage, record_normalization
+
+# Meta key used to map converted documents back to their upload
+UPLOAD_HASH_META_KEY = "_upload_sha256"
+
+# Prefix of the document cache keys of cleaned documents, so raw conversions cached before
+# normalization was enabled are not reused
+NORMALIZED_CACHE_KEY_PREFIX = "normalized:"
 
-def exec_load_documents(file_paths: List[str]) -> List[Document]:
+@dataclass
+class UploadedFile:
     """
-    Load and process documents from provided file paths.
+    An uploaded file, held in memory or read from a file on disk.
+
+    Attributes:
+        filename (str): The original filename, used as the file_path meta of its documents
+        sha256 (str): The SHA-256 of the file bytes, used as its document cache key
+        size (int): The size of the file in bytes
+        data (Optional[bytes]): The file bytes, when the file is held in memory
+        path (Optional[str]): The path of the file, when it is read from disk
+        content_type (Optional[str]): The content type sent by the client
+    """
+    filename: str
+    sha256: str
+    size: int
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    content_type: Optional[str] = None
+
+    @property
+    def mime_type(self) -> Optional[str]:
+        """The MIME type of the file, guessed from its filename first"""
+        return mimetypes.guess_type(self.filename)[0] or self.content_type
 
-    This function takes a list of file paths, processes each file through the appropriate
+    def to_source(self) -> Union[str, ByteStream]:
+        """Get the source to feed to the converters: a ByteStream in memory, or the file path"""
+        if self.data is not None:
+            return ByteStream(data=self.data, mime_type=self.mime_type)
+        return self.path
+
+def exec_load_documents(sources: List[Union[str, Path, ByteStream]], meta: Optional[List[Dict[str, Any]]] = None) -> List[Document]:
+    """
+    Load and process documents from provided file paths or byte streams.
+
+    This function takes a list of sources, processes each file through the appropriate
     document loader (based on file type), and returns a list of Haystack Document objects.
     The pipeline automatically handles different file types and extracts their content.
 
     Args:
-        file_paths (List[str]): List of paths to the documents to be processed. 
+        sources (List[Union[str, Path, ByteStream]]): List of paths to the documents to be
+            processed, or ByteStreams with their content and MIME type.
             Supports multiple file types (PDF, DOCX, etc.).
+        meta (Optional[List[Dict[str, Any]]]): Metadata to add to the documents of each source.
 
     Returns:
         List[Document]: A list of processed Haystack Document objects, each containing
-            the content and metadata of the original files.
+            the content and metadata of the original files, cleaned when normalization
+            is enabled.
 
     Example:
         >>> files = ["/path/to/resume1.pdf", "/path/to/resume2.pdf"]
         >>> documents = exec_load_documents(files)
         >>> print(f"Loaded {len(documents)} documents")
     """
-    results = load_documents_pipeline.run({
-        "file_type_router": {
-            "sources": file_paths
-        }
-    })
-    return results["joiner"]["documents"]
\ No newline at end of file
+    engine = get_conversion_engine()
+    with stage("conversion", files=len(sources), engine=engine is not None):
+        if engine is not None:
+            documents = engine.convert(sources, meta)
+            if not normalization_enabled():
+                return documents
+            # The engine converts without the pipeline, so it is cleaned like the pipeline does
+            results = {"normalizer": create_document_normalizer(dedupe=False).run(documents)}
+        else:
+            with get_runtime().pipeline("load_documents") as load_documents_pipeline:
+                results = load_documents_pipeline.run({
+                    "file_type_router": {
+                        "sources": sources,
+                        "meta": meta
+                    }
+                })
+    if "normalizer" not in results:
+        return results["joiner"]["documents"]
+    record_normalization(results["normalizer"]["report"])
+    return results["normalizer"]["documents"]
+
+def _document_cache_key(upload: UploadedFile, normalized: bool) -> str:
+    return NORMALIZED_CACHE_KEY_PREFIX + upload.sha256 if normalized else upload.sha256
+
+def exec_load_uploaded_documents(uploads: List[UploadedFile]) -> List[Document]:
+    """
+    Load documents from uploaded files, converting only the files that are not cached.
+
+    Each file is keyed by the SHA-256 of its bytes. Cached files return their converted
+    documents directly; the others are converted without writing them to disk (files on
+    disk are read from their path) and added to the cache. When normalization is
+    enabled, near-duplicate documents and paragraphs across the files are then dropped.
+
+    Args:
+        uploads (List[UploadedFile]): The uploaded files
+
+    Returns:
+        List[Document]: The documents of all files, in upload order. Their file_path meta
+            is the original filename, and their raw_tokens meta the estimated tokens of
+            their text before normalization.
+
+    Example:
+        >>> uploads = [UploadedFile(filename="resume.pdf", sha256=hash_file(data), size=len(data), data=data)]
+        >>> documents = exec_load_uploaded_documents(uploads)
+    """
+    normalized = normalization_enabled()
+    with stage("load_documents", files=len(uploads)):
+        documents_by_hash: Dict[str, List[Document]] = {}
+        uploads_to_convert: Dict[str, UploadedFile] = {}
+
+        for upload in uploads:
+            if upload.sha256 in documents_by_hash or upload.sha256 in uploads_to_convert:
+                continue
+            cached = get_cached_documents(_document_cache_key(upload, normalized), {"file_path": upload.filename})
+            if cached is not None:
+                documents_by_hash[upload.sha256] = cached
+            else:
+                uploads_to_convert[upload.sha256] = upload
+
+        if uploads_to_convert:
+            converted: Dict[str, List[Document]] = {file_hash: [] for file_hash in uploads_to_convert}
+            documents = exec_load_documents(
+                [upload.to_source() for upload in uploads_to_convert.values()],
+                [{"file_path": upload.filename, UPLOAD_HASH_META_KEY: file_hash} for file_hash, upload in uploads_to_convert.items()]
+            )
+            for document in documents:
+                meta = {key: value for key, value in document.meta.items() if key != UPLOAD_HASH_META_KEY}
+                converted[document.meta[UPLOAD_HASH_META_KEY]].append(Document(content=document.content, meta=meta))
+            for file_hash, file_documents in converted.items():
+                # Files that failed to convert produce no documents and are not cached
+                if file_documents:
+                    cache_documents(_document_cache_key(uploads_to_convert[file_hash], normalized), file_documents)
+            documents_by_hash.update(converted)
+
+        documents = []
+        for file_hash in dict.fromkeys(upload.sha256 for upload in uploads):
+            documents.extend(documents_by_hash[file_hash])
+
+    if normalized and documents:
+        with stage("normalize", documents=len(documents)):
+            result = create_document_normalizer(clean=False).run(documents)
+        record_normalization(result["report"])
+        documents = result["documents"]
+    return documents
@@ -0,0 +1,85 @@
+"""
+Candidate Session Execution Module
+
+This module creates candidate sessions and assesses them against job requirements,
+reusing the assessments of the requirements that didn't change since their last assessment.
+Requirements are matched after normalizing their whitespace, and prior assessments are only
+reused while the assessment configuration (model, prompt layout, cascade, batching and
+retrieval) is the same as when they were made.
+"""
+
+import time
+import uuid
+from typing import List, Tuple
+from haystack import Document
+from cache import CandidateSession, normalize_requirement, save_session
+from models import RequirementAssessment
+from .exec_assessment import assessment_config, exec_assessment
+from .exec_candidate_data import exec_candidate_data
+from .executor import run_in_executor
+
+async def exec_create_session(documents: List[Document], bypass_cache: bool = False) -> CandidateSession:
+    """
+    Extract the candidate data of some documents and store them as a new candidate session.
+
+    Args:
+        documents (List[Document]): The documents of the candidate
+        bypass_cache (bool): Skip the LLM response cache lookup of the extraction
+
+    Returns:
+        CandidateSession: The stored session, without assessments
+    """
+    candidate_data = await exec_candidate_data(documents, bypass_cache=bypass_cache)
+    session = CandidateSession(
+        id=uuid.uuid4().hex,
+        documents=documents,
+        candidate_data=candidate_data.model_dump(),
+        assessments={},
+        assessment_config=assessment_config(),
+        created_at=time.time()
+    )
+    await run_in_executor(save_session, session)
+    return session
+
+async def exec_session_assessment(
+    session: CandidateSession,
+    requirements: List[str],
+    bypass_cache: bool = False
+) -> Tuple[List[RequirementAssessment], int]:
+    """
+    Assess a candidate session against job requirements, assessing only the new or changed ones.
+
+    The session is updated and stored with the assessments of these requirements; the
+    assessments of requirements no longer listed are dropped.
+
+    Args:
+        session (CandidateSession): The candidate session
+        requirements (List[str]): The job requirements
+        bypass_cache (bool): Assess every requirement again, skipping prior assessments
+            and the LLM response cache lookup
+
+    Returns:
+        Tuple[List[RequirementAssessment], int]: The assessment of each requirement, in the
+            order of the requirements, and how many of them were reused
+    """
+    config = assessment_config()
+    if session.assessment_config != config:
+        session.assessments = {}
+        session.assessment_config = config
+
+    keys = [normalize_requirement(requirement) for requirement in requirements]
+    # First wording of each requirement to assess, in order
+    pending = {}
+    for key, requirement in zip(keys, requirements):
+        if (bypass_cache or key not in session.assessments) and key not in pending:
+            pending[key] = requirement
+
+    if pending:
+        assessments = await exec_assessment(session.documents, list(pending.values()), bypass_cache=bypass_cache)
+        for key, assessment in zip(pending, assessments):
+            session.assessments[key] = assessment.model_dump()
+
+    session.assessments = {key: session.assessments[key] for key in keys}
+    await run_in_executor(save_session, session)
+    reused = sum(1 for key in keys if key not in pending)
+    return [RequirementAssessment(**session.assessments[key]) for key in keys], reused
@@ -0,0 +1,60 @@
+"""
+Streaming Execution Module
+
+This module runs candidate data extraction and requirement assessments concurrently and
+yields each result the moment it completes, so clients can render results within one LLM
+round trip instead of waiting for the slowest requirement.
+"""
+
+import asyncio
+from typing import AsyncIterator, List, Tuple
+from haystack import Document
+from pydantic import BaseModel
+from models import AssessmentEvent
+from .exec_candidate_data import exec_candidate_data
+from .exec_assessment import iter_assessments
+
+async def exec_stream(documents: List[Document], requirements: List[str], bypass_cache: bool = False) -> AsyncIterator[Tuple[str, BaseModel]]:
+    """
+    Extract candidate data and assess requirements, yielding results as they complete.
+
+    Args:
+        documents (List[Document]): List of Haystack documents containing candidate information
+        requirements (List[str]): List of job requirements to assess
+        bypass_cache (bool): Skip the LLM response cache lookup for this request
+
+    Yields:
+        Tuple[str, BaseModel]: The event name and its payload: ("candidate_data", CandidateData)
+            once, and ("assessment", AssessmentEvent) for each requirement, in completion order
+
+    Raises:
+        Exception: If candidate extraction or any requirement assessment fails
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def extract_candidate_data() -> None:
+        queue.put_nowait(("candidate_data", await exec_candidate_data(documents, bypass_cache=bypass_cache)))
+
+    async def assess_requirements() -> None:
+        async for index, assessment in iter_assessments(documents, requirements, bypass_cache=bypass_cache):
+            queue.put_nowait(("assessment", AssessmentEvent(index=index, assessment=assessment)))
+
+    async def produce(coroutine) -> None:
+        try:
+            await coroutine
+        except Exception as e:
+            queue.put_nowait(e)
+
+    tasks = [
+        asyncio.create_task(produce(extract_candidate_data())),
+        asyncio.create_task(produce(assess_requirements()))
+    ]
+    try:
+        for _ in range(len(requirements) + 1):
+            item = await queue.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
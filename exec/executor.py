@@ -0,0 +1,76 @@
+"""
+Executor Module
+
+This module owns the shared, bounded thread pool used to run the blocking Haystack
+pipelines (document conversion, OpenAI calls) off the asyncio event loop. Running
+them through this executor lets candidate extraction and every requirement assessment
+overlap for real, while the worker keeps serving other requests (including /health)
+as it waits on the model.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+from dotenv import load_dotenv
+
+# Load environment variables at module initialization
+load_dotenv()
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Get the process-wide executor, creating it on first use.
+
+    The pool size is controlled by the PIPELINE_EXECUTOR_WORKERS environment variable
+    and bounds the number of blocking pipeline runs across all in-flight requests.
+
+    Returns:
+        ThreadPoolExecutor: The shared executor
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            max_workers = int(os.getenv("PIPELINE_EXECUTOR_WORKERS", "32"))
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline")
+        return _executor
+
+def shutdown_executor(wait: bool = True) -> None:
+    """
+    Shut down the shared executor, if it was created.
+
+    Args:
+        wait (bool): Whether to wait for running pipeline calls to finish
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+async def run_in_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking callable on the shared executor and await its result.
+
+    The caller's context variables are copied into the worker thread so request-scoped
+    state keeps flowing into the pipeline call.
+
+    Args:
+        func (Callable): The blocking function to run
+        *args: Positional arguments for the function
+        **kwargs: Keyword arguments for the function
+
+    Returns:
+        The value returned by the function
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
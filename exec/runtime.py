@@ -0,0 +1,271 @@
+"""
+Runtime Module
+
+This module owns the long-lived resources shared by every request: the pipeline executor,
+a pooled HTTP client used by all OpenAI generators, and a pool of pipeline instances for
+each pipeline of the service. The runtime is started in the FastAPI lifespan and shut down
+with the application, so no request pays for building executors, pipelines or connections.
+
+Haystack pipelines are not meant to be run from several threads at once, so each blocking
+pipeline run checks out its own instance from the pool and returns it when done. Instances
+are created on demand, up to the pool size, and all of them send their OpenAI requests
+through the same keep-alive connection pool.
+
+The OpenAI client and the document converters are imported when the first pipeline using
+them is built, not with the service. The lifespan warms the runtime up, building one
+instance of each pipeline before the first request, so no request pays for the imports or
+the construction. A preloaded server imports them once in its master process instead, and
+its workers share them copy-on-write.
+
+The runtime is configured with the following environment variables:
+    - OPENAI_MAX_CONNECTIONS: Maximum open connections to the OpenAI API
+    - OPENAI_KEEPALIVE_EXPIRY: Seconds an idle connection is kept open for reuse
+    - PIPELINE_POOL_SIZE: Maximum instances of each pipeline (defaults to the executor size)
+    - PIPELINE_WARMUP: Whether the lifespan builds one instance of each pipeline (true/false)
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, Optional
+import httpx
+from dotenv import load_dotenv
+from haystack import Pipeline
+from models import ScreeningAssessment
+from pipelines import (
+    KEYWORD_TIER,
+    create_assessment_pipeline,
+    create_batch_assessment_pipeline,
+    create_candidate_data_pipeline,
+    create_load_documents_pipeline,
+    get_assessment_cascade
+)
+from observability import startup_report
+from .executor import get_executor, shutdown_executor
+
+# Load environment variables at module initialization
+load_dotenv()
+
+def screening_pipeline_name(model: str) -> str:
+    """
+    Get the name of the screening pipeline pool of a model tier of the assessment cascade.
+
+    Args:
+        model (str): The model of the tier
+
+    Returns:
+        str: The name of its pipeline pool
+    """
+    return f"screening:{model}"
+
+class PipelinePool:
+    """
+    A bounded pool of instances of one pipeline, created on demand and reused across calls.
+
+    Attributes:
+        max_size (int): Maximum number of instances of the pipeline
+    """
+
+    def __init__(self, factory: Callable[[], Pipeline], max_size: int):
+        """
+        Initialize an empty pool.
+
+        Args:
+            factory: Function creating a new instance of the pipeline
+            max_size: Maximum number of instances of the pipeline
+        """
+        self.max_size = max(1, max_size)
+        self._factory = factory
+        # Reuse the most recently returned instance first, so idle instances stay idle
+        self._idle: "queue.LifoQueue[Pipeline]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self) -> Iterator[Pipeline]:
+        """
+        Check out an instance of the pipeline for the duration of the block.
+
+        When every instance is in use and the pool is full, waits for one to be returned.
+
+        Yields:
+            Pipeline: An instance used by no other caller until the block exits
+        """
+        pipeline = self._acquire()
+        try:
+            yield pipeline
+        finally:
+            self._idle.put(pipeline)
+
+    def _acquire(self) -> Pipeline:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.max_size
+            if create:
+                self._created += 1
+        if not create:
+            return self._idle.get()
+        try:
+            return self._factory()
+        except BaseException:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def warm_up(self) -> None:
+        """Create the first instance of the pipeline, if none was created yet."""
+        if self._created == 0:
+            with self.checkout():
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the size of the pool.
+
+        Returns:
+            Dict[str, int]: Instances created, idle instances and the maximum size
+        """
+        return {"created": self._created, "idle": self._idle.qsize(), "max_size": self.max_size}
+
+class Runtime:
+    """
+    The shared resources of the service.
+
+    Attributes:
+        executor: The executor of the blocking pipeline runs
+        http_client (httpx.Client): The pooled HTTP client of the OpenAI generators
+        pools (Dict[str, PipelinePool]): The pipeline pools, keyed by pipeline name
+    """
+
+    def __init__(self):
+        """Create the executor, the HTTP client and the (empty) pipeline pools."""
+        self.executor = get_executor()
+        max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "64"))
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+            )
+        )
+        pool_size = int(os.getenv("PIPELINE_POOL_SIZE", os.getenv("PIPELINE_EXECUTOR_WORKERS", "32")))
+        self.pools = {
+            "assessment": PipelinePool(partial(create_assessment_pipeline, http_client=self.http_client), pool_size),
+            "batch_assessment": PipelinePool(partial(create_batch_assessment_pipeline, http_client=self.http_client), pool_size),
+            "candidate_data": PipelinePool(partial(create_candidate_data_pipeline, http_client=self.http_client), pool_size),
+            "load_documents": PipelinePool(create_load_documents_pipeline, pool_size)
+        }
+        # One screening pipeline pool per model tier of the assessment cascade
+        for model in get_assessment_cascade():
+            if model != KEYWORD_TIER:
+                self.pools[screening_pipeline_name(model)] = PipelinePool(
+                    partial(create_assessment_pipeline, http_client=self.http_client, model=model, model_class=ScreeningAssessment),
+                    pool_size
+                )
+
+    def pipeline(self, name: str):
+        """
+        Check out an instance of a pipeline.
+
+        Args:
+            name (str): The name of the pipeline (assessment, batch_assessment,
+                candidate_data, load_documents, or screening:<model> for a cascade tier)
+
+        Returns:
+            A context manager yielding the pipeline instance
+
+        Example:
+            >>> with get_runtime().pipeline("assessment") as pipeline:
+            ...     pipeline.run(inputs)
+        """
+        return self.pools[name].checkout()
+
+    def warm_up(self) -> None:
+        """Build one instance of each pipeline, recording the time of each in the startup report."""
+        for name, pool in self.pools.items():
+            started = time.perf_counter()
+            pool.warm_up()
+            startup_report.record_warm_up(name, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the statistics of the pipeline pools.
+
+        Returns:
+            Dict[str, Any]: The size of each pipeline pool
+        """
+        return {"pipeline_pools": {name: pool.stats() for name, pool in self.pools.items()}}
+
+    def close(self) -> None:
+        """Close the pooled connections of the HTTP client."""
+        self.http_client.close()
+
+_runtime: Optional[Runtime] = None
+_runtime_lock = threading.Lock()
+
+def get_runtime() -> Runtime:
+    """
+    Get the process-wide runtime, starting it on first use.
+
+    The application starts it in its lifespan; scripts using the exec functions directly
+    get it started lazily.
+
+    Returns:
+        Runtime: The shared runtime
+    """
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = Runtime()
+        return _runtime
+
+# Modules imported when the first pipeline is built, rather than with the service
+DEFERRED_IMPORTS = (
+    "openai",
+    "pipelines.metered_generator_component",
+    "haystack.components.converters",
+    "haystack.components.joiners.document_joiner",
+    "haystack.components.routers"
+)
+
+def preload_imports() -> None:
+    """
+    Import the modules the pipelines import on first use.
+
+    A preloaded server calls it in its master process, before forking its workers, so the
+    workers share these modules instead of each importing them again.
+    """
+    for name in DEFERRED_IMPORTS:
+        startup_report.import_module(name)
+
+def warm_up_runtime() -> None:
+    """
+    Start the runtime and build one instance of each pipeline, unless PIPELINE_WARMUP is false.
+
+    The application calls it in its lifespan, in each worker process, so the first requests
+    don't pay for the deferred imports or the construction of the pipelines.
+    """
+    runtime = get_runtime()
+    if os.getenv("PIPELINE_WARMUP", "true").lower() == "true":
+        runtime.warm_up()
+
+def shutdown_runtime(wait: bool = True) -> None:
+    """
+    Close the runtime's HTTP client and shut down its executor, if the runtime was started.
+
+    Args:
+        wait (bool): Whether to wait for running pipeline calls to finish
+    """
+    global _runtime
+    with _runtime_lock:
+        runtime, _runtime = _runtime, None
+    # Stop the pipeline runs before closing the connections they use
+    shutdown_executor(wait=wait)
+    if runtime is not None:
+        runtime.close()
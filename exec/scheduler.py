@@ -0,0 +1,519 @@
+"""
+Scheduler Module
+
+This module schedules every OpenAI call of the process, whatever request it belongs to.
+Each model gets its own requests-per-minute and tokens-per-minute token buckets, charged
+with the estimated tokens of the prompt, and an adaptive concurrency limit:
+
+- The limit grows by one call per window of successful calls (additive increase) and
+  is halved when OpenAI answers with a 429, or when calls get slower than the latency
+  target (multiplicative decrease).
+- Rate-limited, timed out and server-failed calls are retried with jittered exponential
+  backoff, honouring the Retry-After header when OpenAI sends one.
+- A call whose caller goes away (such as the losing call of a hedge) keeps its slot until
+  its executor thread is done with the HTTP request, so the concurrency limit counts the
+  calls really sent to OpenAI.
+- Waiting calls are granted in priority order, so candidate extraction, which every
+  result needs, goes ahead of requirement assessments.
+- The latencies of the recent successful calls are kept per model, and a call running
+  past the hedge percentile of its model gets a hedged duplicate; the first of the two to
+  finish wins and the other is cancelled. Calls are only hedged while no other call of the
+  model is waiting, so hedges use idle capacity instead of adding to a backlog.
+
+Queue depth, wait times, latency percentiles, throttles, retries and hedges are exposed on /stats.
+
+The scheduler is configured with the following environment variables:
+    - OPENAI_RPM / OPENAI_TPM: Requests and tokens per minute per model (0 for no limit).
+      A model can be given its own budget with OPENAI_RPM_<MODEL> / OPENAI_TPM_<MODEL>,
+      e.g. OPENAI_TPM_GPT_4O_MINI.
+    - OPENAI_BUDGET_PROCESSES: Processes sharing the OpenAI budgets (web and job workers);
+      each process schedules its calls within its share of OPENAI_RPM / OPENAI_TPM
+    - OPENAI_MAX_CONCURRENCY: Upper bound of the concurrency limit per model
+    - OPENAI_MIN_CONCURRENCY: Lower bound of the concurrency limit per model
+    - OPENAI_INITIAL_CONCURRENCY: Concurrency limit per model before any feedback (defaults
+      to OPENAI_MAX_CONCURRENCY)
+    - OPENAI_LATENCY_TARGET: Seconds above which a call counts as slow (0 disables it)
+    - OPENAI_MAX_RETRIES: Retries of a call that was rate limited or failed transiently
+    - OPENAI_RETRY_BASE_DELAY / OPENAI_RETRY_MAX_DELAY: Bounds of the retry backoff
+    - LATENCY_WINDOW: Number of recent successful calls the latency percentiles are computed over
+    - HEDGE_PERCENTILE: Latency percentile after which a call is hedged (0 disables hedging)
+    - HEDGE_MIN_SAMPLES: Successful calls of a model observed before its calls are hedged
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+from dotenv import load_dotenv
+from observability import LLM_CALLS, LLM_HEDGES, LLM_RETRIES, record_stage
+
+# Load environment variables at module initialization
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+@lru_cache(maxsize=None)
+def retryable_errors() -> Tuple[type, ...]:
+    """
+    Get the errors worth retrying: the call may succeed once the rate limit or the outage is over.
+
+    The OpenAI client is imported on the first call rather than with the module, so
+    importing the service doesn't pay for it before the first pipeline is built.
+
+    Returns:
+        Tuple[type, ...]: The OpenAI error classes to retry
+    """
+    import openai
+    return (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+class Priority(IntEnum):
+    """Priority of an OpenAI call; lower values are granted first."""
+    CANDIDATE_DATA = 0
+    ASSESSMENT = 1
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously at a per-minute rate.
+
+    Attributes:
+        per_minute (float): Tokens added per minute, also the capacity of the bucket.
+            0 means no limit.
+    """
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self._tokens = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.per_minute, self._tokens + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Get the seconds until the bucket holds amount tokens.
+
+        Amounts larger than the capacity only wait for a full bucket, so they can't block forever.
+        """
+        if self.per_minute <= 0:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.per_minute) - self._tokens
+        return max(0.0, missing * 60 / self.per_minute)
+
+    def consume(self, amount: float) -> None:
+        """Take amount tokens from the bucket."""
+        if self.per_minute > 0:
+            self._refill()
+            self._tokens -= min(amount, self.per_minute)
+
+class LatencyWindow:
+    """
+    The latencies of the most recent successful calls, for percentiles that follow drift.
+
+    Attributes:
+        size (int): Number of latencies kept
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._samples: Deque[float] = deque(maxlen=max(1, size))
+        self._sorted: Optional[List[float]] = None
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, latency: float) -> None:
+        """Record the latency of a successful call, forgetting the oldest one when full."""
+        self._samples.append(latency)
+        self._sorted = None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Get a percentile of the recent latencies (nearest rank).
+
+        Args:
+            percent (float): The percentile, between 0 and 100
+
+        Returns:
+            Optional[float]: The latency in seconds, or None before any call succeeded
+        """
+        if not self._samples:
+            return None
+        # Sorted once per new sample at most, however many calls look the percentile up
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        rank = math.ceil(percent / 100 * len(self._sorted))
+        return self._sorted[min(len(self._sorted), max(1, rank)) - 1]
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    sequence: int
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+class ModelScheduler:
+    """
+    Rate limits and adaptive concurrency of the calls to one model.
+
+    All methods run on the event loop, so no locking is needed.
+    """
+
+    def __init__(self, model: str, rpm: float, tpm: float, min_concurrency: int, max_concurrency: int,
+                 initial_concurrency: int, latency_target: float, latency_window: int = 200):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.latency_target = latency_target
+        self.latencies = LatencyWindow(latency_window)
+        self.in_flight = 0
+        self._waiters: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._counters = {"granted": 0, "throttled": 0, "slow": 0, "retries": 0, "errors": 0, "cancelled": 0, "hedged": 0, "hedge_wins": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def acquire(self, tokens: int, priority: Priority) -> None:
+        """
+        Wait until a call of the given estimated tokens may be sent.
+
+        Args:
+            tokens: Estimated tokens of the call
+            priority: Priority of the call
+        """
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, _Waiter(int(priority), next(self._sequence), tokens, future))
+        started = time.monotonic()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted as the caller got cancelled: give it back
+                self.release()
+            raise
+        waited = time.monotonic() - started
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        record_stage("scheduler_wait", waited)
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of calls waiting for a slot"""
+        return sum(1 for waiter in self._waiters if not waiter.future.done())
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False, retry_after: float = 0.0) -> None:
+        """
+        Give back the slot of a finished call and adapt the concurrency limit to its outcome.
+
+        Args:
+            latency: Seconds the call took, when it succeeded
+            throttled: Whether OpenAI answered with a 429
+            retry_after: Seconds OpenAI asked to wait before the next call
+        """
+        self.in_flight -= 1
+        now = time.monotonic()
+        if throttled:
+            self._counters["throttled"] += 1
+            self._paused_until = max(self._paused_until, now + retry_after)
+            self._decrease(now)
+        elif latency is not None:
+            self.latencies.add(latency)
+            if self.latency_target > 0 and latency > self.latency_target:
+                self._counters["slow"] += 1
+                self._decrease(now)
+            else:
+                # Additive increase: about one more slot per window of `limit` successful calls
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        self._dispatch()
+
+    def record(self, counter: str) -> None:
+        """
+        Count a retried ("retries"), finally failed ("errors"), abandoned by its caller
+        ("cancelled") or hedged ("hedged") call, or a hedge that finished first ("hedge_wins").
+
+        Args:
+            counter: The name of the counter
+        """
+        self._counters[counter] += 1
+
+    def _decrease(self, now: float) -> None:
+        # Calls already in flight when the limit was cut report the same congestion;
+        # only cut once per latency window (bounded by one second)
+        if now - self._last_decrease < max(1.0, self.latency_target):
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_concurrency, self.limit / 2)
+
+    def _dispatch(self) -> None:
+        # Drop waiters whose caller went away
+        while self._waiters and self._waiters[0].future.done():
+            heapq.heappop(self._waiters)
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters[0]
+            if waiter.future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = max(
+                self._paused_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(waiter.tokens)
+            )
+            if delay > 0:
+                self._schedule_wakeup(delay)
+                return
+            heapq.heappop(self._waiters)
+            self.requests.consume(1)
+            self.tokens.consume(waiter.tokens)
+            self.in_flight += 1
+            self._counters["granted"] += 1
+            waiter.future.set_result(None)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None and not self._wakeup.cancelled():
+            if self._wakeup.when() <= asyncio.get_running_loop().time() + delay:
+                return
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._on_wakeup)
+
+    def _on_wakeup(self) -> None:
+        self._wakeup = None
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the statistics of the scheduler.
+
+        Returns:
+            Dict[str, Any]: Queue depth per priority, calls in flight, concurrency limit,
+                wait times, latency percentiles of the recent successful calls, and counters
+                of granted, throttled, slow, retried, failed, cancelled and hedged calls
+        """
+        queued = [waiter for waiter in self._waiters if not waiter.future.done()]
+        granted = self._counters["granted"]
+        return {
+            "queue_depth": len(queued),
+            "queue_depth_by_priority": {
+                priority.name.lower(): sum(1 for waiter in queued if waiter.priority == priority)
+                for priority in Priority
+            },
+            "in_flight": self.in_flight,
+            "concurrency_limit": round(self.limit, 2),
+            "wait_mean_s": round(self._wait_total / granted, 4) if granted else 0.0,
+            "wait_max_s": round(self._wait_max, 4),
+            **{
+                f"latency_p{percent}_s": round(latency, 4) if (latency := self.latencies.percentile(percent)) is not None else None
+                for percent in (50, 95, 99)
+            },
+            **self._counters
+        }
+
+class Scheduler:
+    """Schedules the OpenAI calls of the process, with one ModelScheduler per model."""
+
+    def __init__(self):
+        self._models: Dict[str, ModelScheduler] = {}
+        self._lock = threading.Lock()
+
+    def model(self, model: str) -> ModelScheduler:
+        """
+        Get the scheduler of a model, creating it from the environment on first use.
+
+        Args:
+            model (str): The OpenAI model name
+
+        Returns:
+            ModelScheduler: The scheduler of the model
+        """
+        with self._lock:
+            if model not in self._models:
+                suffix = re.sub(r"\W", "_", model).upper()
+                max_concurrency = os.getenv("OPENAI_MAX_CONCURRENCY", "32")
+                # The budgets are for the whole deployment, and each process takes its share
+                processes = max(1, int(os.getenv("OPENAI_BUDGET_PROCESSES", "1")))
+                self._models[model] = ModelScheduler(
+                    model,
+                    rpm=float(os.getenv(f"OPENAI_RPM_{suffix}", os.getenv("OPENAI_RPM", "0"))) / processes,
+                    tpm=float(os.getenv(f"OPENAI_TPM_{suffix}", os.getenv("OPENAI_TPM", "0"))) / processes,
+                    min_concurrency=int(os.getenv("OPENAI_MIN_CONCURRENCY", "1")),
+                    max_concurrency=int(max_concurrency),
+                    # Start wide open and let the 429s (or the latency target) narrow it down
+                    initial_concurrency=int(os.getenv("OPENAI_INITIAL_CONCURRENCY", max_concurrency)),
+                    latency_target=float(os.getenv("OPENAI_LATENCY_TARGET", "0")),
+                    latency_window=int(os.getenv("LATENCY_WINDOW", "200"))
+                )
+            return self._models[model]
+
+    async def run(self, model: str, tokens: int, priority: Priority, call: Callable[[], "asyncio.Future[T]"]) -> T:
+        """
+        Run an OpenAI call once the budgets of its model allow it, retrying transient failures.
+
+        Args:
+            model (str): The OpenAI model of the call
+            tokens (int): Estimated tokens of the call
+            priority (Priority): Priority of the call
+            call (Callable): Function returning an awaitable of the call, invoked once per attempt
+
+        Returns:
+            The result of the call
+
+        Raises:
+            Exception: The error of the last attempt, when the call keeps failing or fails
+                with an error that is not worth retrying
+        """
+        scheduler = self.model(model)
+        max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+        base_delay = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "1"))
+        max_delay = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "30"))
+        for attempt in range(max_retries + 1):
+            await scheduler.acquire(tokens, priority)
+            started = time.monotonic()
+            running = asyncio.ensure_future(call())
+            try:
+                # Shielded: a cancelled caller stops waiting, but the call keeps its slot until it ends
+                result = await asyncio.shield(running)
+            except asyncio.CancelledError:
+                scheduler.record("cancelled")
+                LLM_CALLS.labels(model=model, outcome="cancelled").inc()
+                running.add_done_callback(lambda done: _release_abandoned(scheduler, done, started))
+                raise
+            except retryable_errors() as e:
+                # RateLimitError is the status error of the 429s
+                throttled = getattr(e, "status_code", None) == 429
+                retry_after = _retry_after(e)
+                scheduler.release(throttled=throttled, retry_after=retry_after)
+                LLM_CALLS.labels(model=model, outcome="throttled" if throttled else "retryable_error").inc()
+                if attempt == max_retries:
+                    scheduler.record("errors")
+                    raise
+                # Full jitter keeps the retries of concurrent calls from arriving together
+                delay = max(retry_after, random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+                scheduler.record("retries")
+                LLM_RETRIES.labels(model=model).inc()
+                logger.warning("OpenAI call to %s failed (%s), retrying in %.1fs", model, type(e).__name__, delay)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                scheduler.release()
+                scheduler.record("errors")
+                LLM_CALLS.labels(model=model, outcome="error").inc()
+                raise
+            scheduler.release(latency=time.monotonic() - started)
+            LLM_CALLS.labels(model=model, outcome="ok").inc()
+            return result
+
+    async def run_hedged(self, model: str, tokens: int, priority: Priority, call: Callable[[], "asyncio.Future[T]"]) -> T:
+        """
+        Run an OpenAI call like run, sending a hedged duplicate when it runs past the hedge percentile.
+
+        The duplicate is only sent once the model has enough observed latencies, and while
+        no other call of the model is waiting. The first of the two calls to succeed wins and
+        the other is cancelled; when one fails, the other is still awaited.
+
+        Args:
+            model (str): The OpenAI model of the call
+            tokens (int): Estimated tokens of the call
+            priority (Priority): Priority of the call
+            call (Callable): Function returning an awaitable of the call, invoked once per attempt
+
+        Returns:
+            The result of the first call to succeed
+
+        Raises:
+            Exception: The error of the last call to fail, when both fail
+        """
+        scheduler = self.model(model)
+        percentile = float(os.getenv("HEDGE_PERCENTILE", "95"))
+        if percentile <= 0 or len(scheduler.latencies) < int(os.getenv("HEDGE_MIN_SAMPLES", "20")):
+            return await self.run(model, tokens, priority, call)
+        threshold = scheduler.latencies.percentile(percentile)
+        primary = asyncio.ensure_future(self.run(model, tokens, priority, call))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=threshold)
+            if done:
+                return primary.result()
+            # Hedges use idle capacity only, they don't add to a backlog
+            if scheduler.queue_depth > 0:
+                return await primary
+            hedge = asyncio.ensure_future(self.run(model, tokens, priority, call))
+            pending.add(hedge)
+            scheduler.record("hedged")
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            scheduler.record("hedge_wins")
+                        LLM_HEDGES.labels(model=model, winner="hedge" if task is hedge else "primary").inc()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing call stops being waited for; its slot is given back once it really ends
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the statistics of the scheduler of each model.
+
+        Returns:
+            Dict[str, Any]: Statistics keyed by model name
+        """
+        with self._lock:
+            models = dict(self._models)
+        return {model: scheduler.stats() for model, scheduler in models.items()}
+
+def _release_abandoned(scheduler: ModelScheduler, running: asyncio.Future, started: float) -> None:
+    """Give back the slot of a call nobody waits for anymore, once the call really ended."""
+    error = None if running.cancelled() else running.exception()
+    if running.cancelled():
+        scheduler.release()
+    elif error is None:
+        scheduler.release(latency=time.monotonic() - started)
+    else:
+        throttled = getattr(error, "status_code", None) == 429
+        scheduler.release(throttled=throttled, retry_after=_retry_after(error) if throttled else 0.0)
+
+def _retry_after(error: Exception) -> float:
+    response = getattr(error, "response", None)
+    if response is None:
+        return 0.0
+    try:
+        return float(response.headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+_scheduler = Scheduler()
+
+def get_scheduler() -> Scheduler:
+    """
+    Get the process-wide scheduler.
+
+    Returns:
+        Scheduler: The scheduler shared by every request
+    """
+    return _scheduler
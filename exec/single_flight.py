@@ -0,0 +1,117 @@
+"""
+Single-Flight Module
+
+This module coalesces identical concurrent computations. The first caller of a key starts
+the computation; callers arriving with the same key while it is in flight wait for the same
+result instead of starting their own. The computation runs as its own task, so it keeps
+going when the caller that started it goes away, and is only cancelled once every waiting
+caller is gone.
+
+Two flights are shared by the whole process:
+    - request_flight: /process requests with the same files, requirements and configuration
+    - llm_flight: LLM calls with the same model and rendered prompt, across all requests
+
+Coalescing is configured with the following environment variables:
+    - COALESCE_REQUESTS: Share in-flight /process computations between identical requests
+    - COALESCE_LLM_CALLS: Share in-flight LLM calls between identical prompts
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+from dotenv import load_dotenv
+from observability import COALESCED_CALLS
+
+# Load environment variables at module initialization
+load_dotenv()
+
+T = TypeVar("T")
+
+class _Flight:
+    """An in-flight computation and the number of callers waiting for it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into a single computation.
+
+    Attributes:
+        name (str): Name of the flight, used when reporting statistics
+        enabled (bool): Whether calls are coalesced; when False, every call runs on its own
+    """
+
+    def __init__(self, name: str, enabled: bool = True):
+        """
+        Initialize the flight.
+
+        Args:
+            name: Name of the flight, used when reporting statistics
+            enabled: Whether calls are coalesced
+        """
+        self.name = name
+        self.enabled = enabled
+        self._flights: Dict[str, _Flight] = {}
+        self._stats = {"leaders": 0, "followers": 0}
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a computation, or wait for the identical one already in flight.
+
+        Args:
+            key: Identifies the computation; calls with the same key get the same result
+            factory: Function starting the computation, only called when none is in flight
+
+        Returns:
+            The result of the computation, shared by every caller of the key. If it fails,
+            every caller gets the error.
+        """
+        if not self.enabled:
+            return await factory()
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self._stats["leaders"] += 1
+        else:
+            self._stats["followers"] += 1
+            COALESCED_CALLS.labels(flight=self.name).inc()
+
+        flight.waiters += 1
+        try:
+            # Shielded, so a caller going away doesn't cancel the computation of the others
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the coalescing statistics of the flight.
+
+        Returns:
+            Dict[str, Any]: Computations started (leaders), calls that joined one in flight
+                (followers), and the computations currently in flight
+        """
+        return {**self._stats, "in_flight": len(self._flights)}
+
+request_flight = SingleFlight("requests", enabled=os.getenv("COALESCE_REQUESTS", "true").lower() == "true")
+llm_flight = SingleFlight("llm_calls", enabled=os.getenv("COALESCE_LLM_CALLS", "true").lower() == "true")
+
+def coalescing_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the coalescing statistics of the request and LLM call flights.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The statistics of each flight, keyed by name
+    """
+    return {flight.name: flight.stats() for flight in (request_flight, llm_flight)}
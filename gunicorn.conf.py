@@ -0,0 +1,95 @@
+"""
+Better ATS Service - Gunicorn Configuration
+
+This configuration runs the service on several Uvicorn worker processes managed by Gunicorn.
+With preloading (the default), the master process imports the application and the modules
+the pipelines import on first use once, then forks the workers, which share them
+copy-on-write instead of each importing them again. Each worker then starts and warms up
+its own runtime (executor, OpenAI connections, pipelines) in the application lifespan, since
+threads, connections and process pools must not cross a fork.
+
+The worker processes of the job queue are started once, by the master, instead of by the
+lifespan of every web worker. Every web and job worker schedules its OpenAI calls on its
+own, so each is given an equal share of OPENAI_RPM / OPENAI_TPM through
+OPENAI_BUDGET_PROCESSES, unless it is set explicitly (for instance when job workers also run
+on other hosts).
+
+With PROMETHEUS_MULTIPROC_DIR set, the workers write their metrics to that directory, and the
+files of the web workers that exit are marked dead so their gauges stop counting.
+
+Usage:
+    gunicorn -c gunicorn.conf.py main:app
+
+The configuration reads the following environment variables:
+    - HOST / PORT: Address the server listens on
+    - WEB_CONCURRENCY: Number of worker processes (defaults to the number of CPUs)
+    - GUNICORN_PRELOAD: Whether the master imports the application before forking (true/false)
+    - GUNICORN_TIMEOUT: Seconds a worker may stay silent before it is restarted
+    - JOB_WORKERS: Worker processes of the job queue started by the master
+    - OPENAI_BUDGET_PROCESSES: Processes sharing the OpenAI budgets (defaults to
+      WEB_CONCURRENCY + JOB_WORKERS)
+    - PROMETHEUS_MULTIPROC_DIR: Directory where every worker writes its Prometheus metrics,
+      so /metrics aggregates all of them (emptied when the server starts)
+"""
+
+import gc
+import os
+import signal
+import subprocess
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables at module initialization
+load_dotenv()
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+# The master runs the job workers, so the lifespan of the web workers starts none
+job_workers = int(os.getenv("JOB_WORKERS", "1"))
+os.environ["JOB_WORKERS"] = "0"
+os.environ.setdefault("OPENAI_BUDGET_PROCESSES", str(workers + max(0, job_workers)))
+
+# Metrics left over by the workers of a previous run would be added to the new ones
+multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if multiproc_dir:
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for name in os.listdir(multiproc_dir):
+        if name.endswith(".db"):
+            os.remove(os.path.join(multiproc_dir, name))
+
+_job_process = None
+
+def when_ready(server):
+    """Start the job workers, and import the deferred modules in the preloaded master, before the web workers are forked."""
+    global _job_process
+    if job_workers > 0:
+        # A process of its own, so the web workers forked from the master don't inherit its children
+        _job_process = subprocess.Popen([sys.executable, "-m", "jobs.worker", "--workers", str(job_workers)])
+        server.log.info("Started %s job workers (pid: %s)", job_workers, _job_process.pid)
+    if not preload_app:
+        return
+    from exec import preload_imports
+    preload_imports()
+    # Keep the collector of the workers from touching (and copying) the pages of the preloaded objects
+    gc.freeze()
+    server.log.info("Preloaded the application, forking %s workers", workers)
+
+def on_exit(server):
+    """Stop the job workers; their running jobs go back to the queue."""
+    if _job_process is not None and _job_process.poll() is None:
+        # Interrupted rather than terminated, so it stops its workers before exiting
+        _job_process.send_signal(signal.SIGINT)
+        try:
+            _job_process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            _job_process.kill()
+
+def child_exit(server, worker):
+    """Mark the metrics of an exited web worker as dead, in Prometheus multiprocess mode."""
+    if multiproc_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
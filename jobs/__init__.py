@@ -0,0 +1,4 @@
+from .store import Job, JobFile, JobStore, IdempotencyConflict, get_job_store
+from .worker import JobWorkerPool, run_job, run_worker, start_job_workers, stop_job_workers
+
+__all__ = ["Job", "JobFile", "JobStore", "IdempotencyConflict", "get_job_store", "JobWorkerPool", "run_job", "run_worker", "start_job_workers", "stop_job_workers"]
@@ -0,0 +1,419 @@
+"""
+Job Store Module
+
+This module provides the durable queue of asynchronous processing jobs, backed by SQLite.
+A job keeps its uploaded files, its ProcessInput and every result produced so far, so a
+worker that crashes or is restarted loses no work that was already paid for: the next
+worker to claim the job skips the candidate extraction and the requirements that already
+have an assessment.
+
+Workers claim jobs with a lease that they renew while the job runs. A job whose lease
+expired (its worker died) is claimed again by another worker, up to a maximum number of
+attempts. Jobs can be submitted with an idempotency key, so a client retrying a submission
+gets the job it already created instead of a new one.
+
+The store is shared by the API process and the worker processes through the same SQLite
+file, in WAL mode so readers don't block the writer. It is configured with the following
+environment variables:
+    - JOBS_DB_PATH: SQLite file of the job queue
+    - JOB_LEASE_SECONDS: Seconds a worker owns a job without renewing its lease
+    - JOB_MAX_ATTEMPTS: Number of times a job abandoned by its worker is claimed again
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables at module initialization
+load_dotenv()
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+class IdempotencyConflict(Exception):
+    """Raised when an idempotency key is reused for a different submission."""
+
+@dataclass
+class JobFile:
+    """
+    A file uploaded with a job.
+
+    Attributes:
+        filename (str): The original filename
+        sha256 (str): The SHA-256 of the file bytes
+        content_type (Optional[str]): The content type sent by the client
+        data (bytes): The file bytes
+    """
+    filename: str
+    sha256: str
+    content_type: Optional[str]
+    data: bytes
+
+@dataclass
+class Job:
+    """
+    A processing job and the results it produced so far.
+
+    Attributes:
+        id (str): The job id
+        status (str): queued, running, succeeded or failed
+        process_input (Dict[str, Any]): The ProcessInput of the job, as a dict
+        candidate_data (Optional[Dict[str, Any]]): The extracted CandidateData, once done
+        assessments (Dict[int, Dict[str, Any]]): The RequirementAssessment of each finished
+            requirement, keyed by the index of the requirement
+        error (Optional[str]): The reason the job failed
+        attempts (int): Number of times the job was claimed by a worker
+        created_at (float): Submission time
+        updated_at (float): Time of the last change
+    """
+    id: str
+    status: str
+    process_input: Dict[str, Any]
+    candidate_data: Optional[Dict[str, Any]]
+    assessments: Dict[int, Dict[str, Any]]
+    error: Optional[str]
+    attempts: int
+    created_at: float
+    updated_at: float
+
+class JobStore:
+    """
+    A thread-safe SQLite store of jobs, their files and their partial results.
+
+    Attributes:
+        path (str): Path to the SQLite file
+        lease_seconds (float): Seconds a claimed job stays owned by its worker without a renewal
+        max_attempts (int): Number of claims after which an abandoned job is marked as failed
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60, max_attempts: int = 3):
+        """
+        Open the store, creating its tables if needed.
+
+        Args:
+            path: Path to the SQLite file
+            lease_seconds: Seconds a claimed job stays owned by its worker without a renewal
+            max_attempts: Number of claims after which an abandoned job is marked as failed
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Transactions are managed explicitly, so claims can take the write lock up front
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, idempotency_key TEXT UNIQUE, fingerprint TEXT NOT NULL, "
+            "status TEXT NOT NULL, process_input TEXT NOT NULL, candidate_data TEXT, error TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, lease_owner TEXT, lease_expires_at REAL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);"
+            "CREATE TABLE IF NOT EXISTS job_files ("
+            "job_id TEXT NOT NULL, position INTEGER NOT NULL, filename TEXT NOT NULL, sha256 TEXT NOT NULL, "
+            "content_type TEXT, data BLOB NOT NULL, PRIMARY KEY (job_id, position));"
+            "CREATE TABLE IF NOT EXISTS job_assessments ("
+            "job_id TEXT NOT NULL, requirement_index INTEGER NOT NULL, assessment TEXT NOT NULL, "
+            "PRIMARY KEY (job_id, requirement_index));"
+        )
+
+    def submit(
+        self,
+        process_input: Dict[str, Any],
+        files: List[JobFile],
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[Job, bool]:
+        """
+        Store a new job and its files, or return the job already created with the same key.
+
+        Args:
+            process_input: The ProcessInput of the job, as a dict
+            files: The uploaded files of the job
+            idempotency_key: Client-chosen key identifying the submission
+
+        Returns:
+            Tuple[Job, bool]: The job, and whether it was created by this call
+
+        Raises:
+            IdempotencyConflict: If the key was used for a job with a different input or files
+        """
+        fingerprint = json.dumps([process_input, [file.sha256 for file in files]], sort_keys=True)
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if idempotency_key is not None:
+                    row = self._db.execute(
+                        "SELECT id, fingerprint FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                    ).fetchone()
+                    if row is not None:
+                        self._db.execute("COMMIT")
+                        if row[1] != fingerprint:
+                            raise IdempotencyConflict(f'Idempotency key "{idempotency_key}" was used for a different job')
+                        return self._get(row[0]), False
+                self._db.execute(
+                    "INSERT INTO jobs (id, idempotency_key, fingerprint, status, process_input, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, idempotency_key, fingerprint, QUEUED, json.dumps(process_input), now, now)
+                )
+                self._db.executemany(
+                    "INSERT INTO job_files (job_id, position, filename, sha256, content_type, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(job_id, position, file.filename, file.sha256, file.content_type, file.data) for position, file in enumerate(files)]
+                )
+                self._db.execute("COMMIT")
+            except IdempotencyConflict:
+                raise
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return self._get(job_id), True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Get a job and its partial results.
+
+        Args:
+            job_id: The job id
+
+        Returns:
+            Optional[Job]: The job, or None if it doesn't exist
+        """
+        with self._lock:
+            return self._get(job_id)
+
+    def claim(self, owner: str) -> Optional[Job]:
+        """
+        Claim the oldest queued job, or a running job whose worker stopped renewing its lease.
+
+        Abandoned jobs that already used all their attempts are marked as failed instead.
+
+        Args:
+            owner: Identifier of the claiming worker
+
+        Returns:
+            Optional[Job]: The claimed job, or None when there is nothing to run
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                abandoned = self._db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, updated_at = ? "
+                    "WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+                    (FAILED, "The job was abandoned by its worker too many times", now, RUNNING, now, self.max_attempts)
+                )
+                if abandoned.rowcount:
+                    self._delete_finished_files()
+                row = self._db.execute(
+                    "SELECT id FROM jobs WHERE status = ? OR (status = ? AND lease_expires_at < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return None
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires_at = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (RUNNING, owner, now + self.lease_seconds, now, row[0])
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return self._get(row[0])
+
+    def renew(self, job_id: str, owner: str) -> bool:
+        """
+        Extend the lease of a running job.
+
+        Args:
+            job_id: The job id
+            owner: Identifier of the worker running the job
+
+        Returns:
+            bool: False if the worker lost the job (its lease expired and another worker claimed it)
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = ?",
+                (now + self.lease_seconds, now, job_id, owner, RUNNING)
+            )
+            return cursor.rowcount == 1
+
+    def files(self, job_id: str) -> List[JobFile]:
+        """
+        Get the uploaded files of a job.
+
+        Args:
+            job_id: The job id
+
+        Returns:
+            List[JobFile]: The files, in upload order
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT filename, sha256, content_type, data FROM job_files WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+        return [JobFile(filename=row[0], sha256=row[1], content_type=row[2], data=row[3]) for row in rows]
+
+    def save_candidate_data(self, job_id: str, owner: str, candidate_data: Dict[str, Any]) -> None:
+        """
+        Store the extracted candidate data of a job.
+
+        Args:
+            job_id: The job id
+            owner: Identifier of the worker running the job
+            candidate_data: The CandidateData, as a dict
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET candidate_data = ?, updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (json.dumps(candidate_data), time.time(), job_id, owner)
+            )
+
+    def save_assessment(self, job_id: str, owner: str, index: int, assessment: Dict[str, Any]) -> None:
+        """
+        Store the assessment of one requirement of a job, unless the worker lost the job.
+
+        Args:
+            job_id: The job id
+            owner: Identifier of the worker running the job
+            index: The index of the requirement in the job requirements
+            assessment: The RequirementAssessment, as a dict
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO job_assessments (job_id, requirement_index, assessment) "
+                "SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM jobs WHERE id = ? AND lease_owner = ?)",
+                (job_id, index, json.dumps(assessment), job_id, owner)
+            )
+
+    def finish(self, job_id: str, owner: str, error: Optional[str] = None) -> None:
+        """
+        Mark a job as succeeded, or as failed with an error, and release its lease.
+
+        Args:
+            job_id: The job id
+            owner: Identifier of the worker running the job
+            error: The reason the job failed, or None if it succeeded
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ?",
+                (FAILED if error else SUCCEEDED, error, time.time(), job_id, owner)
+            )
+            # Uploaded files are only needed until their job finishes, but a worker that lost the job leaves them to its new owner
+            if cursor.rowcount == 1:
+                self._db.execute("DELETE FROM job_files WHERE job_id = ?", (job_id,))
+
+    def release(self, job_id: str, owner: str, error: Optional[str] = None) -> None:
+        """
+        Put a running job back in the queue, keeping its partial results.
+
+        A job released without an error (e.g. when its worker shuts down) gets its attempt
+        back. A job released after an error keeps the attempt and records the error, and is
+        marked as failed once it used all its attempts.
+
+        Args:
+            job_id: The job id
+            owner: Identifier of the worker running the job
+            error: The reason the attempt failed, if it failed
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND lease_owner = ? AND status = ?", (job_id, owner, RUNNING)
+            ).fetchone()
+        if row is None:
+            return
+        if error is not None and row[0] >= self.max_attempts:
+            self.finish(job_id, owner, error=error)
+            return
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts - ?, error = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = ?",
+                (QUEUED, 0 if error else 1, error, time.time(), job_id, owner, RUNNING)
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of jobs in each status.
+
+        Returns:
+            Dict[str, int]: Job counts keyed by status
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)} | dict(rows)
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            self._db.close()
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        row = self._db.execute(
+            "SELECT id, status, process_input, candidate_data, error, attempts, created_at, updated_at FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        assessments = self._db.execute(
+            "SELECT requirement_index, assessment FROM job_assessments WHERE job_id = ?", (job_id,)
+        ).fetchall()
+        return Job(
+            id=row[0],
+            status=row[1],
+            process_input=json.loads(row[2]),
+            candidate_data=json.loads(row[3]) if row[3] else None,
+            assessments={index: json.loads(assessment) for index, assessment in assessments},
+            error=row[4],
+            attempts=row[5],
+            created_at=row[6],
+            updated_at=row[7]
+        )
+
+    def _delete_finished_files(self) -> None:
+        self._db.execute(
+            "DELETE FROM job_files WHERE job_id IN (SELECT id FROM jobs WHERE status IN (?, ?))",
+            (SUCCEEDED, FAILED)
+        )
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+def get_job_store() -> JobStore:
+    """
+    Get the job store of the process, opening it on first use.
+
+    The store is configured with the JOBS_DB_PATH, JOB_LEASE_SECONDS and JOB_MAX_ATTEMPTS
+    environment variables.
+
+    Returns:
+        JobStore: The store
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JobStore(
+                path=os.getenv("JOBS_DB_PATH", "data/jobs.sqlite3"),
+                lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "60")),
+                max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+            )
+        return _store
@@ -0,0 +1,253 @@
+"""
+Job Worker Module
+
+This module runs the jobs of the durable queue on a pool of worker processes. Each worker
+claims jobs from the job store, loads their documents, extracts the candidate data and
+assesses every requirement with the same exec functions as the /process endpoint, and
+stores each result as soon as it completes. Requirements assessed before a crash, a
+restart or a failed attempt are never assessed again.
+
+Each worker process runs its own runtime (pipeline executor, pooled OpenAI connections
+and scheduler), so it takes its share of the OpenAI budgets like a web worker does (see
+OPENAI_BUDGET_PROCESSES). Under Gunicorn, the workers are started once by the master
+(see gunicorn.conf.py) rather than by every web worker.
+
+The workers are configured with the following environment variables:
+    - JOB_WORKERS: Worker processes started with the application (0 starts none); under
+      Gunicorn, the master starts them once and the web workers start none
+    - JOB_WORKER_CONCURRENCY: Jobs run at once by each worker process
+    - JOB_POLL_INTERVAL: Seconds an idle worker waits before looking for new jobs
+
+Workers can also run apart from the API, sharing its JOBS_DB_PATH:
+    python -m jobs.worker --workers 2
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+from typing import List, Optional
+from dotenv import load_dotenv
+from models import CandidateData
+from models.process_input import ProcessInput
+from exec import (
+    UploadedFile,
+    exec_candidate_data,
+    exec_load_uploaded_documents,
+    iter_assessments,
+    run_in_executor,
+    shutdown_runtime
+)
+from .store import Job, JobStore, get_job_store
+
+# Load environment variables at module initialization
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+async def run_job(store: JobStore, job: Job, owner: str) -> None:
+    """
+    Run a claimed job to completion, skipping the results it already has.
+
+    The lease of the job is renewed while it runs. If the job fails, it is put back in the
+    queue for another attempt (or marked as failed once out of attempts); if it is
+    cancelled, it is put back in the queue without using an attempt.
+
+    Args:
+        store (JobStore): The job store
+        job (Job): The claimed job, with its partial results
+        owner (str): Identifier of the worker running the job
+    """
+    process_input = ProcessInput(**job.process_input)
+    requirements = process_input.job_requirements
+    task = asyncio.current_task()
+
+    async def renew_lease() -> None:
+        while True:
+            await asyncio.sleep(store.lease_seconds / 3)
+            if not await run_in_executor(store.renew, job.id, owner):
+                logger.warning("Lost the lease of job %s, stopping it", job.id)
+                task.cancel()
+                return
+
+    async def extract_candidate_data(documents) -> None:
+        if job.candidate_data is not None:
+            return
+        candidate_data: CandidateData = await exec_candidate_data(documents, bypass_cache=process_input.bypass_cache)
+        await run_in_executor(store.save_candidate_data, job.id, owner, candidate_data.model_dump())
+
+    async def assess_remaining(documents) -> None:
+        remaining = [index for index in range(len(requirements)) if index not in job.assessments]
+        if not remaining:
+            return
+        # Store each assessment as soon as it completes, so a later attempt can skip it
+        async for position, assessment in iter_assessments(
+            documents,
+            [requirements[index] for index in remaining],
+            bypass_cache=process_input.bypass_cache
+        ):
+            await run_in_executor(store.save_assessment, job.id, owner, remaining[position], assessment.model_dump())
+
+    heartbeat = asyncio.create_task(renew_lease())
+    try:
+        files = await run_in_executor(store.files, job.id)
+        uploads = [
+            UploadedFile(filename=file.filename, sha256=file.sha256, size=len(file.data), data=file.data, content_type=file.content_type)
+            for file in files
+        ]
+        documents = await run_in_executor(exec_load_uploaded_documents, uploads)
+        await asyncio.gather(extract_candidate_data(documents), assess_remaining(documents))
+    except asyncio.CancelledError:
+        await run_in_executor(store.release, job.id, owner)
+        raise
+    except Exception as e:
+        logger.warning("Attempt %s of job %s failed: %s", job.attempts, job.id, e)
+        await run_in_executor(store.release, job.id, owner, str(e))
+        return
+    finally:
+        heartbeat.cancel()
+    await run_in_executor(store.finish, job.id, owner)
+
+async def run_worker(owner: str, stop_event, concurrency: int = 1, poll_interval: float = 1.0) -> None:
+    """
+    Claim and run jobs until the stop event is set.
+
+    Args:
+        owner (str): Identifier of the worker
+        stop_event: Event (threading or multiprocessing) that stops the worker when set
+        concurrency (int): Jobs run at once
+        poll_interval (float): Seconds to wait before looking for new jobs when idle
+    """
+    store = get_job_store()
+    tasks = set()
+    try:
+        while not stop_event.is_set():
+            while len(tasks) < concurrency:
+                job = await run_in_executor(store.claim, owner)
+                if job is None:
+                    break
+                logger.info("Worker %s claimed job %s (attempt %s)", owner, job.id, job.attempts)
+                tasks.add(asyncio.create_task(run_job(store, job, owner)))
+            if tasks:
+                _, tasks = await asyncio.wait(tasks, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(poll_interval)
+    finally:
+        # Unfinished jobs go back to the queue with their partial results
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def _worker_main(name: str, stop_event) -> None:
+    """Entry point of a worker process."""
+    logging.basicConfig(format="%(asctime)s %(processName)s %(name)s %(levelname)s: %(message)s")
+    logging.getLogger("jobs").setLevel(logging.INFO)
+    logging.getLogger("pypdf").setLevel(logging.ERROR)
+    owner = f"{socket.gethostname()}:{os.getpid()}:{name}"
+    try:
+        asyncio.run(run_worker(
+            owner,
+            stop_event,
+            concurrency=int(os.getenv("JOB_WORKER_CONCURRENCY", "4")),
+            poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "1"))
+        ))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_runtime(wait=False)
+
+class JobWorkerPool:
+    """
+    A pool of worker processes running the jobs of the queue.
+
+    Attributes:
+        workers (int): Number of worker processes
+    """
+
+    def __init__(self, workers: int):
+        """
+        Initialize the pool, without starting its processes.
+
+        Args:
+            workers: Number of worker processes
+        """
+        self.workers = workers
+        # Spawned workers don't inherit the server's threads, locks and connections
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        for number in range(self.workers):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(f"worker-{number}", self._stop_event),
+                name=f"job-worker-{number}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+    def stop(self, timeout: float = 10) -> None:
+        """
+        Stop the worker processes. Their running jobs go back to the queue.
+
+        Args:
+            timeout: Seconds to wait for each process to stop before terminating it
+        """
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+_pool: Optional[JobWorkerPool] = None
+_pool_lock = threading.Lock()
+
+def start_job_workers() -> Optional[JobWorkerPool]:
+    """
+    Start the worker processes of the application, as configured by JOB_WORKERS.
+
+    Returns:
+        Optional[JobWorkerPool]: The started pool, or None when JOB_WORKERS is 0
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.getenv("JOB_WORKERS", "1"))
+            if workers <= 0:
+                return None
+            _pool = JobWorkerPool(workers)
+            _pool.start()
+        return _pool
+
+def stop_job_workers() -> None:
+    """Stop the worker processes of the application, if they were started."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the workers of the job queue")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("JOB_WORKERS", "1")), help="Worker processes")
+    args = parser.parse_args()
+
+    pool = JobWorkerPool(max(1, args.workers))
+    pool.start()
+    try:
+        for process in pool._processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+
+if __name__ == "__main__":
+    main()
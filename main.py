@@ -2,14 +2,33 @@
 Better ATS Service - Main Application
 
 This module initializes and configures the FastAPI application for the Better ATS Service.
-It sets up CORS, logging, and includes the necessary routers.
+It sets up CORS, logging, request instrumentation, and includes the necessary routers.
+The imports of the heavy dependencies and of each route module are timed for the startup
+report of /stats.
 """
 
+from contextlib import asynccontextmanager
+from observability import startup_report
+
+# Import the heavy dependencies and the routes one at a time, for the startup report
+for module in ("fastapi", "haystack", "routes.process", "routes.jobs", "routes.candidates", "routes.stats", "routes.metrics"):
+    startup_report.import_module(module)
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
 from routes.process import router as process_router
+from routes.stats import router as stats_router
+from routes.metrics import router as metrics_router
+from routes.jobs import router as jobs_router
+from routes.candidates import router as candidates_router
+from routes.uploads import UploadLimitMiddleware
+from routes.admission import AdmissionMiddleware
+from observability import ObservabilityMiddleware
+from exec import get_admission_controller, warm_up_runtime, shutdown_runtime, shutdown_conversion_engine
+from jobs import start_job_workers, stop_job_workers
 import logging
 
 # Configure logging to suppress pypdf warnings
@@ -18,11 +37,31 @@ logging.getLogger('pypdf').setLevel(logging.ERROR)
 # Load environment variables from .env file
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Manage application-wide resources.
+
+    The runtime (pipeline executor, pooled OpenAI connections and pipeline instances) is
+    started and warmed up before the first request, in each worker process. The conversion
+    engine's process pool is created lazily on first use. The worker processes of the job
+    queue are started with the application (under Gunicorn, by the master instead); on
+    shutdown their running jobs go back to the queue.
+    """
+    warm_up_runtime()
+    start_job_workers()
+    startup_report.mark_ready()
+    yield
+    stop_job_workers()
+    shutdown_conversion_engine()
+    shutdown_runtime(wait=False)
+
 # Initialize FastAPI application with metadata
 app = FastAPI(
     title="Better ATS Service",
     description="API for Better ATS Service - Processes resumes and evaluates them against job requirements",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS middleware to handle cross-origin requests
@@ -34,19 +73,55 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Admit the requests with uploads before their body is read, queueing or shedding them at the door
+app.add_middleware(AdmissionMiddleware)
+
+# Reject request bodies over the size limit as they stream in, before they are parsed
+app.add_middleware(UploadLimitMiddleware)
+
+# Time every request and its stages, and expose them as metrics (and Server-Timing headers)
+app.add_middleware(ObservabilityMiddleware)
+
 # Include routers with their tags for API documentation
 app.include_router(process_router, tags=["Process"])
+app.include_router(jobs_router, tags=["Jobs"])
+app.include_router(candidates_router, tags=["Candidates"])
+app.include_router(stats_router, tags=["Stats"])
+app.include_router(metrics_router, tags=["Stats"])
 
 @app.get("/health")
 async def health_check():
     """
-    Health check endpoint to verify the service is running.
+    Readiness check, for load balancers to route away from saturated nodes.
     
     Returns:
-        dict: A simple status message indicating the service is healthy
+        JSONResponse: 200 with status "healthy" while the node takes more work, or 503 with
+            status "saturated" while its admission queue is backed up, with the current load
+    """
+    admission = get_admission_controller().stats()
+    ready = admission["ready"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "healthy" if ready else "saturated",
+            "in_flight": admission["in_flight"],
+            "cost_in_flight": admission["cost_in_flight"],
+            "queue_depth": admission["queue_depth"]
+        }
+    )
+
+@app.get("/health/live")
+async def liveness_check():
+    """
+    Liveness check endpoint to verify the service is running, whatever its load.
+    
+    Returns:
+        dict: A simple status message indicating the service is alive
     """
     return {"status": "healthy"}
 
+startup_report.mark_imported()
+
 if __name__ == "__main__":
     import uvicorn
     
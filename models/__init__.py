@@ -1,6 +1,9 @@
 from .experience import Experience
 from .candidate import CandidateData
-from .assessment import RequirementAssessment
-from .process_output import ProcessOutput
+from .assessment import RequirementAssessment, ScreeningAssessment, IndexedRequirementAssessment, BatchRequirementAssessment
+from .process_event import AssessmentEvent
+from .process_output import ProcessOutput, CandidateProcessOutput
+from .job import JobProgress, JobOutput
+from .candidate_session import CandidateSessionOutput
 
-__all__ = ['Experience', 'CandidateData', 'RequirementAssessment', 'ProcessOutput'] 
\ No newline at end of file
+__all__ = ['Experience', 'CandidateData', 'RequirementAssessment', 'ScreeningAssessment', 'IndexedRequirementAssessment', 'BatchRequirementAssessment', 'AssessmentEvent', 'ProcessOutput', 'CandidateProcessOutput', 'JobProgress', 'JobOutput', 'CandidateSessionOutput'] 
\ No newline at end of file
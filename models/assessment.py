@@ -1,8 +1,34 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from typing import Any, List, Optional
 
 class RequirementAssessment(BaseModel):
     """Model to represent the assessment of a requirement against the candidate's documents"""
     requirement: str = Field(description="The requirement expressed in the job post")
     present_in_documents: bool = Field(description="Whether is it reasonable to expect the requirement is met based on the provided documents")
-    inquiry: Optional[str] = Field(description="A clarifying question about to ask to the candidate when the requirement doesn't seem to be met in the documents") 
\ No newline at end of file
+    inquiry: Optional[str] = Field(description="A clarifying question about to ask to the candidate when the requirement doesn't seem to be met in the documents")
+
+class ScreeningAssessment(RequirementAssessment):
+    """Model to represent a first-pass assessment of a requirement, with the confidence of the model in it"""
+    confidence: float = Field(description="How sure you are of this assessment, from 0 (a guess) to 1 (explicitly stated in the documents)")
+
+class IndexedRequirementAssessment(RequirementAssessment):
+    """Model to represent the assessment of a requirement identified by its index in a batch of requirements"""
+    index: int = Field(description="The index of the requirement in the list of requirements to assess")
+
+class BatchRequirementAssessment(BaseModel):
+    """Model to represent the assessment of several requirements returned in a single reply"""
+    assessments: List[IndexedRequirementAssessment] = Field(description="The assessment of each requirement in the batch")
+
+    @field_validator("assessments", mode="before")
+    @classmethod
+    def drop_malformed_assessments(cls, value: Any) -> Any:
+        """Keep only the items that are valid assessments, so one bad item doesn't discard the whole batch"""
+        if not isinstance(value, list):
+            return value
+        valid_items = []
+        for item in value:
+            try:
+                valid_items.append(IndexedRequirementAssessment.model_validate(item))
+            except ValidationError:
+                continue
+        return valid_items
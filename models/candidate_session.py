@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import List
+from .candidate import CandidateData
+from .assessment import RequirementAssessment
+
+class CandidateSessionOutput(BaseModel):
+    """Model to represent a candidate session and its assessment against the latest job requirements"""
+    candidate_id: str = Field(description="The identifier of the candidate session, to assess it again later")
+    candidate_data: CandidateData = Field(description="The candidate data extracted when the session was created")
+    requirements_assessment: List[RequirementAssessment] = Field(description="The assessment of each job requirement, in the order of the requirements")
+    reused_assessments: int = Field(description="The number of assessments reused from the previous assessment of the session")
+    expires_in: float = Field(description="Seconds the session stays available without being assessed again; 0 if it never expires")
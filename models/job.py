@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from .candidate import CandidateData
+from .assessment import RequirementAssessment
+
+class JobProgress(BaseModel):
+    """Model to represent how much of a job is done"""
+    completed_requirements: int = Field(description="The number of requirements already assessed")
+    total_requirements: int = Field(description="The number of requirements of the job")
+    candidate_data_done: bool = Field(description="Whether the candidate data was already extracted")
+
+class JobOutput(BaseModel):
+    """Model to represent an asynchronous processing job and the results it produced so far"""
+    job_id: str = Field(description="The identifier of the job")
+    status: str = Field(description="The status of the job: queued, running, succeeded or failed")
+    progress: JobProgress = Field(description="How much of the job is done")
+    candidate_data: Optional[CandidateData] = Field(default=None, description="The extracted candidate data, once available")
+    requirements_assessment: List[Optional[RequirementAssessment]] = Field(description="The assessment of each job requirement, in the order of the requirements; null while a requirement is pending")
+    error: Optional[str] = Field(default=None, description="The reason the job failed, or the error of its last failed attempt")
+    attempts: int = Field(description="The number of times a worker started the job")
+    created_at: float = Field(description="The time the job was submitted, as a UNIX timestamp")
+    updated_at: float = Field(description="The time of the last change of the job, as a UNIX timestamp")
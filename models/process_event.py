@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+from .assessment import RequirementAssessment
+
+class AssessmentEvent(BaseModel):
+    """Model to represent a requirement assessment streamed as soon as it completes"""
+    index: int = Field(description="The index of the requirement in the job requirements of the request")
+    assessment: RequirementAssessment = Field(description="The assessment of the requirement against the candidate's documents")
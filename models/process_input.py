@@ -6,7 +6,7 @@ It provides Pydantic models for request validation and documentation.
 """
 
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 class ProcessInput(BaseModel):
     """
@@ -19,6 +19,11 @@ class ProcessInput(BaseModel):
         job_requirements (List[str]): A list of job requirements to assess against
             the candidate's documents. Each requirement should be a clear, specific
             statement about a skill, experience, or qualification.
+        bypass_cache (bool): Skip the LLM response cache lookup for this request. Fresh
+            results are still stored in the cache.
+        deadline_seconds (Optional[float]): Seconds from the arrival of the request until
+            the response is due. Shortly before it, the results ready are returned and the
+            unfinished requirements are listed as pending.
 
     Example:
         >>> input_data = ProcessInput(
@@ -38,4 +43,15 @@ class ProcessInput(BaseModel):
             "Experience with AWS cloud services",
             "Strong background in machine learning"
         ]
-    ) 
\ No newline at end of file
+    )
+    
+    bypass_cache: bool = Field(
+        default=False,
+        description="Skip the LLM response cache lookup for this request"
+    )
+    
+    deadline_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Seconds until the response is due; unfinished requirements are then returned as pending"
+    )
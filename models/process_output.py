@@ -1,9 +1,17 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from .candidate import CandidateData
 from .assessment import RequirementAssessment
 
 class ProcessOutput(BaseModel):
     """Model to represent the output of processing a candidate's documents against job requirements"""
-    candidate_data: CandidateData = Field(description="The extracted candidate data from the documents")
-    requirements_assessment: List[RequirementAssessment] = Field(description="The assessment of each job requirement against the candidate's documents") 
\ No newline at end of file
+    candidate_data: Optional[CandidateData] = Field(description="The extracted candidate data from the documents, or None when the deadline was reached before it was extracted")
+    requirements_assessment: List[RequirementAssessment] = Field(description="The assessment of each job requirement against the candidate's documents, in requirement order, without the pending ones")
+    pending_requirements: List[str] = Field(default_factory=list, description="The job requirements not assessed before the deadline")
+    partial: bool = Field(default=False, description="Whether the deadline was reached before every result was ready")
+
+class CandidateProcessOutput(BaseModel):
+    """Model to represent the result of processing one candidate of a batch"""
+    candidate_id: str = Field(description="The identifier of the candidate, as sent in the request")
+    result: Optional[ProcessOutput] = Field(default=None, description="The processing output of the candidate, when it succeeded")
+    error: Optional[str] = Field(default=None, description="The reason the candidate could not be processed, when it failed")
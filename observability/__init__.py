@@ -0,0 +1,6 @@
+from .metrics import stage, record_stage, record_llm_usage, llm_usage_stats, record_llm_parse, llm_parse_stats, record_normalization, record_tokens_saved, normalization_stats, LLM_CALLS, LLM_RETRIES, LLM_HEDGES, DEADLINE_OUTCOMES, CASCADE_DECISIONS, COALESCED_CALLS, ADMISSION_DECISIONS
+from .middleware import ObservabilityMiddleware
+from .tracing import span, current_span
+from .startup import StartupReport, startup_report
+
+__all__ = ["stage", "record_stage", "record_llm_usage", "llm_usage_stats", "record_llm_parse", "llm_parse_stats", "record_normalization", "record_tokens_saved", "normalization_stats", "LLM_CALLS", "LLM_RETRIES", "LLM_HEDGES", "DEADLINE_OUTCOMES", "CASCADE_DECISIONS", "COALESCED_CALLS", "ADMISSION_DECISIONS", "ObservabilityMiddleware", "span", "current_span", "StartupReport", "startup_report"]
@@ -0,0 +1,344 @@
+"""
+Metrics Module
+
+This module defines the Prometheus metrics of the service and the `stage` helper used to
+instrument its hot path. A stage is timed into the stage duration histogram, opened as a
+tracing span, and added to the timings of the current request, which are sent back in a
+Server-Timing header when SERVER_TIMING_HEADER is enabled.
+
+Stages recorded by the service:
+    - upload_read: Reading and hashing the uploaded files
+    - load_documents / conversion: Loading the documents of a request / converting files
+    - prompt_render: Rendering an LLM prompt and looking it up in the LLM cache
+    - scheduler_wait: Waiting for the OpenAI scheduler to grant a call
+    - openai: The OpenAI call itself
+    - llm_parse: Parsing and validating an LLM reply into its model
+    - candidate_data / assessment / assessment_batch: End-to-end LLM steps
+    - screening: A tier of the assessment cascade screening a requirement
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from prometheus_client import Counter, Gauge, Histogram
+from .tracing import span
+
+# Latency buckets covering both in-process stages and slow LLM calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+STAGE_DURATION = Histogram(
+    "ats_stage_duration_seconds",
+    "Duration of each processing stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_DURATION = Histogram(
+    "ats_request_duration_seconds",
+    "Duration of HTTP requests, until the response is complete",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "ats_requests_in_flight",
+    "HTTP requests being processed",
+    ["route"],
+    # Summed over the live worker processes in Prometheus multiprocess mode
+    multiprocess_mode="livesum"
+)
+LLM_TOKENS = Counter(
+    "ats_llm_tokens_total",
+    "Tokens reported by OpenAI, by model and kind (prompt, cached prompt or completion)",
+    ["model", "kind"]
+)
+LLM_CALLS = Counter(
+    "ats_llm_calls_total",
+    "OpenAI call attempts, by model and outcome (ok, throttled, retryable_error, error or cancelled)",
+    ["model", "outcome"]
+)
+LLM_PARSE = Counter(
+    "ats_llm_parse_total",
+    "LLM replies parsed, by model class and outcome (direct, repaired, failed, reasked or reask_failed)",
+    ["model_class", "outcome"]
+)
+CASCADE_DECISIONS = Counter(
+    "ats_assessment_cascade_total",
+    "Requirements handled by each tier of the assessment cascade, by outcome (accepted, escalated or errors)",
+    ["tier", "outcome"]
+)
+COALESCED_CALLS = Counter(
+    "ats_coalesced_total",
+    "Calls that joined an identical computation already in flight, by flight (requests or llm_calls)",
+    ["flight"]
+)
+ADMISSION_DECISIONS = Counter(
+    "ats_admission_total",
+    "Processing requests by admission outcome (admitted, queue_full or queue_timeout)",
+    ["outcome"]
+)
+LLM_RETRIES = Counter(
+    "ats_llm_retries_total",
+    "OpenAI calls retried after a 429 or a transient failure",
+    ["model"]
+)
+DOCUMENT_NORMALIZATION = Counter(
+    "ats_document_normalization_total",
+    "Text removed from the documents by normalization, by kind (header_lines, duplicate_documents or duplicate_paragraphs)",
+    ["kind"]
+)
+LLM_HEDGES = Counter(
+    "ats_llm_hedges_total",
+    "OpenAI calls hedged with a duplicate after running past the hedge percentile, by model and winner (primary or hedge)",
+    ["model", "winner"]
+)
+DEADLINE_OUTCOMES = Counter(
+    "ats_deadline_total",
+    "Processing requests with a deadline, by outcome (complete or partial)",
+    ["outcome"]
+)
+TOKENS_SAVED = Counter(
+    "ats_tokens_saved_total",
+    "Estimated prompt tokens saved by document normalization and packing, once per LLM call carrying the documents, by step",
+    ["step"]
+)
+
+class RequestTimings:
+    """The stage timings of one request, filled from any thread working on it."""
+
+    def __init__(self):
+        self._timings: List[Tuple[str, float]] = []
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage_name: str, seconds: float) -> None:
+        """Record the duration of a stage."""
+        with self._lock:
+            self._timings.append((stage_name, seconds))
+
+    def count(self, name: str, value: int) -> None:
+        """Add to a counter of the request, such as the prompt tokens it saved."""
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + value
+
+    def server_timing(self) -> str:
+        """
+        Format the timings as a Server-Timing header value.
+
+        Stages that ran several times (e.g. one OpenAI call per requirement) are summed,
+        with the number of runs in their description. Counters of the request follow, with
+        their value as description.
+
+        Returns:
+            str: The header value, e.g. 'openai;dur=1520.3;desc="x4", llm_parse;dur=2.1,
+                tokens_saved;desc="2048"'
+        """
+        totals: Dict[str, List[float]] = {}
+        with self._lock:
+            for stage_name, seconds in self._timings:
+                totals.setdefault(stage_name, []).append(seconds)
+            counts = dict(self._counts)
+        entries = []
+        for stage_name, durations in totals.items():
+            entry = f"{stage_name};dur={sum(durations) * 1000:.1f}"
+            if len(durations) > 1:
+                entry += f';desc="x{len(durations)}"'
+            entries.append(entry)
+        entries.extend(f'{name};desc="{value}"' for name, value in counts.items())
+        return ", ".join(entries)
+
+_request_timings: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+def start_request_timings() -> Tuple[RequestTimings, contextvars.Token]:
+    """
+    Start collecting the stage timings of the current request.
+
+    Returns:
+        Tuple[RequestTimings, Token]: The timings, and the token to pass to
+            stop_request_timings once the request is done
+    """
+    timings = RequestTimings()
+    return timings, _request_timings.set(timings)
+
+def stop_request_timings(token: contextvars.Token) -> None:
+    """Stop collecting the stage timings started with start_request_timings."""
+    _request_timings.reset(token)
+
+def record_stage(stage_name: str, seconds: float) -> None:
+    """
+    Record the duration of a stage measured by the caller.
+
+    Args:
+        stage_name (str): Name of the stage
+        seconds (float): Duration of the stage
+    """
+    STAGE_DURATION.labels(stage=stage_name).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(stage_name, seconds)
+
+@contextmanager
+def stage(stage_name: str, **attributes: Any) -> Iterator[None]:
+    """
+    Time a stage of the processing, as a span of the current request.
+
+    Args:
+        stage_name (str): Name of the stage
+        **attributes: Attributes of the span
+
+    Example:
+        >>> with stage("conversion", files=len(sources)):
+        ...     documents = convert(sources)
+    """
+    started = time.perf_counter()
+    try:
+        with span(stage_name, **attributes):
+            yield
+    finally:
+        record_stage(stage_name, time.perf_counter() - started)
+
+# Token totals per model since startup, for the stats endpoint
+_llm_usage: Dict[str, Dict[str, int]] = {}
+_llm_usage_lock = threading.Lock()
+
+def _cached_tokens(usage: Dict[str, Any]) -> int:
+    details = usage.get("prompt_tokens_details")
+    if details is None:
+        return 0
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+    return getattr(details, "cached_tokens", None) or 0
+
+def record_llm_usage(model: str, usage: Optional[Dict[str, Any]]) -> None:
+    """
+    Count the tokens of an OpenAI call.
+
+    Prompt tokens served from OpenAI's prompt cache are also counted as the "cached" kind.
+
+    Args:
+        model (str): The model of the call
+        usage (Optional[Dict[str, Any]]): The usage reported by OpenAI, if any
+    """
+    if not usage:
+        return
+    tokens = {
+        "prompt": usage.get("prompt_tokens") or 0,
+        "cached": _cached_tokens(usage),
+        "completion": usage.get("completion_tokens") or 0
+    }
+    for kind, count in tokens.items():
+        if count:
+            LLM_TOKENS.labels(model=model, kind=kind).inc(count)
+    with _llm_usage_lock:
+        totals = _llm_usage.setdefault(model, {"calls": 0, "prompt": 0, "cached": 0, "completion": 0})
+        totals["calls"] += 1
+        for kind, count in tokens.items():
+            totals[kind] += count
+
+def llm_usage_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the tokens reported by OpenAI since startup.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per model, the number of calls, the prompt, cached prompt
+            and completion tokens, and the share of prompt tokens served from the prompt cache
+    """
+    with _llm_usage_lock:
+        return {
+            model: {
+                "calls": totals["calls"],
+                "prompt_tokens": totals["prompt"],
+                "cached_tokens": totals["cached"],
+                "completion_tokens": totals["completion"],
+                "cached_ratio": round(totals["cached"] / totals["prompt"], 4) if totals["prompt"] else 0.0
+            }
+            for model, totals in _llm_usage.items()
+        }
+
+# Parse outcomes since startup, per model class, for the stats endpoint
+PARSE_OUTCOMES = ("direct", "repaired", "failed", "reasked", "reask_failed")
+_llm_parse: Dict[str, Dict[str, int]] = {}
+_llm_parse_lock = threading.Lock()
+
+def record_llm_parse(model_class: str, outcome: str) -> None:
+    """
+    Count the outcome of parsing an LLM reply.
+
+    Args:
+        model_class (str): The name of the model class the reply was parsed into
+        outcome (str): "direct" when the reply was valid as it was, "repaired" when it was
+            repaired locally, "failed" when it couldn't be, and "reasked" or "reask_failed"
+            for the reply to the re-ask of a failed one
+    """
+    LLM_PARSE.labels(model_class=model_class, outcome=outcome).inc()
+    with _llm_parse_lock:
+        counts = _llm_parse.setdefault(model_class, dict.fromkeys(PARSE_OUTCOMES, 0))
+        counts[outcome] += 1
+
+def llm_parse_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the outcomes of parsing LLM replies since startup.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per model class, the count of each outcome, and the share
+            of the replies (re-asks excluded) that had to be repaired and that failed
+    """
+    with _llm_parse_lock:
+        stats = {}
+        for model_class, counts in _llm_parse.items():
+            replies = counts["direct"] + counts["repaired"] + counts["failed"]
+            stats[model_class] = {
+                **counts,
+                "repair_rate": round(counts["repaired"] / replies, 4) if replies else 0.0,
+                "failure_rate": round(counts["failed"] / replies, 4) if replies else 0.0
+            }
+        return stats
+
+# Normalization totals since startup, for the stats endpoint
+_normalization: Dict[str, Any] = {"header_lines": 0, "duplicate_documents": 0, "duplicate_paragraphs": 0, "tokens_saved": {}}
+_normalization_lock = threading.Lock()
+
+def record_normalization(report: Dict[str, int]) -> None:
+    """
+    Count the text removed by a document normalization.
+
+    Args:
+        report (Dict[str, int]): The report of the DocumentNormalizer, with the number of
+            header_lines, duplicate_documents and duplicate_paragraphs removed
+    """
+    with _normalization_lock:
+        for kind in ("header_lines", "duplicate_documents", "duplicate_paragraphs"):
+            if report.get(kind):
+                DOCUMENT_NORMALIZATION.labels(kind=kind).inc(report[kind])
+                _normalization[kind] += report[kind]
+
+def record_tokens_saved(step: str, tokens: int) -> None:
+    """
+    Count the prompt tokens saved by normalizing and packing the documents of LLM calls.
+
+    The tokens are also added to the tokens_saved counter of the current request, sent in
+    its Server-Timing header.
+
+    Args:
+        step (str): The step of the LLM calls (candidate_data or assessment)
+        tokens (int): The tokens removed from the documents, times the calls carrying them
+    """
+    if tokens <= 0:
+        return
+    TOKENS_SAVED.labels(step=step).inc(tokens)
+    with _normalization_lock:
+        _normalization["tokens_saved"][step] = _normalization["tokens_saved"].get(step, 0) + tokens
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.count("tokens_saved", tokens)
+
+def normalization_stats() -> Dict[str, Any]:
+    """
+    Get the text removed by document normalization since startup.
+
+    Returns:
+        Dict[str, Any]: The header and footer lines, duplicate documents and duplicate
+            paragraphs removed, and the prompt tokens saved by each step
+    """
+    with _normalization_lock:
+        return {**_normalization, "tokens_saved": dict(_normalization["tokens_saved"])}
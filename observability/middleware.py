@@ -0,0 +1,72 @@
+"""
+Observability Middleware Module
+
+This module provides the ASGI middleware that opens the root span of each HTTP request,
+tracks the requests in flight, records their duration, and collects the timings of their
+stages. When SERVER_TIMING_HEADER is enabled, the stages completed before the response
+starts are sent back in a Server-Timing header. For streamed responses, that is only the
+work done before the first byte.
+"""
+
+import os
+import time
+from typing import Any, Callable, Dict
+from dotenv import load_dotenv
+from starlette.routing import Match
+from .metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT, start_request_timings, stop_request_timings
+from .tracing import span
+
+# Load environment variables at module initialization
+load_dotenv()
+
+class ObservabilityMiddleware:
+    """
+    ASGI middleware instrumenting every HTTP request.
+
+    Attributes:
+        app: The wrapped ASGI application
+        server_timing (bool): Whether to send the Server-Timing header
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self.server_timing = os.getenv("SERVER_TIMING_HEADER", "false").lower() == "true"
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route_template(scope)
+        method = scope["method"]
+        status = "500"
+        timings, token = start_request_timings()
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                if self.server_timing:
+                    header = timings.server_timing()
+                    if header:
+                        message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.labels(route=route).inc()
+        try:
+            with span("request", method=method, route=route):
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUESTS_IN_FLIGHT.labels(route=route).dec()
+            REQUEST_DURATION.labels(method=method, route=route, status=status).observe(time.perf_counter() - started)
+            stop_request_timings(token)
+
+    def _route_template(self, scope: Dict[str, Any]) -> str:
+        # Label requests by route template (e.g. /jobs/{job_id}) to keep the label set small
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
@@ -0,0 +1,136 @@
+"""
+Startup Module
+
+This module measures how long the service takes to start, from the start of the process:
+the import time of its heavy dependencies and of each route module, the warm-up of each
+pipeline, the time until the application is ready to serve, and the time until the first
+successful /process.
+
+Times are measured from the start of the process when the platform reports it (Linux),
+otherwise from the import of this module. In a worker forked from a preloaded server, they
+are measured from the start of the server, so they show the cold start a client sees.
+"""
+
+import importlib
+import logging
+import os
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+def _process_started() -> float:
+    """Get the start of the process on the monotonic clock, or now when it is unknown."""
+    now = time.monotonic()
+    try:
+        with open("/proc/self/stat") as file:
+            # The process name may hold spaces, so count the fields after it
+            fields = file.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as file:
+            uptime = float(file.read().split()[0])
+        age = uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return now
+    return now - max(0.0, age)
+
+class StartupReport:
+    """
+    The startup timings of the process.
+
+    All times are in seconds since the start of the process, except the import and warm-up
+    durations.
+    """
+
+    def __init__(self):
+        self.started = _process_started()
+        self.pid = os.getpid()
+        self._imports: Dict[str, float] = {}
+        self._warm_up: Dict[str, float] = {}
+        self._imported: Optional[float] = None
+        self._ready: Optional[float] = None
+        self._first_process: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _since_start(self) -> float:
+        return round(time.monotonic() - self.started, 4)
+
+    def import_module(self, name: str) -> ModuleType:
+        """
+        Import a module, recording how long it took.
+
+        Modules imported by an earlier one are already loaded, so the recorded time is the
+        time of what the module adds; the times of a sequence of imports add up.
+
+        Args:
+            name (str): The module to import
+
+        Returns:
+            ModuleType: The imported module
+        """
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        self._imports[name] = round(time.perf_counter() - started, 4)
+        return module
+
+    def record_warm_up(self, name: str, seconds: float) -> None:
+        """
+        Record the warm-up time of a pipeline.
+
+        Args:
+            name (str): The name of the pipeline
+            seconds (float): The time taken to build its first instance
+        """
+        self._warm_up[name] = round(seconds, 4)
+
+    def mark_imported(self) -> None:
+        """Record that the application module is imported and its application created."""
+        self._imported = self._since_start()
+
+    def mark_ready(self) -> None:
+        """Record that the application is ready to serve, and log the startup times."""
+        self._ready = self._since_start()
+        logger.info(
+            "Ready in %.2fs (imported in %.2fs, pipelines warmed up in %.2fs)",
+            self._ready, self._imported or 0.0, sum(self._warm_up.values())
+        )
+
+    def mark_first_process(self) -> None:
+        """Record the first successful /process of this process. Later calls are ignored."""
+        if self._first_process is None:
+            with self._lock:
+                if self._first_process is None:
+                    self._first_process = self._since_start()
+
+    def milestones(self) -> Dict[str, float]:
+        """
+        Get the startup milestones reached so far.
+
+        Returns:
+            Dict[str, float]: Seconds from the start of the process until the application was
+                imported, was ready, and served its first successful /process
+        """
+        reached = {"imported": self._imported, "ready": self._ready, "first_process": self._first_process}
+        return {milestone: seconds for milestone, seconds in reached.items() if seconds is not None}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the startup timings.
+
+        Returns:
+            Dict[str, Any]: The import time of each timed module, the warm-up time of each
+                pipeline, the seconds from the start of the process until the application
+                was imported, was ready, and served its first successful /process, and
+                whether the process was forked from a preloaded server
+        """
+        return {
+            "imports_s": dict(self._imports),
+            "warm_up_s": dict(self._warm_up),
+            "imported_s": self._imported,
+            "ready_s": self._ready,
+            "first_process_s": self._first_process,
+            "preloaded": os.getpid() != self.pid
+        }
+
+startup_report = StartupReport()
@@ -0,0 +1,95 @@
+"""
+Tracing Module
+
+This module provides lightweight spans that follow a request through the service. The
+current span lives in a context variable, which asyncio tasks and the pipeline executor
+copy, so the spans of every requirement assessment and pipeline run are linked to the
+span of the HTTP request that started them.
+
+Finished spans are logged at DEBUG level by the "observability.tracing" logger with their
+trace id, span id and parent span id. When OpenTelemetry is installed, each span is also
+recorded as an OpenTelemetry span, so the traces can be exported to any OTLP backend.
+"""
+
+import contextvars
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # OpenTelemetry is an optional dependency
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Span:
+    """
+    A timed unit of work.
+
+    Attributes:
+        name (str): Name of the span
+        trace_id (str): Id shared by every span of the same request
+        span_id (str): Id of the span
+        parent_id (Optional[str]): Id of the parent span, None for the request span
+        attributes (Dict[str, Any]): Attributes describing the work
+        started (float): Monotonic start time of the span
+    """
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    """
+    Get the span of the current context.
+
+    Returns:
+        Optional[Span]: The innermost open span, or None outside of any span
+    """
+    return _current_span.get()
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Open a span for the duration of the block, as a child of the current span.
+
+    Args:
+        name (str): Name of the span
+        **attributes: Attributes describing the work
+
+    Yields:
+        Span: The open span
+    """
+    parent = _current_span.get()
+    new_span = Span(
+        name=name,
+        trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent else None,
+        attributes=attributes
+    )
+    token = _current_span.set(new_span)
+    otel_span = otel_trace.get_tracer(__name__).start_as_current_span(name, attributes=attributes) if otel_trace else None
+    try:
+        if otel_span is not None:
+            with otel_span:
+                yield new_span
+        else:
+            yield new_span
+    finally:
+        _current_span.reset(token)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "span %s trace=%s span=%s parent=%s duration=%.4fs %s",
+                name, new_span.trace_id, new_span.span_id, new_span.parent_id,
+                time.perf_counter() - new_span.started, new_span.attributes
+            )
@@ -1,6 +1,12 @@
-from .assessment_pipeline import assessment_pipeline
-from .candidate_data_pipeline import candidate_data_pipeline
-from .load_documents_pipeline import load_documents_pipeline
-from .utils import get_format_instructions
+from .assessment_pipeline import create_assessment_pipeline, get_assessment_prompt_layout, render_assessment_prefix, get_assessment_cascade, KEYWORD_TIER
+from .batch_assessment_pipeline import create_batch_assessment_pipeline
+from .candidate_data_pipeline import create_candidate_data_pipeline
+from .load_documents_pipeline import create_load_documents_pipeline
+from .document_normalizer import DocumentNormalizer, create_document_normalizer, normalization_enabled, get_document_token_budget, pack_documents, tokens_saved
+from .retrieval import RequirementRetriever
+from .candidate_chunks import split_candidate_documents
+from .prefixed_prompt_builder import PrefixedChatPromptBuilder
+from .llm_to_model_component import LLMToModel, LLMParseError, parse_reply
+from .utils import get_format_instructions, estimate_tokens, create_openai_generator
 
-__all__ = ["assessment_pipeline", "candidate_data_pipeline", "load_documents_pipeline", "get_format_instructions"]
\ No newline at end of file
+__all__ = ["create_assessment_pipeline", "get_assessment_prompt_layout", "render_assessment_prefix", "get_assessment_cascade", "KEYWORD_TIER", "create_batch_assessment_pipeline", "create_candidate_data_pipeline", "create_load_documents_pipeline", "DocumentNormalizer", "create_document_normalizer", "normalization_enabled", "get_document_token_budget", "pack_documents", "tokens_saved", "RequirementRetriever", "split_candidate_documents", "PrefixedChatPromptBuilder", "LLMToModel", "LLMParseError", "parse_reply", "get_format_instructions", "estimate_tokens", "create_openai_generator"]
\ No newline at end of file
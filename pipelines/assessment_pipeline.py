@@ -4,15 +4,33 @@ Assessment Pipeline Module
 This module defines a Haystack pipeline for assessing job requirements against candidate documents.
 It uses OpenAI's LLM to analyze each requirement and determine if it's met by the candidate's
 experience, providing clarifying questions when needed.
+
+The prompt layout is chosen with the ASSESSMENT_PROMPT_LAYOUT environment variable:
+    - requirement_first (default): The requirement is stated before the documents, in a
+      single prompt rendered for each requirement
+    - prefix: The system prompt, format instructions and documents form a shared prefix,
+      rendered once per request with render_assessment_prefix, and the requirement comes
+      last in its own message. Every assessment prompt of a request then starts with the
+      same bytes, so OpenAI's prompt caching can reuse the documents across requirements.
+
+The ASSESSMENT_CASCADE environment variable lists the screening tiers tried before
+ASSESSMENT_MODEL, cheapest first: "keyword" for the local keyword matcher, or the name of a
+cheaper model, which gets its own assessment pipeline producing a ScreeningAssessment.
 """
 
 import os
+from functools import lru_cache
+from typing import List, Optional, Type
+import httpx
 from dotenv import load_dotenv
 from haystack import Pipeline
 from haystack.components.builders import ChatPromptBuilder
 from haystack.dataclasses import ChatMessage
-from haystack.components.generators.chat import OpenAIChatGenerator
+from haystack import Document
 from .llm_to_model_component import LLMToModel
+from .prefixed_prompt_builder import PrefixedChatPromptBuilder
+from .utils import create_openai_generator
+from pydantic import BaseModel
 from models import RequirementAssessment
 
 # Load environment variables
@@ -46,30 +64,135 @@ assessment_template = [
     ),
 ]
 
-# Initialize the assessment pipeline
-assessment_pipeline = Pipeline()
+# Shared prefix of the prefix layout: everything that doesn't depend on the requirement
+assessment_prefix_template = [
+    assessment_template[0],
+    ChatMessage.from_user(
+        """Your goal is decide if a candidate most likely meets the a requirement for a job. If it does, you just need to confirm that the experience or skill is present int the document. If you are not reasonably sure, then you should formulate a question to the candidate to give them a chance to provide additional information.
 
-# Add prompt building component
-assessment_pipeline.add_component(
-    instance=ChatPromptBuilder(template=assessment_template),
-    name="assessment_prompt"
-)
+        {{format_instructions}}
 
-# Add OpenAI chat component with configurable model
-assessment_pipeline.add_component(
-    instance=OpenAIChatGenerator(
-        model=os.getenv("ASSESSMENT_MODEL", "gpt-4")
-    ),
-    name="openai_generator"
-)
+        The documents where you are going to review to do your assessment are the following:
+
+        {% for doc in documents %}
+        {{doc.meta["file_path"]}}:
+
+        {{doc.content}}
+
+        ---
+        {% endfor %}
 
-# Add component to convert LLM output to RequirementAssessment model
-assessment_pipeline.add_component(
-    instance=LLMToModel(model_class=RequirementAssessment),
-    name="llm_to_model"
-)
+        The requirement you need to assess is given in the next message.
+        """
+    ),
+]
 
-# Connect pipeline components
-assessment_pipeline.connect("assessment_prompt.prompt", "openai_generator.messages")
-assessment_pipeline.connect("openai_generator.replies", "llm_to_model.replies")
+# Per-requirement suffix of the prefix layout
+assessment_suffix_template = [
+    ChatMessage.from_user(
+        """This is the requirement you need to assess:
+        ```
+        {{requirement}}
+        ```
+        """
+    ),
+]
 
+PROMPT_LAYOUTS = ("requirement_first", "prefix")
+
+def get_assessment_prompt_layout() -> str:
+    """
+    Get the configured layout of the assessment prompt.
+
+    Returns:
+        str: "requirement_first" or "prefix", from ASSESSMENT_PROMPT_LAYOUT
+    """
+    layout = os.getenv("ASSESSMENT_PROMPT_LAYOUT", "requirement_first").lower()
+    if layout not in PROMPT_LAYOUTS:
+        raise ValueError(f"Unknown ASSESSMENT_PROMPT_LAYOUT {layout}, expected one of {', '.join(PROMPT_LAYOUTS)}")
+    return layout
+
+# Cascade tier answered by the local keyword matcher instead of a model
+KEYWORD_TIER = "keyword"
+
+def get_assessment_cascade() -> List[str]:
+    """
+    Get the screening tiers tried before ASSESSMENT_MODEL.
+
+    Returns:
+        List[str]: The tiers of ASSESSMENT_CASCADE, in order: "keyword" or a model name.
+            Empty when the cascade is disabled.
+    """
+    return [tier.strip() for tier in os.getenv("ASSESSMENT_CASCADE", "").split(",") if tier.strip()]
+
+@lru_cache(maxsize=1)
+def _prefix_builder() -> ChatPromptBuilder:
+    return ChatPromptBuilder(template=assessment_prefix_template)
+
+def render_assessment_prefix(documents: List[Document], format_instructions: str) -> List[ChatMessage]:
+    """
+    Render the shared prefix of the assessment prompts of a request (prefix layout).
+
+    Args:
+        documents (List[Document]): The documents of the candidate
+        format_instructions (str): Instructions for formatting the assessment output
+
+    Returns:
+        List[ChatMessage]: The messages every assessment prompt of the request starts with
+    """
+    return _prefix_builder().run(documents=documents, format_instructions=format_instructions)["prompt"]
+
+def create_assessment_pipeline(
+    http_client: Optional[httpx.Client] = None,
+    model: Optional[str] = None,
+    model_class: Type[BaseModel] = RequirementAssessment
+) -> Pipeline:
+    """
+    Create an assessment pipeline.
+
+    Pipelines are not shared between threads: the runtime keeps a pool of instances and
+    checks one out for each LLM call.
+
+    With the requirement_first layout, the prompt component takes the documents, the
+    requirement and the format instructions. With the prefix layout, it takes the prefix
+    rendered by render_assessment_prefix and the requirement.
+
+    Args:
+        http_client (Optional[httpx.Client]): The pooled HTTP client of the OpenAI generator
+        model (Optional[str]): The OpenAI model, defaults to ASSESSMENT_MODEL
+        model_class (Type[BaseModel]): The model parsed from the reply, such as
+            ScreeningAssessment for the model tiers of the cascade
+
+    Returns:
+        Pipeline: A new pipeline producing a RequirementAssessment (or model_class)
+    """
+    # Initialize the assessment pipeline
+    assessment_pipeline = Pipeline()
+
+    # Add prompt building component for the configured layout
+    if get_assessment_prompt_layout() == "prefix":
+        prompt_builder = PrefixedChatPromptBuilder(suffix_template=assessment_suffix_template)
+    else:
+        prompt_builder = ChatPromptBuilder(template=assessment_template)
+    assessment_pipeline.add_component(
+        instance=prompt_builder,
+        name="assessment_prompt"
+    )
+
+    # Add OpenAI chat component with configurable model
+    assessment_pipeline.add_component(
+        instance=create_openai_generator(model or os.getenv("ASSESSMENT_MODEL", "gpt-4"), http_client=http_client),
+        name="openai_generator"
+    )
+
+    # Add component to convert LLM output to RequirementAssessment model
+    assessment_pipeline.add_component(
+        instance=LLMToModel(model_class=model_class),
+        name="llm_to_model"
+    )
+
+    # Connect pipeline components
+    assessment_pipeline.connect("assessment_prompt.prompt", "openai_generator.messages")
+    assessment_pipeline.connect("openai_generator.replies", "llm_to_model.replies")
+
+    return assessment_pipeline
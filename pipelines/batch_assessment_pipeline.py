@@ -0,0 +1,91 @@
+"""
+Batch Assessment Pipeline Module
+
+This module defines a Haystack pipeline for assessing several job requirements against
+candidate documents in a single LLM call. The documents are sent once per batch instead
+of once per requirement, and each assessment in the reply is tied back to its requirement
+through the index it was listed with.
+"""
+
+import os
+from typing import Optional
+import httpx
+from dotenv import load_dotenv
+from haystack import Pipeline
+from haystack.components.builders import ChatPromptBuilder
+from haystack.dataclasses import ChatMessage
+from .llm_to_model_component import LLMToModel
+from .utils import create_openai_generator
+from models import BatchRequirementAssessment
+
+# Load environment variables
+load_dotenv()
+
+# System prompt defining the AI's role and purpose
+batch_assessment_template = [
+    ChatMessage.from_system(
+        "You are a clever assistant that can infer if a candidate meets the requirements of a job"
+    ),
+    ChatMessage.from_user(
+        """Your goal is decide, for each requirement of a job, if a candidate most likely meets it. If it does, you just need to confirm that the experience or skill is present int the document. If you are not reasonably sure, then you should formulate a question to the candidate to give them a chance to provide additional information.
+
+        Format the response as a JSON object with a single key "assessments", containing a list with exactly one item per requirement. Each item of the list is itself a JSON object, following these instructions:
+
+        {{format_instructions}}
+
+        These are the requirements you need to assess, each one preceded by its index:
+        ```
+        {% for requirement in requirements %}
+        [{{loop.index0}}] {{requirement}}
+        {% endfor %}
+        ```
+
+        The documents where you are going to review to do your assessment are the following:
+
+        {% for doc in documents %}
+        {{doc.meta["file_path"]}}:
+
+        {{doc.content}}
+
+        ---
+        {% endfor %}
+        """
+    ),
+]
+
+def create_batch_assessment_pipeline(http_client: Optional[httpx.Client] = None) -> Pipeline:
+    """
+    Create a batch assessment pipeline.
+
+    Args:
+        http_client (Optional[httpx.Client]): The pooled HTTP client of the OpenAI generator
+
+    Returns:
+        Pipeline: A new pipeline producing a BatchRequirementAssessment
+    """
+    # Initialize the batch assessment pipeline
+    batch_assessment_pipeline = Pipeline()
+
+    # Add prompt building component
+    batch_assessment_pipeline.add_component(
+        instance=ChatPromptBuilder(template=batch_assessment_template),
+        name="assessment_prompt"
+    )
+
+    # Add OpenAI chat component with configurable model
+    batch_assessment_pipeline.add_component(
+        instance=create_openai_generator(os.getenv("ASSESSMENT_MODEL", "gpt-4"), http_client=http_client),
+        name="openai_generator"
+    )
+
+    # Add component to convert LLM output to BatchRequirementAssessment model
+    batch_assessment_pipeline.add_component(
+        instance=LLMToModel(model_class=BatchRequirementAssessment),
+        name="llm_to_model"
+    )
+
+    # Connect pipeline components
+    batch_assessment_pipeline.connect("assessment_prompt.prompt", "openai_generator.messages")
+    batch_assessment_pipeline.connect("openai_generator.replies", "llm_to_model.replies")
+
+    return batch_assessment_pipeline
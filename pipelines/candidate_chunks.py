@@ -0,0 +1,65 @@
+"""
+Candidate Chunks Module
+
+This module splits a candidate's documents for the map-reduce candidate data extraction.
+Documents are split by file, then by page and section (blank lines), and consecutive
+sections of the same file are packed into chunks within a token budget, so each chunk
+holds whole sections, such as complete experiences, whenever they fit.
+"""
+
+import re
+from typing import List
+from haystack import Document
+from .utils import estimate_tokens
+
+# Page breaks (form feeds of PDF conversion) and blank lines separate the sections of a document
+SECTION_BREAK = re.compile(r"\f|\n\s*\n")
+
+def _sections(text: str, chunk_tokens: int) -> List[str]:
+    """Split a text into sections, splitting sections over the budget by line."""
+    sections = []
+    for section in SECTION_BREAK.split(text):
+        section = section.strip()
+        if not section:
+            continue
+        if estimate_tokens(section) <= chunk_tokens:
+            sections.append(section)
+        else:
+            sections.extend(line.strip() for line in section.splitlines() if line.strip())
+    return sections
+
+def split_candidate_documents(documents: List[Document], chunk_tokens: int) -> List[Document]:
+    """
+    Split documents into chunks of whole sections within a token budget.
+
+    Args:
+        documents (List[Document]): The documents of the candidate
+        chunk_tokens (int): Maximum estimated tokens of a chunk. A single line over the budget
+            still makes its own chunk.
+
+    Returns:
+        List[Document]: The chunks, in document order, with the meta of their document and
+            their position in it under "chunk". The documents are returned unchanged when
+            they already fit in the budget together.
+    """
+    if sum(estimate_tokens(document.content) for document in documents) <= chunk_tokens:
+        return documents
+
+    chunks: List[Document] = []
+    for document in documents:
+        if not document.content:
+            continue
+        current: List[str] = []
+        current_tokens = 0
+        position = 0
+        for section in _sections(document.content, chunk_tokens):
+            section_tokens = estimate_tokens(section)
+            if current and current_tokens + section_tokens > chunk_tokens:
+                chunks.append(Document(content="\n\n".join(current), meta={**document.meta, "chunk": position}))
+                position += 1
+                current, current_tokens = [], 0
+            current.append(section)
+            current_tokens += section_tokens
+        if current:
+            chunks.append(Document(content="\n\n".join(current), meta={**document.meta, "chunk": position}))
+    return chunks
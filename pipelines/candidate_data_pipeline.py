@@ -7,12 +7,14 @@ into a standardized CandidateData format.
 """
 
 import os
+from typing import Optional
+import httpx
 from dotenv import load_dotenv
 from haystack import Pipeline
 from haystack.components.builders import ChatPromptBuilder
 from haystack.dataclasses import ChatMessage
-from haystack.components.generators.chat import OpenAIChatGenerator
 from .llm_to_model_component import LLMToModel
+from .utils import create_openai_generator
 from models import CandidateData
 
 # Load environment variables
@@ -43,29 +45,39 @@ candidate_data_template = [
     ),
 ]
 
-# Initialize the candidate data extraction pipeline
-candidate_data_pipeline = Pipeline()
+def create_candidate_data_pipeline(http_client: Optional[httpx.Client] = None) -> Pipeline:
+    """
+    Create a candidate data extraction pipeline.
 
-# Add prompt building component
-candidate_data_pipeline.add_component(
-    instance=ChatPromptBuilder(template=candidate_data_template),
-    name="candidate_prompt"
-)
+    Args:
+        http_client (Optional[httpx.Client]): The pooled HTTP client of the OpenAI generator
 
-# Add OpenAI chat component with configurable model
-candidate_data_pipeline.add_component(
-    instance=OpenAIChatGenerator(
-        model=os.getenv("CANDIDATE_DATA_MODEL", "gpt-4")
-    ),
-    name="openai_generator"
-)
-
-# Add component to convert LLM output to CandidateData model
-candidate_data_pipeline.add_component(
-    instance=LLMToModel(model_class=CandidateData),
-    name="llm_to_model"
-)
-
-# Connect pipeline components
-candidate_data_pipeline.connect("candidate_prompt.prompt", "openai_generator.messages")
-candidate_data_pipeline.connect("openai_generator.replies", "llm_to_model.replies")
+    Returns:
+        Pipeline: A new pipeline producing a CandidateData
+    """
+    # Initialize the candidate data extraction pipeline
+    candidate_data_pipeline = Pipeline()
+
+    # Add prompt building component
+    candidate_data_pipeline.add_component(
+        instance=ChatPromptBuilder(template=candidate_data_template),
+        name="candidate_prompt"
+    )
+
+    # Add OpenAI chat component with configurable model
+    candidate_data_pipeline.add_component(
+        instance=create_openai_generator(os.getenv("CANDIDATE_DATA_MODEL", "gpt-4"), http_client=http_client),
+        name="openai_generator"
+    )
+
+    # Add component to convert LLM output to CandidateData model
+    candidate_data_pipeline.add_component(
+        instance=LLMToModel(model_class=CandidateData),
+        name="llm_to_model"
+    )
+
+    # Connect pipeline components
+    candidate_data_pipeline.connect("candidate_prompt.prompt", "openai_generator.messages")
+    candidate_data_pipeline.connect("openai_generator.replies", "llm_to_model.replies")
+
+    return candidate_data_pipeline
@@ -0,0 +1,402 @@
+"""
+Document Normalizer Module
+
+This module cleans the text of converted documents before it is sent to the LLM. Every token
+removed from the documents is saved once per LLM call carrying them, so once per requirement.
+
+Cleaning (per file, so its result can be cached with the file):
+    - Collapses runs of spaces, tabs and blank lines, keeping paragraph and page breaks
+    - Joins words hyphenated across line breaks, unless the document also writes the word
+      with its hyphen on one line (so "self-\nmotivated" stays "self-motivated") or the
+      word is a longer compound ("state-of-the-\nart")
+    - Strips headers and footers repeated at the top or bottom of the pages of a PDF,
+      keeping their first occurrence (such as the candidate's name), and page numbers everywhere
+
+Deduplication (across the files of a request):
+    - Drops documents that are near-identical to an earlier one, such as the same resume
+      uploaded as both PDF and DOCX
+    - Drops paragraphs that are near-identical to an earlier one
+
+Near-duplicates are found with MinHash signatures of word shingles, bucketed by LSH bands,
+and confirmed by the similarity of their signatures.
+
+Documents can also be packed into a token budget per model, with the following truncation
+priority rules:
+    1. The budget is shared fairly between the documents: documents under their share keep
+       all their text, and what they leave unused goes to the larger ones.
+    2. A document over its share loses whole paragraphs from its end first, so the contact
+       details, summary and most recent experience at its top are kept.
+    3. A truncated document ends with a marker telling the LLM that text was left out.
+
+Each document keeps the estimated tokens of its text before normalization under the
+"raw_tokens" meta, to report the tokens saved.
+
+The normalization is configured with the following environment variables:
+    - DOCUMENT_NORMALIZATION: Whether to normalize converted documents (true/false, off by
+      default since it changes the text the LLM sees)
+    - DOCUMENT_DEDUPE_THRESHOLD: Estimated similarity from which texts are near-duplicates
+    - DOCUMENT_TOKEN_BUDGET: Maximum estimated tokens of the documents of a prompt (0 for no limit)
+    - DOCUMENT_TOKEN_BUDGET_<MODEL>: Budget for one model, overriding DOCUMENT_TOKEN_BUDGET,
+      e.g. DOCUMENT_TOKEN_BUDGET_GPT_4O_MINI for gpt-4o-mini
+"""
+
+import os
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+import numpy as np
+from dotenv import load_dotenv
+from haystack import Document, component
+from .utils import estimate_tokens
+
+# Load environment variables at module initialization
+load_dotenv()
+
+# Meta key holding the estimated tokens of a document before normalization and packing
+RAW_TOKENS_META_KEY = "raw_tokens"
+
+# Marker appended to documents truncated to fit the token budget
+TRUNCATION_MARKER = "[... truncated ...]"
+
+# Non-empty lines at the top and bottom of each page considered as headers and footers
+EDGE_LINES = 2
+
+# Share of the pages a line must be repeated on to be a header or footer
+REPEATED_LINE_SHARE = 0.5
+
+# Words of a shingle, and minimum words of a paragraph checked for near-duplicates
+SHINGLE_WORDS = 3
+MIN_PARAGRAPH_WORDS = 8
+
+# MinHash signature length, split into LSH bands of rows
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_random = np.random.RandomState(1)
+_HASH_A = _random.randint(1, _MERSENNE_PRIME, size=NUM_PERMUTATIONS, dtype=np.int64)
+_HASH_B = _random.randint(0, _MERSENNE_PRIME, size=NUM_PERMUTATIONS, dtype=np.int64)
+
+_HORIZONTAL_SPACE = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_HYPHENATION = re.compile(r"((?:[A-Za-z]+-)*[A-Za-z]*[a-z])-\n[ \t]*([a-z][A-Za-z]*)")
+_HYPHENATED_WORD = re.compile(r"\b[A-Za-z]+(?:-[A-Za-z]+)+\b")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?#(\s*(of|/)\s*#)?$")
+_WORD = re.compile(r"\w+")
+
+def _line_key(line: str) -> str:
+    # Page numbers and dates change from page to page; compare lines without their digits
+    return re.sub(r"\d+", "#", line.lower()).strip()
+
+def _clean_page(page: str, hyphenated: Set[str]) -> str:
+    def join(match: re.Match) -> str:
+        # A compound, or a word the document hyphenates elsewhere, keeps its hyphen
+        word = f"{match.group(1)}-{match.group(2)}"
+        return word if "-" in match.group(1) or word.lower() in hyphenated else match.group(1) + match.group(2)
+
+    page = _HYPHENATION.sub(join, page.replace("\r\n", "\n").replace("\r", "\n"))
+    lines = [_HORIZONTAL_SPACE.sub(" ", line).strip() for line in page.split("\n")]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+def _strip_repeated_lines(pages: List[str]) -> Tuple[List[str], int]:
+    """Strip the header and footer lines repeated across pages, returning the lines removed."""
+    if len(pages) < 2:
+        return pages, 0
+    page_lines = [page.split("\n") for page in pages]
+    edge_indexes = []
+    counts: Dict[str, int] = {}
+    for lines in page_lines:
+        filled = [index for index, line in enumerate(lines) if line]
+        # Short pages only have their first and last lines checked, so their body is kept
+        edge_lines = EDGE_LINES if len(filled) > 2 * EDGE_LINES else min(1, len(filled) // 3)
+        edges = set(filled[:edge_lines] + filled[len(filled) - edge_lines:])
+        edge_indexes.append(edges)
+        for key in {_line_key(lines[index]) for index in edges}:
+            counts[key] = counts.get(key, 0) + 1
+    min_pages = max(2, int(len(pages) * REPEATED_LINE_SHARE + 0.5))
+    repeated = {key for key, count in counts.items() if count >= min_pages}
+    if not repeated:
+        return pages, 0
+
+    removed = 0
+    seen = set()
+    cleaned = []
+    for lines, edges in zip(page_lines, edge_indexes):
+        kept = []
+        for index, line in enumerate(lines):
+            key = _line_key(line)
+            if index in edges and key in repeated:
+                if key in seen or _PAGE_NUMBER.match(key):
+                    removed += 1
+                    continue
+                seen.add(key)
+            kept.append(line)
+        cleaned.append("\n".join(kept).strip())
+    return cleaned, removed
+
+def clean_document(document: Document) -> Tuple[Document, int]:
+    """
+    Clean the text of a document.
+
+    Args:
+        document (Document): A converted document; pages are separated by form feeds
+
+    Returns:
+        Tuple[Document, int]: The cleaned document, with the estimated tokens of its original
+            text under the "raw_tokens" meta, and the number of header and footer lines removed
+    """
+    content = document.content or ""
+    hyphenated = {word.lower() for word in _HYPHENATED_WORD.findall(content)}
+    pages, removed = _strip_repeated_lines([_clean_page(page, hyphenated) for page in content.split("\f")])
+    meta = {**document.meta}
+    meta.setdefault(RAW_TOKENS_META_KEY, estimate_tokens(content))
+    return Document(content="\f".join(pages).strip("\f"), meta=meta), removed
+
+def _signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of the word shingles of a text, or None when it has no words."""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return None
+    shingles = {" ".join(words[index:index + SHINGLE_WORDS]) for index in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles), dtype=np.int64, count=len(shingles))
+    return ((np.outer(_HASH_A, hashes) + _HASH_B[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+class NearDuplicateIndex:
+    """
+    An LSH index of MinHash signatures, answering whether a text is a near-duplicate of one
+    added before.
+
+    Attributes:
+        threshold (float): Estimated Jaccard similarity of the shingles from which two texts
+            are near-duplicates
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._signatures: List[np.ndarray] = []
+        self._items: List[Any] = []
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._rows = NUM_PERMUTATIONS // LSH_BANDS
+
+    def add(self, text: str, item: Any = True) -> Any:
+        """
+        Add a text, unless it is a near-duplicate of a text added before.
+
+        Args:
+            text (str): The text to add
+            item (Any): The item the text belongs to, returned for its near-duplicates
+
+        Returns:
+            Any: The item of the text it duplicates, or None if it was added (texts without
+                words are never duplicates)
+        """
+        signature = _signature(text)
+        if signature is None:
+            return None
+        bands = [(band, signature[band * self._rows:(band + 1) * self._rows].tobytes()) for band in range(LSH_BANDS)]
+        candidates = {index for band in bands for index in self._buckets.get(band, [])}
+        for index in sorted(candidates):
+            if np.mean(self._signatures[index] == signature) >= self.threshold:
+                return self._items[index]
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        self._items.append(item)
+        for band in bands:
+            self._buckets.setdefault(band, []).append(index)
+        return None
+
+def dedupe_documents(documents: List[Document], threshold: float) -> Tuple[List[Document], int, int]:
+    """
+    Drop the documents and paragraphs that are near-duplicates of earlier ones.
+
+    The estimated raw tokens of a dropped document are added to the document it duplicates,
+    so the tokens saved are still reported.
+
+    Args:
+        documents (List[Document]): The documents of a request, in upload order
+        threshold (float): Estimated similarity from which texts are near-duplicates
+
+    Returns:
+        Tuple[List[Document], int, int]: The remaining documents, the number of documents
+            dropped and the number of paragraphs dropped
+    """
+    document_index = NearDuplicateIndex(threshold)
+    kept: List[Tuple[str, Dict[str, Any]]] = []
+    duplicate_documents = 0
+    for document in documents:
+        meta = {**document.meta}
+        original = document_index.add(document.content or "", meta)
+        if original is None:
+            kept.append((document.content or "", meta))
+            continue
+        original[RAW_TOKENS_META_KEY] = original.get(RAW_TOKENS_META_KEY, 0) + meta.get(RAW_TOKENS_META_KEY, estimate_tokens(document.content))
+        duplicate_documents += 1
+
+    paragraph_index = NearDuplicateIndex(threshold)
+    duplicate_paragraphs = 0
+    deduped = []
+    for content, meta in kept:
+        meta.setdefault(RAW_TOKENS_META_KEY, estimate_tokens(content))
+        pages = []
+        for page in content.split("\f"):
+            paragraphs = []
+            for paragraph in _PARAGRAPH_BREAK.split(page):
+                if len(_WORD.findall(paragraph)) >= MIN_PARAGRAPH_WORDS and paragraph_index.add(paragraph) is not None:
+                    duplicate_paragraphs += 1
+                    continue
+                paragraphs.append(paragraph)
+            pages.append("\n\n".join(paragraphs))
+        deduped.append(Document(content="\f".join(pages), meta=meta))
+    return deduped, duplicate_documents, duplicate_paragraphs
+
+def _truncate(document: Document, token_budget: int) -> Document:
+    """Keep the paragraphs at the top of a document that fit in a token budget."""
+    budget = max(0, token_budget - estimate_tokens(TRUNCATION_MARKER))
+    kept: List[str] = []
+    used = 0
+    for paragraph in _PARAGRAPH_BREAK.split(document.content.replace("\f", "\n\n")):
+        tokens = estimate_tokens(paragraph) + 1
+        if used + tokens > budget:
+            if not kept:
+                # A first paragraph over the budget is cut at the budget
+                kept.append(paragraph[:budget * 4])
+            break
+        kept.append(paragraph)
+        used += tokens
+    return Document(content="\n\n".join(kept + [TRUNCATION_MARKER]), meta={**document.meta, "truncated": True})
+
+def pack_documents(documents: List[Document], token_budget: int) -> List[Document]:
+    """
+    Pack documents into a token budget, truncating the ones over their share.
+
+    Args:
+        documents (List[Document]): The documents of the request
+        token_budget (int): Maximum estimated tokens of all the documents; 0 disables packing
+
+    Returns:
+        List[Document]: The documents unchanged when they fit, otherwise the documents with
+            the larger ones truncated to their share of the budget
+    """
+    sizes = [estimate_tokens(document.content) for document in documents]
+    if token_budget <= 0 or sum(sizes) <= token_budget:
+        return documents
+
+    # Share the budget fairly: small documents keep everything, larger ones split the rest
+    allowances = [0] * len(documents)
+    remaining = token_budget
+    pending = sorted(range(len(documents)), key=lambda index: sizes[index])
+    while pending:
+        share = remaining // len(pending)
+        index = pending[0]
+        if sizes[index] > share:
+            for index in pending:
+                allowances[index] = share
+            break
+        allowances[index] = sizes[index]
+        remaining -= sizes[index]
+        pending.pop(0)
+
+    return [
+        document if sizes[index] <= allowances[index] else _truncate(document, allowances[index])
+        for index, document in enumerate(documents)
+    ]
+
+def tokens_saved(documents: List[Document]) -> int:
+    """
+    Estimate the tokens removed from documents by normalization and packing.
+
+    Args:
+        documents (List[Document]): Normalized (and possibly packed) documents
+
+    Returns:
+        int: Their estimated raw tokens minus their estimated current tokens
+    """
+    return max(0, sum(
+        document.meta.get(RAW_TOKENS_META_KEY, estimate_tokens(document.content)) - estimate_tokens(document.content)
+        for document in documents
+    ))
+
+@component
+class DocumentNormalizer:
+    """
+    A Haystack component cleaning converted documents and dropping their near-duplicates.
+
+    Attributes:
+        clean (bool): Whether to clean the text of each document
+        dedupe (bool): Whether to drop near-duplicate documents and paragraphs
+        threshold (float): Estimated similarity from which texts are near-duplicates
+    """
+
+    def __init__(self, clean: bool = True, dedupe: bool = True, threshold: float = 0.85):
+        """
+        Initialize the DocumentNormalizer component.
+
+        Args:
+            clean: Whether to clean the text of each document. Cleaning depends on the file
+                alone, so cleaned documents can be cached per file.
+            dedupe: Whether to drop near-duplicate documents and paragraphs. Deduplication
+                depends on the other documents of the request.
+            threshold: Estimated similarity from which texts are near-duplicates
+        """
+        self.clean = clean
+        self.dedupe = dedupe
+        self.threshold = threshold
+
+    @component.output_types(documents=List[Document], report=Dict[str, Any])
+    def run(self, documents: List[Document]) -> Dict[str, Any]:
+        """
+        Normalize documents.
+
+        Args:
+            documents (List[Document]): The converted documents, in upload order
+
+        Returns:
+            Dict[str, Any]: The normalized documents under "documents", and under "report" the
+                estimated tokens before and after normalization and the number of header and
+                footer lines, documents and paragraphs removed
+        """
+        tokens_in = sum(estimate_tokens(document.content) for document in documents)
+        report = {"tokens_in": tokens_in, "header_lines": 0, "duplicate_documents": 0, "duplicate_paragraphs": 0}
+        if self.clean:
+            cleaned = []
+            for document in documents:
+                document, removed = clean_document(document)
+                cleaned.append(document)
+                report["header_lines"] += removed
+            documents = cleaned
+        if self.dedupe:
+            documents, report["duplicate_documents"], report["duplicate_paragraphs"] = dedupe_documents(documents, self.threshold)
+        report["tokens_out"] = sum(estimate_tokens(document.content) for document in documents)
+        return {"documents": documents, "report": report}
+
+def normalization_enabled() -> bool:
+    """Whether converted documents are normalized, as configured by DOCUMENT_NORMALIZATION."""
+    return os.getenv("DOCUMENT_NORMALIZATION", "false").lower() == "true"
+
+def create_document_normalizer(clean: bool = True, dedupe: bool = True) -> DocumentNormalizer:
+    """
+    Create a document normalizer with the configured near-duplicate threshold.
+
+    Args:
+        clean (bool): Whether to clean the text of each document
+        dedupe (bool): Whether to drop near-duplicate documents and paragraphs
+
+    Returns:
+        DocumentNormalizer: A new normalizer
+    """
+    return DocumentNormalizer(clean=clean, dedupe=dedupe, threshold=float(os.getenv("DOCUMENT_DEDUPE_THRESHOLD", "0.85")))
+
+def get_document_token_budget(model: str) -> int:
+    """
+    Get the token budget of the documents of a prompt sent to a model.
+
+    Args:
+        model (str): The name of the model, e.g. gpt-4o-mini
+
+    Returns:
+        int: DOCUMENT_TOKEN_BUDGET_<MODEL> if set, otherwise DOCUMENT_TOKEN_BUDGET; 0 for no limit
+    """
+    suffix = re.sub(r"\W", "_", model).upper()
+    budget = os.getenv(f"DOCUMENT_TOKEN_BUDGET_{suffix}")
+    return int(budget if budget is not None else os.getenv("DOCUMENT_TOKEN_BUDGET", "0"))
@@ -0,0 +1,342 @@
+"""
+JSON Repair Module
+
+This module turns LLM replies that are almost JSON into objects matching a Pydantic model,
+without calling the LLM again:
+
+- JsonObjectCollector follows a streamed reply and tells when its outermost JSON object is
+  complete, so the rest of the stream (closing fences, explanations) can be dropped
+- extract_json_object takes the outermost JSON object out of surrounding prose or fences
+- repair_json fixes the syntax errors LLMs commonly make: trailing, missing or doubled
+  commas, missing colons, single-quoted strings, unquoted keys and words, Python literals
+  (True, False, None), comments, raw line breaks and stray quotes inside strings, and
+  objects truncated by the token limit
+- coerce_to_schema converts the values of a parsed object to the field types of a model:
+  "yes" to true, "80%" to 0.8, a single item to a list, a number to a string, field names
+  in another case, and missing optional fields to null
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Union, get_args, get_origin
+from pydantic import BaseModel
+
+# Bare words read as JSON literals, in any case
+LITERALS = {"true": "true", "false": "false", "null": "null", "none": "null", "undefined": "null", "nan": "null"}
+
+# Words read as a boolean when a field expects one
+TRUE_WORDS = {"true", "yes", "y", "1", "met", "present", "found"}
+FALSE_WORDS = {"false", "no", "n", "0", "not met", "absent", "not present", "not found", "none"}
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?%?")
+_WORD = re.compile(r"[A-Za-z_][\w\-./@+]*")
+_ANY_NUMBER = re.compile(r"[-+]?\d*\.?\d+")
+_NEXT_KEY = re.compile(r'"[^"\n]*"\s*:')
+
+class JsonObjectCollector:
+    """
+    Follows the text of a streamed reply, finding where its outermost JSON object ends.
+
+    Strings are followed so braces inside them are not counted.
+
+    Attributes:
+        complete (bool): Whether the outermost object has been closed
+    """
+
+    def __init__(self):
+        self.complete = False
+        self._parts: List[str] = []
+        self._length = 0
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> bool:
+        """
+        Add the next part of the reply.
+
+        Args:
+            text (str): The text streamed since the last call
+
+        Returns:
+            bool: Whether the outermost object is complete
+        """
+        offset = self._length
+        self._parts.append(text)
+        self._length += len(text)
+        if self.complete:
+            return True
+        for index, char in enumerate(text):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"' and self._start is not None:
+                self._in_string = True
+            elif char == "{":
+                if self._start is None:
+                    self._start = offset + index
+                self._depth += 1
+            elif char == "}" and self._start is not None:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end = offset + index + 1
+                    self.complete = True
+                    return True
+        return False
+
+    @property
+    def text(self) -> str:
+        """The whole text fed so far"""
+        return "".join(self._parts)
+
+    @property
+    def object_text(self) -> Optional[str]:
+        """The outermost object, up to the end of the text if it is not complete, or None before it starts"""
+        if self._start is None:
+            return None
+        return self.text[self._start:self._end]
+
+def extract_json_object(text: str) -> Optional[str]:
+    """
+    Take the outermost JSON object out of a reply.
+
+    Args:
+        text (str): The reply, possibly with prose or code fences around the object
+
+    Returns:
+        Optional[str]: The text from the first opening brace to the brace closing it (or to
+            the end of the reply when it was truncated), or None when there is no object
+    """
+    collector = JsonObjectCollector()
+    collector.feed(text)
+    return collector.object_text
+
+class _Repairer:
+    """Rewrites almost-JSON text as JSON, in a single pass."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.index = 0
+        self.out: List[str] = []
+        # Open containers: [kind, state]. Objects go key -> colon -> comma, arrays go value -> comma
+        self.stack: List[List[str]] = []
+
+    def run(self) -> str:
+        text = self.text
+        while self.index < len(text):
+            char = text[self.index]
+            if char in "{[":
+                self._before_value()
+                self.out.append(char)
+                self.stack.append([char, "key" if char == "{" else "value"])
+                self.index += 1
+            elif char in "}]":
+                self.index += 1
+                if not self.stack:
+                    break
+                self._close()
+                if not self.stack:
+                    # Whatever follows the outermost value is not part of it
+                    break
+            elif char in "\"'":
+                self._string(char)
+            elif char == "/" and text.startswith(("//", "/*"), self.index):
+                end = text.find("\n" if text[self.index + 1] == "/" else "*/", self.index + 2)
+                self.index = len(text) if end < 0 else end + (1 if text[self.index + 1] == "/" else 2)
+            elif (match := _NUMBER.match(text, self.index)) and (char.isdigit() or char in "-+."):
+                self._number(match.group(0))
+                self.index = match.end()
+            elif match := _WORD.match(text, self.index):
+                self._word(match.group(0))
+                self.index = match.end()
+            else:
+                # Commas and colons are written where they are needed; anything else is dropped
+                self.index += 1
+        while self.stack:
+            self._close()
+        return "".join(self.out)
+
+    def _before_value(self) -> None:
+        if not self.stack:
+            return
+        frame = self.stack[-1]
+        if frame[1] == "comma":
+            self.out.append(",")
+            frame[1] = "key" if frame[0] == "{" else "value"
+        elif frame[1] == "colon":
+            self.out.append(":")
+            frame[1] = "value"
+
+    def _after_value(self) -> None:
+        if not self.stack:
+            return
+        frame = self.stack[-1]
+        frame[1] = "colon" if frame[1] == "key" else "comma"
+
+    def _close(self) -> None:
+        kind, state = self.stack.pop()
+        if state == "colon":
+            # A key without a value, such as the last one of a truncated reply
+            self.out.append(":null")
+        elif state == "value" and kind == "{":
+            self.out.append("null")
+        self.out.append("}" if kind == "{" else "]")
+        self._after_value()
+
+    def _emit_string(self, value: str) -> None:
+        self._before_value()
+        self.out.append(json.dumps(value))
+        self._after_value()
+
+    def _closes_string(self, position: int) -> bool:
+        # A quote closes its string when what follows can only come after a string, or is
+        # the next key of the object (a missing comma)
+        rest = self.text[position + 1:]
+        stripped = rest.lstrip()
+        if not stripped or stripped[0] in ",:}]":
+            return True
+        return stripped[0] == '"' and ("\n" in rest[:len(rest) - len(stripped)] or _NEXT_KEY.match(stripped) is not None)
+
+    def _string(self, quote: str) -> None:
+        text = self.text
+        chars: List[str] = []
+        index = self.index + 1
+        while index < len(text):
+            char = text[index]
+            if char == "\\" and index + 1 < len(text):
+                escaped = text[index + 1]
+                if escaped == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", text[index + 2:index + 6]):
+                    chars.append(chr(int(text[index + 2:index + 6], 16)))
+                    index += 6
+                    continue
+                chars.append({"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}.get(escaped, escaped if escaped in "\"'\\/" else "\\" + escaped))
+                index += 2
+                continue
+            if char == quote and self._closes_string(index):
+                index += 1
+                break
+            chars.append(char)
+            index += 1
+        self.index = index
+        self._emit_string("".join(chars))
+
+    def _key_position(self) -> bool:
+        return bool(self.stack) and self.stack[-1][0] == "{" and self.stack[-1][1] in ("key", "comma")
+
+    def _number(self, token: str) -> None:
+        if token.endswith("%") or self._key_position():
+            self._emit_string(token)
+            return
+        # JSON numbers have no sign nor dot without digits around them: "+1", ".5", "-.5", "5."
+        sign, digits = ("-", token[1:]) if token.startswith("-") else ("", token.lstrip("+"))
+        digits = ("0" + digits if digits.startswith(".") else digits).replace(".e", "e").replace(".E", "E").rstrip(".")
+        try:
+            value = json.loads(sign + digits)
+        except ValueError:
+            self._emit_string(token)
+            return
+        self._before_value()
+        self.out.append(json.dumps(value))
+        self._after_value()
+
+    def _word(self, word: str) -> None:
+        literal = LITERALS.get(word.lower())
+        # In the place of a key, words are keys even when they read as literals
+        if literal is None or self._key_position():
+            self._emit_string(word)
+            return
+        self._before_value()
+        self.out.append(literal)
+        self._after_value()
+
+def repair_json(text: str) -> str:
+    """
+    Fix the common syntax errors of almost-JSON text.
+
+    Args:
+        text (str): The text of a JSON value, such as the output of extract_json_object
+
+    Returns:
+        str: The text rewritten as JSON. Containers left open by a truncated reply are
+            closed, and a key left without its value gets null.
+    """
+    return _Repairer(text).run()
+
+def _field_key(name: str) -> str:
+    return re.sub(r"[^0-9a-z]", "", name.lower())
+
+def _number(value: Any, annotation: type) -> Any:
+    if isinstance(value, bool) or not isinstance(value, str):
+        return value
+    match = _ANY_NUMBER.search(value)
+    if not match:
+        return value
+    number = float(match.group(0))
+    if annotation is float and value.strip().endswith("%"):
+        number /= 100
+    return int(number) if annotation is int else number
+
+def coerce_to_schema(value: Any, annotation: Any) -> Any:
+    """
+    Convert a parsed JSON value to the types of a model field, where the conversion is obvious.
+
+    Values that can't be converted are returned unchanged, so the model validation reports them.
+
+    Args:
+        value (Any): The parsed value
+        annotation (Any): The type expected, such as a Pydantic model class or a field annotation
+
+    Returns:
+        Any: The converted value
+    """
+    origin = get_origin(annotation)
+    if origin is Union:
+        options = [option for option in get_args(annotation) if option is not type(None)]
+        if value is None or not options:
+            return value
+        return coerce_to_schema(value, options[0])
+    if origin in (list, List):
+        (item_annotation,) = get_args(annotation) or (Any,)
+        if value is None:
+            return []
+        items = value if isinstance(value, list) else [value]
+        return [coerce_to_schema(item, item_annotation) for item in items]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        if isinstance(value, list) and len(value) == 1:
+            value = value[0]
+        if not isinstance(value, dict):
+            return value
+        fields = annotation.model_fields
+        names = {_field_key(name): name for name in fields}
+        coerced: Dict[str, Any] = {}
+        for key, item in value.items():
+            name = names.get(_field_key(key), key)
+            coerced[name] = coerce_to_schema(item, fields[name].annotation) if name in fields else item
+        for name, field in fields.items():
+            if name not in coerced and type(None) in get_args(field.annotation):
+                coerced[name] = None
+        return coerced
+    if annotation is bool and isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        word = str(value).strip().lower().rstrip(".")
+        if word in TRUE_WORDS:
+            return True
+        if word in FALSE_WORDS:
+            return False
+        return value
+    if annotation is str:
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, (int, float)):
+            return str(value)
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return ", ".join(value)
+        return value
+    if annotation in (int, float):
+        return _number(value, annotation)
+    return value
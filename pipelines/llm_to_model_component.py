@@ -4,14 +4,65 @@ LLM to Model Component Module
 This module provides a custom Haystack component that converts LLM outputs into
 structured Pydantic models. It handles the parsing and validation of LLM responses
 into strongly-typed data structures.
+
+Replies are validated directly first. Replies that are not valid as they are (prose around
+the JSON, syntax errors, truncated objects, values of the wrong type) are repaired locally
+with the json_repair module before giving up. The outcome of every parse (direct, repaired
+or failed) is counted per model class.
 """
 
 import json
-
 from haystack import component
 from haystack.dataclasses import ChatMessage
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ValidationError
+from typing import List, Dict, Any, Tuple
+from observability import stage, record_llm_parse
+from .json_repair import coerce_to_schema, extract_json_object, repair_json
+
+class LLMParseError(ValueError):
+    """
+    Raised when an LLM reply can't be parsed into its model, even after local repair.
+
+    Attributes:
+        reply (str): The content of the reply
+    """
+
+    def __init__(self, message: str, reply: str):
+        super().__init__(message)
+        self.reply = reply
+
+def parse_reply(content: str, model_class: type[BaseModel]) -> Tuple[BaseModel, str]:
+    """
+    Parse the content of an LLM reply into a model, repairing it locally when needed.
+
+    Args:
+        content (str): The content of the reply
+        model_class (type[BaseModel]): The Pydantic model class to parse the reply into
+
+    Returns:
+        Tuple[BaseModel, str]: The parsed model, and "direct" when the reply was valid as
+            it was or "repaired" when it had to be repaired
+
+    Raises:
+        LLMParseError: If the reply can't be repaired into a valid model
+    """
+    raw_content = content.strip()
+    if raw_content.startswith("```json") and raw_content.endswith("```"):
+        raw_content = raw_content[len("```json"): -len("```")].strip()
+    try:
+        return model_class.model_validate_json(raw_content), "direct"
+    except ValidationError:
+        pass
+
+    object_text = extract_json_object(content)
+    if object_text is None:
+        raise LLMParseError("The reply holds no JSON object", reply=content)
+    try:
+        data = json.loads(repair_json(object_text))
+        return model_class.model_validate(coerce_to_schema(data, model_class)), "repaired"
+    except ValueError as e:
+        # ValidationError and JSONDecodeError are both ValueErrors
+        raise LLMParseError(str(e), reply=content) from e
 
 @component
 class LLMToModel:
@@ -50,10 +101,16 @@ class LLMToModel:
         Returns:
             Dict[str, Any]: Dictionary containing the parsed and validated model
                 under the 'model' key.
+
+        Raises:
+            LLMParseError: If the reply can't be parsed, even after local repair
         """
-        for reply in replies:
-            raw_content = reply.content
-            if raw_content.startswith("```json") and raw_content.endswith("```"):
-                raw_content = raw_content[len("```json"): -len("```")].strip()
-            parsed_model = self.model_class.model_validate_json(raw_content)
-            return {"model": parsed_model}
\ No newline at end of file
+        with stage("llm_parse", model_class=self.model_class.__name__):
+            for reply in replies:
+                try:
+                    parsed_model, outcome = parse_reply(reply.content, self.model_class)
+                except LLMParseError:
+                    record_llm_parse(self.model_class.__name__, "failed")
+                    raise
+                record_llm_parse(self.model_class.__name__, outcome)
+                return {"model": parsed_model}
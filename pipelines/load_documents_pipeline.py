@@ -4,49 +4,70 @@ Document Loading Pipeline Module
 This module defines a Haystack pipeline for loading and preprocessing documents from various file formats.
 The pipeline handles both PDF and DOCX files, converting them into Haystack Document objects for further
 processing. It uses a router to direct files to appropriate converters based on their MIME types, and
-then joins all processed documents into a single collection.
+then joins all processed documents into a single collection. When DOCUMENT_NORMALIZATION is
+enabled, the joined documents are cleaned (whitespace, hyphenation, repeated headers and
+footers) before they are returned.
 
 Components:
     - FileTypeRouter: Routes files based on MIME type
     - PyPDFToDocument: Converts PDF files to Document objects
     - DOCXToDocument: Converts DOCX files to Document objects
     - DocumentJoiner: Combines all processed documents into a single collection
+    - DocumentNormalizer: Cleans the text of each document (when normalization is enabled)
 """
 
 from haystack import Pipeline
-from haystack.components.converters import PyPDFToDocument
-from haystack.components.converters.docx import DOCXToDocument
-from haystack.components.joiners.document_joiner import DocumentJoiner
-from haystack.components.routers import FileTypeRouter
+from .document_normalizer import create_document_normalizer, normalization_enabled
 
-# Initialize the main document loading pipeline
-load_documents_pipeline = Pipeline()
+def create_load_documents_pipeline() -> Pipeline:
+    """
+    Create a document loading pipeline.
 
-# Add router to handle different file types based on MIME types
-# Supports PDF (.pdf) and Word (.docx) documents
-load_documents_pipeline.add_component(instance=FileTypeRouter(mime_types=[
-    "application/pdf",  # PDF files
-    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"  # DOCX files
-]), name="file_type_router")
+    Returns:
+        Pipeline: A new pipeline converting PDF and DOCX sources into Documents
+    """
+    # The converters (and pypdf) are imported when the first pipeline is built, not with the service
+    from haystack.components.converters import PyPDFToDocument
+    from haystack.components.converters.docx import DOCXToDocument
+    from haystack.components.joiners.document_joiner import DocumentJoiner
+    from haystack.components.routers import FileTypeRouter
 
-# Add converter for PDF files
-load_documents_pipeline.add_component(instance=PyPDFToDocument(), name="pdf_converter")
+    # Initialize the main document loading pipeline
+    load_documents_pipeline = Pipeline()
 
-# Add converter for DOCX files
-load_documents_pipeline.add_component(instance=DOCXToDocument(), name="docx_converter")
+    # Add router to handle different file types based on MIME types
+    # Supports PDF (.pdf) and Word (.docx) documents
+    load_documents_pipeline.add_component(instance=FileTypeRouter(mime_types=[
+        "application/pdf",  # PDF files
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document"  # DOCX files
+    ]), name="file_type_router")
 
-# Add joiner to combine all processed documents
-load_documents_pipeline.add_component(instance=DocumentJoiner(), name="joiner")
+    # Add converter for PDF files
+    load_documents_pipeline.add_component(instance=PyPDFToDocument(), name="pdf_converter")
 
-# Connect pipeline components:
-# 1. Route PDF files to PDF converter
-load_documents_pipeline.connect("file_type_router.application/pdf", "pdf_converter.sources")
+    # Add converter for DOCX files
+    load_documents_pipeline.add_component(instance=DOCXToDocument(), name="docx_converter")
 
-# 2. Route DOCX files to DOCX converter
-load_documents_pipeline.connect("file_type_router.application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx_converter.sources")
+    # Add joiner to combine all processed documents
+    load_documents_pipeline.add_component(instance=DocumentJoiner(), name="joiner")
 
-# 3. Connect PDF converter output to joiner
-load_documents_pipeline.connect("pdf_converter.documents", "joiner.documents")
+    # Connect pipeline components:
+    # 1. Route PDF files to PDF converter
+    load_documents_pipeline.connect("file_type_router.application/pdf", "pdf_converter.sources")
 
-# 4. Connect DOCX converter output to joiner
-load_documents_pipeline.connect("docx_converter.documents", "joiner.documents")
\ No newline at end of file
+    # 2. Route DOCX files to DOCX converter
+    load_documents_pipeline.connect("file_type_router.application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx_converter.sources")
+
+    # 3. Connect PDF converter output to joiner
+    load_documents_pipeline.connect("pdf_converter.documents", "joiner.documents")
+
+    # 4. Connect DOCX converter output to joiner
+    load_documents_pipeline.connect("docx_converter.documents", "joiner.documents")
+
+    # 5. Clean the joined documents. Near-duplicates depend on the other files of the
+    # request, so they are dropped later, once the documents of every file are loaded
+    if normalization_enabled():
+        load_documents_pipeline.add_component(instance=create_document_normalizer(dedupe=False), name="normalizer")
+        load_documents_pipeline.connect("joiner.documents", "normalizer.documents")
+
+    return load_documents_pipeline
@@ -0,0 +1,105 @@
+"""
+Metered Generator Component Module
+
+This module provides an OpenAI chat generator that records the latency of each call as
+the "openai" stage and counts the prompt and completion tokens OpenAI reports, per model.
+
+When streaming is enabled, the reply is read as it is generated and the stream is closed
+once the outermost JSON object of the reply is complete and anything but whitespace follows
+it, such as a closing code fence or an explanation, so those tokens are neither waited for
+nor generated. The usage of a stream cut short is not reported by OpenAI, so it is estimated.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from haystack import component
+from haystack.components.generators.chat import OpenAIChatGenerator
+from haystack.dataclasses import ChatMessage, StreamingChunk
+from observability import stage, record_llm_usage
+from .json_repair import JsonObjectCollector
+from .utils import estimate_tokens
+
+def _to_openai_message(message: ChatMessage) -> Dict[str, str]:
+    """Serialize a message for the Chat Completions API."""
+    openai_message = {"role": message.role.value, "content": message.content}
+    if message.name:
+        openai_message["name"] = message.name
+    return openai_message
+
+@component
+class MeteredOpenAIChatGenerator(OpenAIChatGenerator):
+    """
+    An OpenAIChatGenerator whose calls are timed and whose token usage is counted.
+
+    Attributes:
+        stream_json (bool): Whether to stream replies and stop reading them once their JSON
+            object is complete
+    """
+
+    stream_json = False
+
+    @component.output_types(replies=List[ChatMessage])
+    def run(
+        self,
+        messages: List[ChatMessage],
+        streaming_callback: Optional[Callable[[StreamingChunk], None]] = None,
+        generation_kwargs: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Send the messages to OpenAI, recording the call latency and token usage.
+
+        Args:
+            messages (List[ChatMessage]): The messages of the conversation
+            streaming_callback (Optional[Callable]): Callback invoked for each streamed chunk
+            generation_kwargs (Optional[Dict[str, Any]]): Extra parameters for the completion
+
+        Returns:
+            Dict[str, Any]: The replies of the model under the 'replies' key
+        """
+        with stage("openai", model=self.model):
+            if self.stream_json and streaming_callback is None:
+                result = self._run_json_stream(messages, generation_kwargs)
+            else:
+                # The component decorator rebuilds the class, so the parent is named explicitly
+                result = OpenAIChatGenerator.run(self, messages, streaming_callback=streaming_callback, generation_kwargs=generation_kwargs)
+        for reply in result["replies"]:
+            record_llm_usage(self.model, reply.meta.get("usage"))
+        return result
+
+    def _run_json_stream(self, messages: List[ChatMessage], generation_kwargs: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Stream a reply, closing the stream once its JSON object is complete."""
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[_to_openai_message(message) for message in messages],
+            stream=True,
+            stream_options={"include_usage": True},
+            **{**self.generation_kwargs, **(generation_kwargs or {})}
+        )
+        collector = JsonObjectCollector()
+        model, finish_reason, usage = self.model, None, None
+        try:
+            for chunk in stream:
+                model = chunk.model or model
+                if chunk.usage is not None:
+                    usage = chunk.usage.model_dump()
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                content = chunk.choices[0].delta.content or ""
+                if collector.complete and content.strip():
+                    # The object is complete and the model went on: stop generating
+                    finish_reason = "stop"
+                    break
+                collector.feed(content)
+        finally:
+            stream.close()
+
+        text = collector.object_text if collector.complete else collector.text
+        if usage is None:
+            usage = {
+                "prompt_tokens": sum(estimate_tokens(message.content) for message in messages),
+                "completion_tokens": estimate_tokens(collector.text),
+                "estimated": True
+            }
+        reply = ChatMessage.from_assistant(text)
+        reply.meta.update({"model": model, "index": 0, "finish_reason": finish_reason, "usage": usage})
+        return {"replies": [reply]}
@@ -0,0 +1,50 @@
+"""
+Prefixed Prompt Builder Component Module
+
+This module provides a prompt builder for prompts made of a large shared prefix and a small
+per-call suffix. The prefix (system prompt, instructions and documents) is rendered once by
+the caller and passed in as messages; only the suffix template is rendered for each call.
+Every prompt built from the same prefix therefore starts with byte-identical messages,
+which lets OpenAI's prompt caching reuse the prefix across calls.
+"""
+
+from typing import Any, Dict, List
+from haystack import component
+from haystack.components.builders import ChatPromptBuilder
+from haystack.dataclasses import ChatMessage
+from jinja2 import meta
+from jinja2.sandbox import SandboxedEnvironment
+
+@component
+class PrefixedChatPromptBuilder:
+    """
+    A component appending rendered suffix messages to a pre-rendered message prefix.
+    """
+
+    def __init__(self, suffix_template: List[ChatMessage]):
+        """
+        Initialize the builder.
+
+        Args:
+            suffix_template (List[ChatMessage]): The template of the messages rendered for
+                each call and appended to the prefix. Its variables become inputs of the component.
+        """
+        self._suffix_builder = ChatPromptBuilder(template=suffix_template)
+        environment = SandboxedEnvironment()
+        for message in suffix_template:
+            for name in meta.find_undeclared_variables(environment.parse(message.content)):
+                component.set_input_type(self, name, Any, "")
+
+    @component.output_types(prompt=List[ChatMessage])
+    def run(self, prefix: List[ChatMessage], **kwargs) -> Dict[str, List[ChatMessage]]:
+        """
+        Build the prompt of one call.
+
+        Args:
+            prefix (List[ChatMessage]): The rendered messages shared by every call
+            **kwargs: The variables of the suffix template
+
+        Returns:
+            Dict[str, List[ChatMessage]]: The prefix followed by the rendered suffix, under the 'prompt' key
+        """
+        return {"prompt": list(prefix) + self._suffix_builder.run(**kwargs)["prompt"]}
@@ -0,0 +1,136 @@
+"""
+Requirement Retrieval Module
+
+This module provides an optional retrieval stage for the assessment pipeline. The
+candidate's documents are split into chunks once per request and indexed in an
+in-memory BM25 store, so each requirement is assessed against only its most relevant
+chunks instead of the full text of every document. All components are local and
+work offline.
+
+Components:
+    - DocumentSplitter: Splits the documents into overlapping word chunks
+    - InMemoryDocumentStore: Holds the chunks of one request
+    - InMemoryBM25Retriever: Ranks the chunks against each requirement
+
+InMemoryDocumentStore keeps the data of each index for the life of the process, whatever
+happens to the store object. The requests therefore take their index from a pool, and empty
+it when they are done, so the number of indexes stays bounded by the requests run at once.
+"""
+
+import threading
+from typing import List
+from haystack import Document
+from haystack.components.preprocessors import DocumentSplitter
+from haystack.components.retrievers.in_memory import InMemoryBM25Retriever
+from haystack.document_stores.in_memory import InMemoryDocumentStore
+from haystack.document_stores.types import DuplicatePolicy
+from .utils import estimate_tokens
+
+# Indexes of the requests done, emptied and ready for the next ones
+_free_indexes: List[str] = []
+_indexes_lock = threading.Lock()
+_index_count = 0
+
+def _acquire_index() -> str:
+    global _index_count
+    with _indexes_lock:
+        if _free_indexes:
+            return _free_indexes.pop()
+        _index_count += 1
+        return f"requirement-retrieval-{_index_count}"
+
+class RequirementRetriever:
+    """
+    A per-request BM25 index over chunks of the candidate's documents.
+
+    Attributes:
+        documents (List[Document]): The full documents, returned when retrieval finds nothing
+        document_store (InMemoryDocumentStore): The store holding the chunks of the documents
+        retriever (InMemoryBM25Retriever): The BM25 retriever over the store
+    """
+
+    def __init__(self, documents: List[Document], chunk_words: int = 120, chunk_overlap: int = 20):
+        """
+        Split and index the documents.
+
+        Args:
+            documents: The documents to index
+            chunk_words: Number of words per chunk
+            chunk_overlap: Number of words shared by consecutive chunks
+        """
+        self.documents = documents
+        self.document_store = InMemoryDocumentStore(index=_acquire_index())
+        splitter = DocumentSplitter(split_by="word", split_length=chunk_words, split_overlap=chunk_overlap)
+        chunks = splitter.run(documents=[document for document in documents if document.content])["documents"]
+        self.document_store.write_documents(chunks, policy=DuplicatePolicy.SKIP)
+        self.retriever = InMemoryBM25Retriever(document_store=self.document_store)
+        self._lock = threading.Lock()
+        self._running = 0
+        self._closed = False
+
+    def retrieve(self, requirement: str, top_k: int, token_budget: int) -> List[Document]:
+        """
+        Get the chunks most relevant to a requirement, within a token budget.
+
+        The full documents are returned instead when they already fit in the budget, when
+        no chunk matches the requirement, or once the retriever is closed.
+
+        Args:
+            requirement: The job requirement used as the query
+            top_k: Maximum number of chunks to return
+            token_budget: Maximum estimated number of tokens of the returned chunks
+
+        Returns:
+            List[Document]: The selected chunks in document order, or the full documents
+        """
+        if sum(estimate_tokens(document.content) for document in self.documents) <= token_budget:
+            return self.documents
+
+        with self._lock:
+            if self._closed:
+                return self.documents
+            self._running += 1
+        try:
+            return self._retrieve(requirement, top_k, token_budget)
+        finally:
+            with self._lock:
+                self._running -= 1
+                release = self._closed and self._running == 0
+            if release:
+                self._release()
+
+    def _retrieve(self, requirement: str, top_k: int, token_budget: int) -> List[Document]:
+        selected = []
+        used_tokens = 0
+        for chunk in self.retriever.run(query=requirement, top_k=top_k)["documents"]:
+            chunk_tokens = estimate_tokens(chunk.content)
+            # Always keep the best chunk, even if it alone exceeds the budget
+            if selected and used_tokens + chunk_tokens > token_budget:
+                break
+            selected.append(chunk)
+            used_tokens += chunk_tokens
+
+        if not selected:
+            return self.documents
+        return sorted(selected, key=lambda chunk: (chunk.meta.get("source_id", ""), chunk.meta.get("split_id", 0)))
+
+    def close(self) -> None:
+        """
+        Delete the chunks of this request and give its index back to the pool. Safe to call more than once.
+
+        An executor thread may still be retrieving for an assessment that was cancelled; the
+        index is then released by the last retrieval to finish, never while it is read.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            release = self._running == 0
+        if release:
+            self._release()
+
+    def _release(self) -> None:
+        store = self.document_store
+        store.delete_documents([chunk.id for chunk in store.filter_documents()])
+        with _indexes_lock:
+            _free_indexes.append(store.index)
@@ -4,18 +4,30 @@ Pipeline Utilities Module
 This module provides utility functions for working with Haystack pipelines,
 particularly focused on handling Pydantic models and formatting instructions
 for LLM interactions.
+
+The OpenAI generators are configured with the following environment variable:
+    - LLM_STREAMING: Whether to stream replies and stop reading them once their JSON object
+      is complete (true/false)
 """
 
 import json
-from typing import Type
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Type
+import httpx
 from pydantic import BaseModel
 
+if TYPE_CHECKING:
+    from .metered_generator_component import MeteredOpenAIChatGenerator
+
+@lru_cache(maxsize=None)
 def get_format_instructions(model_class: Type[BaseModel]) -> str:
     """
     Generate format instructions for LLM based on a Pydantic model.
 
     This function creates a structured format guide that helps the LLM understand
     how to format its response to match the expected Pydantic model structure.
+    The instructions only depend on the model class, so they are computed once per class.
 
     Args:
         model_class (Type[BaseModel]): The Pydantic model class to generate
@@ -57,4 +69,53 @@ def get_format_instructions(model_class: Type[BaseModel]) -> str:
     
     instructions.append("}")
     
-    return "\n".join(instructions)
\ No newline at end of file
+    return "\n".join(instructions)
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text without a tokenizer.
+
+    Uses the common approximation of four characters per token for English text,
+    which is good enough for prompt budgeting decisions.
+
+    Args:
+        text (str): The text to estimate
+
+    Returns:
+        int: The estimated number of tokens
+    """
+    return (len(text or "") + 3) // 4
+
+def create_openai_generator(model: str, http_client: Optional[httpx.Client] = None) -> "MeteredOpenAIChatGenerator":
+    """
+    Create an OpenAI chat generator, optionally sending its requests through a shared HTTP client.
+
+    Sharing one pooled HTTP client between generators keeps connections to OpenAI alive
+    across calls, instead of each generator opening (and TLS-handshaking) its own.
+
+    Args:
+        model (str): The OpenAI model of the generator
+        http_client (Optional[httpx.Client]): The HTTP client to send requests through. When
+            None, the generator uses its own client.
+
+    Returns:
+        MeteredOpenAIChatGenerator: The generator, recording the latency and token usage of its calls
+    """
+    # The OpenAI client is imported when the first generator is built, not with the service
+    from openai import OpenAI
+    from .metered_generator_component import MeteredOpenAIChatGenerator
+
+    # Failed calls are retried by the scheduler, which needs to see the 429s to adapt
+    generator = MeteredOpenAIChatGenerator(model=model, max_retries=0)
+    generator.stream_json = os.getenv("LLM_STREAMING", "false").lower() == "true"
+    if http_client is not None:
+        # Keep the timeout and retries the generator resolved
+        generator.client = OpenAI(
+            api_key=generator.api_key.resolve_value(),
+            organization=generator.organization,
+            base_url=generator.api_base_url,
+            timeout=generator.client.timeout,
+            max_retries=generator.client.max_retries,
+            http_client=http_client
+        )
+    return generator
@@ -0,0 +1,114 @@
+"""
+Admission Route Helpers Module
+
+This module puts the processing endpoints behind admission control, and sheds requests with
+a 429 or 503 carrying a Retry-After header.
+
+The endpoints with uploads are admitted by AdmissionMiddleware before their body is read, so
+a request that is queued or shed has not been uploaded, parsed or spooled yet. Their number
+of requirements is only known once the body is parsed: they are costed from Content-Length
+and a default requirement count, and the handler corrects the cost of the admission with the
+actual requirements and file sizes. The admission is held until the response (and any
+stream) is done. /candidates/{candidate_id}/process, whose body is a small JSON document, is
+admitted by its handler.
+
+Admission of the uploads is configured with the following environment variables:
+    - ADMISSION_DEFAULT_REQUIREMENTS: Requirement count assumed for a request before its
+      body is read
+"""
+
+import os
+from typing import Any, Callable, Dict, List
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, UploadFile
+from starlette.responses import JSONResponse
+from exec import AdmissionRejected, AdmissionTicket, estimate_cost, get_admission_controller
+
+# Load environment variables at module initialization
+load_dotenv()
+
+# Endpoints with uploads, admitted before their body is read
+ADMITTED_PATHS = {"/process", "/process/stream", "/process/batch", "/candidates"}
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware admitting the requests of the upload endpoints before their body is read.
+
+    Attributes:
+        app: The wrapped ASGI application
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"].rstrip("/") not in ADMITTED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        try:
+            content_length = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            content_length = 0
+        requirements = int(os.getenv("ADMISSION_DEFAULT_REQUIREMENTS", "5"))
+
+        try:
+            ticket = await get_admission_controller().acquire(estimate_cost(requirements, content_length))
+        except AdmissionRejected as e:
+            await JSONResponse(
+                {"detail": str(e)},
+                status_code=e.status_code,
+                headers={"Retry-After": str(e.retry_after)}
+            )(scope, receive, send)
+            return
+
+        # The handler finds the admission in the request state; streams end before the app returns
+        scope.setdefault("state", {})["admission"] = ticket
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ticket.release()
+
+def admission_ticket(request: Request) -> AdmissionTicket:
+    """
+    Get the admission of a request admitted by AdmissionMiddleware.
+
+    Args:
+        request (Request): The request of an upload endpoint
+
+    Returns:
+        AdmissionTicket: Its admission, released by the middleware once the response is done
+    """
+    return request.state.admission
+
+def upload_bytes(files: List[UploadFile]) -> int:
+    """
+    Get the total size of uploaded files without reading them.
+
+    Args:
+        files (List[UploadFile]): The files of the request
+
+    Returns:
+        int: Their total size in bytes, as parsed from the request
+    """
+    return sum(file.size or 0 for file in files)
+
+async def admit(cost: int) -> AdmissionTicket:
+    """
+    Wait for the admission of a processing request.
+
+    Args:
+        cost (int): The estimated cost of the request, from estimate_cost
+
+    Returns:
+        AdmissionTicket: The admission, to release once the request is done
+
+    Raises:
+        HTTPException: 429 if the admission queue is full, 503 if the request waited too
+            long in it, both with a Retry-After header
+    """
+    try:
+        return await get_admission_controller().acquire(cost)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
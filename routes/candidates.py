@@ -0,0 +1,113 @@
+"""
+Candidates Route Module
+
+This module provides the candidate session endpoints. A client uploads a candidate's
+documents once, gets a candidate id back, and assesses the candidate again whenever the job
+requirements change by sending only the new requirements. The stored documents and
+candidate data are reused, and only the added or changed requirements are assessed.
+"""
+
+import json
+from typing import List, Optional
+from fastapi import APIRouter, File, Form, HTTPException, Request, Response, UploadFile
+from cache import CandidateSession, delete_session, get_session, session_cache
+from exec import estimate_cost, exec_create_session, exec_session_assessment, run_in_executor
+from models import CandidateData, CandidateSessionOutput, RequirementAssessment
+from models.process_input import ProcessInput
+from .uploads import load_uploaded_documents
+from .admission import admission_ticket, admit, upload_bytes
+
+router = APIRouter()
+
+def _session_output(session: CandidateSession, assessments: List[RequirementAssessment], reused: int) -> CandidateSessionOutput:
+    return CandidateSessionOutput(
+        candidate_id=session.id,
+        candidate_data=CandidateData(**session.candidate_data),
+        requirements_assessment=assessments,
+        reused_assessments=reused,
+        expires_in=session_cache.ttl
+    )
+
+@router.post("/candidates", response_model=CandidateSessionOutput, status_code=201)
+async def create_candidate(
+    request: Request,
+    response: Response,
+    files: List[UploadFile] = File(...),
+    process_input: Optional[str] = Form(default=None)
+) -> CandidateSessionOutput:
+    """
+    Create a candidate session from the candidate's documents, optionally assessing it.
+
+    Args:
+        request (Request): The request, holding its admission
+        response (Response): The response, to set the Location header
+        files (List[UploadFile]): List of document files (PDF/DOCX) of the candidate
+        process_input (Optional[str]): JSON string containing job requirements and processing
+            parameters; without it, the candidate is not assessed yet
+
+    Returns:
+        CandidateSessionOutput: The session, with the assessment of each job requirement
+
+    Raises:
+        HTTPException: 413 if an uploaded file exceeds the maximum upload size, 429 or 503
+            (with a Retry-After header) if the service is over capacity
+    """
+    process_input_data = ProcessInput(**json.loads(process_input)) if process_input else None
+    bypass_cache = process_input_data.bypass_cache if process_input_data else False
+    requirements = len(process_input_data.job_requirements) if process_input_data else 0
+
+    # The request was admitted before its body was read; correct its cost now it is parsed
+    admission_ticket(request).resize(estimate_cost(requirements, upload_bytes(files)))
+
+    documents = await load_uploaded_documents(files)
+    session = await exec_create_session(documents, bypass_cache=bypass_cache)
+
+    assessments: List[RequirementAssessment] = []
+    if process_input_data is not None:
+        assessments, _ = await exec_session_assessment(session, process_input_data.job_requirements, bypass_cache=bypass_cache)
+
+    response.headers["Location"] = f"/candidates/{session.id}"
+    return _session_output(session, assessments, 0)
+
+@router.post("/candidates/{candidate_id}/process", response_model=CandidateSessionOutput)
+async def process_candidate(candidate_id: str, process_input: ProcessInput) -> CandidateSessionOutput:
+    """
+    Assess a candidate session against new job requirements.
+
+    Requirements already assessed in the previous call (compared with their whitespace
+    normalized) reuse their assessment; only added or changed requirements are assessed.
+
+    Args:
+        candidate_id (str): The identifier returned when the session was created
+        process_input (ProcessInput): The job requirements and processing parameters
+
+    Returns:
+        CandidateSessionOutput: The session, with the assessment of each job requirement in
+            the order of the requirements
+
+    Raises:
+        HTTPException: 404 if the session doesn't exist or has expired, 429 or 503 (with a
+            Retry-After header) if the service is over capacity
+    """
+    session = await run_in_executor(get_session, candidate_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f'Candidate "{candidate_id}" not found')
+
+    document_bytes = sum(len(document.content or "") for document in session.documents)
+    async with await admit(estimate_cost(len(process_input.job_requirements), document_bytes)):
+        assessments, reused = await exec_session_assessment(session, process_input.job_requirements, bypass_cache=process_input.bypass_cache)
+    return _session_output(session, assessments, reused)
+
+@router.delete("/candidates/{candidate_id}", status_code=204)
+async def delete_candidate(candidate_id: str) -> Response:
+    """
+    Delete a candidate session and its documents.
+
+    Args:
+        candidate_id (str): The identifier returned when the session was created
+
+    Returns:
+        Response: An empty 204 response, whether or not the session existed
+    """
+    await run_in_executor(delete_session, candidate_id)
+    return Response(status_code=204)
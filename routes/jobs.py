@@ -0,0 +1,113 @@
+"""
+Jobs Route Module
+
+This module provides the asynchronous processing endpoints. Instead of holding the
+connection until every requirement is assessed, a client submits its documents and job
+requirements as a job, gets a job id back right away, and polls the job for its progress
+and partial results. Jobs are stored in a durable queue and run by the worker processes,
+so they survive client timeouts, crashes and restarts.
+"""
+
+import json
+from typing import List, Optional
+from fastapi import APIRouter, File, Form, Header, HTTPException, Response, UploadFile
+from exec import run_in_executor
+from jobs import IdempotencyConflict, Job, JobFile, get_job_store
+from models import CandidateData, RequirementAssessment
+from models.job import JobOutput, JobProgress
+from models.process_input import ProcessInput
+from .uploads import read_uploads
+
+router = APIRouter()
+
+def _job_output(job: Job) -> JobOutput:
+    requirements = job.process_input["job_requirements"]
+    return JobOutput(
+        job_id=job.id,
+        status=job.status,
+        progress=JobProgress(
+            completed_requirements=len(job.assessments),
+            total_requirements=len(requirements),
+            candidate_data_done=job.candidate_data is not None
+        ),
+        candidate_data=CandidateData(**job.candidate_data) if job.candidate_data is not None else None,
+        requirements_assessment=[
+            RequirementAssessment(**job.assessments[index]) if index in job.assessments else None
+            for index in range(len(requirements))
+        ],
+        error=job.error,
+        attempts=job.attempts,
+        created_at=job.created_at,
+        updated_at=job.updated_at
+    )
+
+@router.post("/jobs", response_model=JobOutput, status_code=202)
+async def submit_job(
+    response: Response,
+    process_input: str = Form(...),
+    files: List[UploadFile] = File(...),
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")
+) -> JobOutput:
+    """
+    Submit documents and job requirements for asynchronous processing.
+
+    The files and the input are stored in the job queue before the response is sent, so
+    the job runs even if the client goes away. Submitting again with the same
+    Idempotency-Key header returns the existing job instead of creating another one.
+
+    Args:
+        response (Response): The response, to set the status and Location header
+        process_input (str): JSON string containing job requirements and processing parameters
+        files (List[UploadFile]): List of document files (PDF/DOCX) to process
+        idempotency_key (Optional[str]): Client-chosen key identifying the submission
+
+    Returns:
+        JobOutput: The queued job (202), or the job already created with the same key (200)
+
+    Raises:
+        HTTPException: 409 if the idempotency key was used for a different submission,
+            413 if an uploaded file exceeds the maximum upload size
+    """
+    # Parse the process_input JSON string into our Pydantic model
+    process_input_data = ProcessInput(**json.loads(process_input))
+
+    uploads = await read_uploads(files)
+    job_files = [
+        JobFile(filename=upload.filename, sha256=upload.sha256, content_type=upload.content_type, data=upload.data)
+        for upload in uploads
+    ]
+
+    try:
+        job, created = await run_in_executor(
+            get_job_store().submit,
+            process_input_data.model_dump(),
+            job_files,
+            idempotency_key
+        )
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if not created:
+        response.status_code = 200
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return _job_output(job)
+
+@router.get("/jobs/{job_id}", response_model=JobOutput)
+async def get_job(job_id: str) -> JobOutput:
+    """
+    Get the status, progress and partial results of a job.
+
+    Args:
+        job_id (str): The identifier returned when the job was submitted
+
+    Returns:
+        JobOutput: The job, with the candidate data and each requirement assessment
+            available so far
+
+    Raises:
+        HTTPException: 404 if the job doesn't exist
+    """
+    job = await run_in_executor(get_job_store().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f'Job "{job_id}" not found')
+    return _job_output(job)
@@ -0,0 +1,92 @@
+"""
+Metrics Route Module
+
+This module provides the Prometheus /metrics endpoint. Besides the metrics recorded on the
+hot path (stage histograms, token and call counters, requests in flight), it exports the
+counters of the caches, the state of the OpenAI scheduler and of admission control, and the
+startup times of the process, read when Prometheus scrapes.
+
+Under Gunicorn, each worker process has its own metrics. With PROMETHEUS_MULTIPROC_DIR set
+(see gunicorn.conf.py), the metrics recorded on the hot path are written to that directory
+by every web and job worker and /metrics aggregates them, whichever worker answers the
+scrape. The statistics read at scrape time only exist in the memory of the worker that
+answers, so they are labelled with its pid.
+"""
+
+import os
+from typing import Iterator
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from cache import document_cache, llm_cache
+from exec import get_admission_controller, get_scheduler
+from observability import startup_report
+
+router = APIRouter()
+
+class ServiceStatsCollector(Collector):
+    """Exports the cache, scheduler, admission and startup statistics of the service at scrape time."""
+
+    def collect(self) -> Iterator[Metric]:
+        hits = CounterMetricFamily("ats_cache_hits", "Cache hits, by cache and tier", labels=["cache", "tier"])
+        misses = CounterMetricFamily("ats_cache_misses", "Cache misses, by cache", labels=["cache"])
+        entries = GaugeMetricFamily("ats_cache_entries", "Entries in the memory tier, by cache", labels=["cache"])
+        for cache in (document_cache, llm_cache):
+            stats = cache.stats()
+            hits.add_metric([cache.name, "memory"], stats["memory_hits"])
+            hits.add_metric([cache.name, "disk"], stats["disk_hits"])
+            misses.add_metric([cache.name], stats["misses"])
+            entries.add_metric([cache.name], stats["entries"])
+        yield from (hits, misses, entries)
+
+        queue_depth = GaugeMetricFamily("ats_llm_queue_depth", "OpenAI calls waiting in the scheduler", labels=["model", "priority"])
+        in_flight = GaugeMetricFamily("ats_llm_in_flight", "OpenAI calls in flight", labels=["model"])
+        limit = GaugeMetricFamily("ats_llm_concurrency_limit", "Adaptive concurrency limit of the scheduler", labels=["model"])
+        for model, stats in get_scheduler().stats().items():
+            for priority, depth in stats["queue_depth_by_priority"].items():
+                queue_depth.add_metric([model, priority], depth)
+            in_flight.add_metric([model], stats["in_flight"])
+            limit.add_metric([model], stats["concurrency_limit"])
+        yield from (queue_depth, in_flight, limit)
+
+        admission = get_admission_controller().stats()
+        yield GaugeMetricFamily("ats_admission_in_flight", "Processing requests admitted and in flight", value=admission["in_flight"])
+        yield GaugeMetricFamily("ats_admission_cost_in_flight", "Estimated cost of the processing requests in flight", value=admission["cost_in_flight"])
+        yield GaugeMetricFamily("ats_admission_queue_depth", "Processing requests waiting for admission", value=admission["queue_depth"])
+
+        startup = GaugeMetricFamily("ats_startup_seconds", "Seconds from the start of the process to each startup milestone", labels=["milestone"])
+        for milestone, seconds in startup_report.milestones().items():
+            startup.add_metric([milestone], seconds)
+        yield startup
+
+class ProcessStatsCollector(Collector):
+    """Exports the statistics of ServiceStatsCollector labelled with the pid of the worker answering the scrape."""
+
+    def collect(self) -> Iterator[Metric]:
+        pid = str(os.getpid())
+        for metric in ServiceStatsCollector().collect():
+            metric.samples = [sample._replace(labels={**sample.labels, "pid": pid}) for sample in metric.samples]
+            yield metric
+
+REGISTRY.register(ServiceStatsCollector())
+
+def _registry() -> CollectorRegistry:
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    # A registry per scrape, as the files of the worker processes come and go
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(ProcessStatsCollector())
+    return registry
+
+@router.get("/metrics")
+async def get_metrics() -> Response:
+    """
+    Get the metrics of the service in the Prometheus text format.
+
+    Returns:
+        Response: The metrics of the default Prometheus registry, or of every worker process
+            in Prometheus multiprocess mode
+    """
+    return Response(content=generate_latest(_registry()), media_type=CONTENT_TYPE_LATEST)
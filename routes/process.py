@@ -5,91 +5,265 @@ This module provides the main processing endpoint for the ATS service. It handle
 candidate data extraction, and job requirement assessments using Haystack pipelines.
 
 The module processes multiple document formats (PDF, DOCX) and returns structured data about
-the candidate and assessment of their qualifications against job requirements.
+the candidate and assessment of their qualifications against job requirements. A batch endpoint
+screens many candidates against one job posting and streams each result as NDJSON, and a
+streaming endpoint emits each result of a single candidate as a Server-Sent Event.
+
+Identical /process requests in flight at the same time (same file bytes, requirements and
+model configuration) are coalesced: the duplicates wait for the first one and receive the
+same ProcessOutput.
+
+A /process request may set a deadline, with the X-Request-Timeout header or the
+deadline_seconds field of its input. Shortly before the deadline, the request returns the
+results ready so far as a partial ProcessOutput, listing the unfinished requirements as
+pending, instead of timing out.
 """
 
-import os
-import uuid
+import hashlib
 import json
 import asyncio
-from fastapi import APIRouter, UploadFile, File, Form
+import os
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from models.process_input import ProcessInput
-from pathlib import Path
-from typing import List
-from exec import exec_load_documents, exec_candidate_data, exec_assessment
+from typing import Dict, List, Optional
+from haystack import Document
+from exec import UploadedFile, exec_candidate_data, exec_assessment, iter_assessments, exec_batch, exec_stream, exec_load_uploaded_documents, request_flight, run_in_executor, assessment_config, estimate_cost
+from exec import DEADLINE_HEADER, deadline_scope, deadline_margin, request_deadline, record_deadline_outcome, time_remaining
+from cache import normalize_requirement
+from models.assessment import RequirementAssessment
 from models.process_output import ProcessOutput
+from .uploads import read_uploads, load_uploaded_documents
+from observability import startup_report
+from .admission import admission_ticket, upload_bytes
 
 router = APIRouter()
 
+def _request_key(uploads: List[UploadedFile], process_input: ProcessInput, deadline: Optional[float]) -> str:
+    """Key of a /process request: its file hashes, normalized requirements, deadline and model configuration."""
+    return hashlib.sha256(json.dumps([
+        [upload.sha256 for upload in uploads],
+        [normalize_requirement(requirement) for requirement in process_input.job_requirements],
+        process_input.bypass_cache,
+        # A request with a deadline may return a partial output, which only requests with the same deadline share
+        deadline,
+        [os.getenv("CANDIDATE_DATA_MODEL"), os.getenv("CANDIDATE_EXTRACTION_MODE"), *assessment_config()]
+    ]).encode()).hexdigest()
+
+async def _process(uploads: List[UploadedFile], process_input: ProcessInput) -> ProcessOutput:
+    # Convert uploaded files to Haystack documents off the event loop
+    documents = await run_in_executor(exec_load_uploaded_documents, uploads)
+
+    if time_remaining() is not None:
+        return await _process_until_deadline(documents, process_input)
+
+    # Execute candidate data extraction and requirements assessment in parallel
+    # Both run their pipelines on the shared executor, so they truly overlap
+    candidate_data, assessments = await asyncio.gather(
+        exec_candidate_data(documents, bypass_cache=process_input.bypass_cache),
+        exec_assessment(documents, process_input.job_requirements, bypass_cache=process_input.bypass_cache)
+    )
+
+    # Combine results into final output structure
+    return ProcessOutput(
+        candidate_data=candidate_data,
+        requirements_assessment=assessments
+    )
+
+async def _process_until_deadline(documents: List[Document], process_input: ProcessInput) -> ProcessOutput:
+    """Run candidate data extraction and the assessments until the deadline, returning what is ready by then."""
+    requirements = process_input.job_requirements
+    assessments: Dict[int, RequirementAssessment] = {}
+
+    async def assess() -> None:
+        async for index, assessment in iter_assessments(documents, requirements, bypass_cache=process_input.bypass_cache):
+            assessments[index] = assessment
+
+    candidate_task = asyncio.ensure_future(exec_candidate_data(documents, bypass_cache=process_input.bypass_cache))
+    assessment_task = asyncio.ensure_future(assess())
+    tasks = {candidate_task, assessment_task}
+    try:
+        # Stop waiting early enough to send the response before the deadline
+        done, pending = await asyncio.wait(
+            tasks,
+            timeout=max(0.0, time_remaining() - deadline_margin()),
+            return_when=asyncio.FIRST_EXCEPTION
+        )
+        for task in done:
+            # An error (not the deadline) fails the request as it would without a deadline
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    pending_requirements = [requirement for index, requirement in enumerate(requirements) if index not in assessments]
+    record_deadline_outcome(len(pending_requirements), candidate_task in pending)
+    return ProcessOutput(
+        candidate_data=None if candidate_task in pending else candidate_task.result(),
+        requirements_assessment=[assessments[index] for index in sorted(assessments)],
+        pending_requirements=pending_requirements,
+        partial=bool(pending)
+    )
+
 @router.post("/process", response_model=ProcessOutput)
 async def process_documents(
+    request: Request,
     process_input: str = Form(...),
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    request_timeout: Optional[float] = Header(default=None, alias=DEADLINE_HEADER)
 ) -> ProcessOutput:
     """
     Process uploaded documents to extract candidate data and assess job requirements.
 
     This endpoint handles the complete processing pipeline:
-    1. Receives and stores uploaded documents
+    1. Reads uploaded documents in memory and converts the ones not already cached
     2. Extracts structured candidate information
     3. Assesses candidate qualifications against job requirements
 
+    A request identical to one already in flight waits for it and returns the same output.
+    Requests go through admission control before their body is read, and are shed when the
+    service is over capacity.
+    A request with a deadline gets the results ready shortly before it, with the unfinished
+    requirements listed as pending.
+
     Args:
+        request (Request): The request, holding its admission
         process_input (str): JSON string containing job requirements and processing parameters
         files (List[UploadFile]): List of document files (PDF/DOCX) to process
+        request_timeout (Optional[float]): Seconds until the response is due, from the
+            X-Request-Timeout header
 
     Returns:
         ProcessOutput: Structured output containing candidate data and requirement assessments
 
     Raises:
-        HTTPException: If file processing fails or temporary directory is not accessible
+        HTTPException: 413 if an uploaded file exceeds the maximum upload size, 429 or 503
+            (with a Retry-After header) if the service is over capacity
     """
     # Parse the process_input JSON string into our Pydantic model
     process_input_data = ProcessInput(**json.loads(process_input))
+    deadline = request_deadline(request_timeout, process_input_data.deadline_seconds)
+    
+    # The request was admitted before its body was read; correct its cost now it is parsed
+    ticket = admission_ticket(request)
+    ticket.resize(estimate_cost(len(process_input_data.job_requirements), upload_bytes(files)))
     
-    # Get temporary directory from environment variable with fallback to /tmp
-    tmp_dir = Path(os.getenv("UPLOAD_TMP_DIR", "/tmp"))
-    tmp_dir.mkdir(exist_ok=True)
+    # The deadline covers the whole request, the wait for admission included, and every call it makes
+    with deadline_scope(None if deadline is None else max(0.0, deadline - ticket.waited)):
+        # Read the uploaded files in memory, hashing them for the coalescing key
+        uploads = await read_uploads(files)
+        output = await request_flight.run(
+            _request_key(uploads, process_input_data, deadline),
+            lambda: _process(uploads, process_input_data)
+        )
+        startup_report.mark_first_process()
+        return output
+
+@router.post("/process/stream")
+async def process_documents_stream(
+    request: Request,
+    process_input: str = Form(...),
+    files: List[UploadFile] = File(...)
+) -> StreamingResponse:
+    """
+    Process uploaded documents, streaming each result as a Server-Sent Event as soon as it completes.
+
+    The stream emits the following events:
+    - `candidate_data`: The extracted CandidateData
+    - `assessment`: An AssessmentEvent with the requirement index and its RequirementAssessment,
+      once per requirement, in completion order
+    - `error`: The reason processing failed; no more events follow
+    - `done`: Every result has been sent
+
+    Args:
+        request (Request): The request, holding its admission
+        process_input (str): JSON string containing job requirements and processing parameters
+        files (List[UploadFile]): List of document files (PDF/DOCX) to process
+
+    Returns:
+        StreamingResponse: A text/event-stream response
+
+    Raises:
+        HTTPException: 413 if an uploaded file exceeds the maximum upload size, 429 or 503
+            (with a Retry-After header) if the service is over capacity
+    """
+    # Parse the process_input JSON string into our Pydantic model
+    process_input_data = ProcessInput(**json.loads(process_input))
     
-    # Process and store the uploaded files
-    file_contents = []  # Store metadata about processed files
-    uploaded_files = []  # Store paths to uploaded files for pipeline processing
+    # The admission is held by the middleware until the stream ends
+    admission_ticket(request).resize(estimate_cost(len(process_input_data.job_requirements), upload_bytes(files)))
     
-    for file in files:
-        # Get original file extension
-        original_extension = Path(file.filename).suffix
-        # Generate unique filename with original extension to prevent collisions
-        unique_filename = f"{uuid.uuid4()}{original_extension}"
-        file_path = tmp_dir / unique_filename
-        absolute_path = file_path.absolute()
-        
-        # Read and save the file to temporary storage
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-            
-        # Track file metadata and path for processing
-        file_contents.append({
-            "original_filename": file.filename,
-            "saved_filename": unique_filename,
-            "path": str(absolute_path)
-        })
-        uploaded_files.append(str(absolute_path))
+    # Read the uploaded files in memory and convert the ones not already cached
+    documents = await load_uploaded_documents(files)
     
-    # Convert uploaded files to Haystack documents
-    documents = exec_load_documents(uploaded_files)
+    async def stream_events():
+        try:
+            async for event, payload in exec_stream(documents, process_input_data.job_requirements, bypass_cache=process_input_data.bypass_cache):
+                yield f"event: {event}\ndata: {payload.model_dump_json()}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
     
-    # Execute candidate data extraction and requirements assessment in parallel
-    # This improves performance by running independent tasks concurrently
-    candidate_data, assessments = await asyncio.gather(
-        exec_candidate_data(documents),
-        exec_assessment(documents, process_input_data.job_requirements)
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
-    # Combine results into final output structure
-    results = ProcessOutput(
-        candidate_data=candidate_data,
-        requirements_assessment=assessments
-    )
+@router.post("/process/batch")
+async def process_batch(
+    request: Request,
+    process_input: str = Form(...),
+    candidate_ids: List[str] = Form(...),
+    files: List[UploadFile] = File(...)
+) -> StreamingResponse:
+    """
+    Process the documents of many candidates against the same job requirements.
+
+    Each uploaded file belongs to the candidate id at the same position in `candidate_ids`,
+    so a candidate with several documents repeats its id once per file. Results are streamed
+    back as newline-delimited JSON, one CandidateProcessOutput per candidate, as soon as
+    each candidate finishes.
+
+    Args:
+        request (Request): The request, holding its admission
+        process_input (str): JSON string containing job requirements and processing parameters
+        candidate_ids (List[str]): The candidate id of each uploaded file
+        files (List[UploadFile]): List of document files (PDF/DOCX) of all candidates
+
+    Returns:
+        StreamingResponse: An application/x-ndjson stream of CandidateProcessOutput objects
+
+    Raises:
+        HTTPException: 400 if the number of candidate ids doesn't match the number of files,
+            429 or 503 (with a Retry-After header) if the service is over capacity
+    """
+    if len(candidate_ids) != len(files):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected one candidate id per file, got {len(candidate_ids)} ids for {len(files)} files"
+        )
+    
+    # Parse the process_input JSON string into our Pydantic model
+    process_input_data = ProcessInput(**json.loads(process_input))
+    
+    # Every candidate counts as a request of its own; the admission is held by the middleware until the stream ends
+    candidate_files: Dict[str, List[UploadFile]] = {}
+    for candidate_id, file in zip(candidate_ids, files):
+        candidate_files.setdefault(candidate_id, []).append(file)
+    requirements = len(process_input_data.job_requirements)
+    admission_ticket(request).resize(sum(estimate_cost(requirements, upload_bytes(group)) for group in candidate_files.values()))
+    
+    # Read every file before streaming, grouped by candidate in upload order
+    uploads = await read_uploads(files)
+    candidates: Dict[str, List[UploadedFile]] = {}
+    for candidate_id, upload in zip(candidate_ids, uploads):
+        candidates.setdefault(candidate_id, []).append(upload)
+    
+    async def stream_results():
+        async for output in exec_batch(candidates, process_input_data):
+            yield output.model_dump_json() + "\n"
     
-    return results 
\ No newline at end of file
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
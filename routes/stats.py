@@ -0,0 +1,52 @@
+"""
+Stats Route Module
+
+This module provides an endpoint exposing the runtime statistics of the service, such as
+the hit and miss counters of its caches, the size of its pipeline pools and the state
+of its OpenAI call scheduler, its request coalescing and its job queue, and the startup
+times of the process.
+"""
+
+from fastapi import APIRouter
+from typing import Any, Dict
+from cache import document_cache, llm_cache, session_cache
+from exec import cascade_stats, coalescing_stats, deadline_stats, get_admission_controller, get_runtime, get_scheduler, run_in_executor
+from jobs import get_job_store
+from observability import llm_usage_stats, llm_parse_stats, normalization_stats, startup_report
+
+router = APIRouter()
+
+@router.get("/stats")
+async def get_stats() -> Dict[str, Any]:
+    """
+    Get the runtime statistics of the service.
+
+    Returns:
+        Dict[str, Any]: Statistics of each cache (including the candidate sessions), with
+            hits, misses, evictions and size, the size of each pipeline pool, and the queue depth, wait times and
+            concurrency limit, latency percentiles and hedged calls of the OpenAI scheduler
+            of each model, the tokens reported
+            by OpenAI for each model (including prompt tokens served from its prompt cache),
+            the outcomes of parsing the replies into each model class,
+            the text removed by document normalization and the prompt tokens it saved,
+            the hit rate of each tier of the assessment cascade, the requests and LLM calls
+            coalesced into identical ones in flight, the state and decisions of admission
+            control, the requests returned complete or partial at their deadline, the number
+            of jobs in each status, and the startup times of the process
+    """
+    return {
+        "document_cache": document_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "candidate_sessions": session_cache.stats(),
+        **get_runtime().stats(),
+        "scheduler": get_scheduler().stats(),
+        "llm_usage": llm_usage_stats(),
+        "llm_parse": llm_parse_stats(),
+        "normalization": normalization_stats(),
+        "assessment_cascade": cascade_stats(),
+        "coalescing": coalescing_stats(),
+        "admission": get_admission_controller().stats(),
+        "deadlines": deadline_stats(),
+        "jobs": await run_in_executor(get_job_store().stats),
+        "startup": startup_report.stats()
+    }
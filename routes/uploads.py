@@ -0,0 +1,137 @@
+"""
+Uploads Module
+
+This module bounds the size of the uploads of the processing routes and reads them into
+memory for the converters.
+
+The body of a request is limited as it streams in: UploadLimitMiddleware rejects a request
+whose Content-Length exceeds the limit before reading any of it, and stops reading (with a
+413) as soon as the bytes received cross it, before the multipart parser buffers or spools
+any more of the body. The files of a parsed form stay in memory up to UPLOAD_SPILL_BYTES
+(Starlette's own threshold is 1 MiB), so a typical resume is never written to disk; larger
+files are spooled to temporary files. Each file is then checked against the per-file limit,
+hashed and read into memory once, with no second copy on disk.
+
+The upload path is configured with the following environment variables:
+    - MAX_REQUEST_BYTES: Maximum size of the body of a request (0 for no limit)
+    - MAX_UPLOAD_BYTES: Maximum size of a single uploaded file
+    - UPLOAD_SPILL_BYTES: Size from which a file of a parsed form is spooled to disk
+      instead of kept in memory
+"""
+
+import hashlib
+import os
+from typing import Any, Callable, Dict, List
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile
+from haystack import Document
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.formparsers import MultiPartParser
+from starlette.responses import JSONResponse
+from exec import UploadedFile, exec_load_uploaded_documents, run_in_executor
+from observability import stage
+
+# Load environment variables at module initialization
+load_dotenv()
+
+# The multipart parser of every form (FastAPI parses them with Starlette's) keeps the files
+# up to this size in memory
+MultiPartParser.max_file_size = int(os.getenv("UPLOAD_SPILL_BYTES", str(8 * 1024 * 1024)))
+
+# Size of the chunks read from each upload
+CHUNK_SIZE = 1024 * 1024
+
+# Methods whose body is limited
+LIMITED_METHODS = {"POST", "PUT", "PATCH"}
+
+def _too_large(max_bytes: int) -> str:
+    return f"Request body exceeds the maximum size of {max_bytes} bytes"
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware limiting the size of request bodies as they stream in.
+
+    Attributes:
+        app: The wrapped ASGI application
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        max_bytes = int(os.getenv("MAX_REQUEST_BYTES", str(100 * 1024 * 1024)))
+        if scope["type"] != "http" or scope["method"] not in LIMITED_METHODS or max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        try:
+            content_length = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            content_length = 0
+        if content_length > max_bytes:
+            # Rejected before any of the body is read
+            await JSONResponse({"detail": _too_large(max_bytes)}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Dict[str, Any]:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Raised inside the form parsing, so the route answers it with a 413
+                    raise StarletteHTTPException(status_code=413, detail=_too_large(max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+async def read_uploads(files: List[UploadFile]) -> List[UploadedFile]:
+    """
+    Read uploaded files into memory.
+
+    Args:
+        files (List[UploadFile]): The files of the request
+
+    Returns:
+        List[UploadedFile]: The uploaded files, with their SHA-256 computed
+
+    Raises:
+        HTTPException: 413 if a file exceeds MAX_UPLOAD_BYTES
+    """
+    max_bytes = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+    with stage("upload_read", files=len(files)):
+        return [await _read_upload(file, max_bytes) for file in files]
+
+async def _read_upload(file: UploadFile, max_bytes: int) -> UploadedFile:
+    # The size is known from the parsed form, so an oversized file is rejected without reading it
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f'File "{file.filename}" exceeds the maximum upload size of {max_bytes} bytes'
+        )
+    sha256 = hashlib.sha256()
+    buffer = bytearray()
+    while chunk := await file.read(CHUNK_SIZE):
+        sha256.update(chunk)
+        buffer.extend(chunk)
+    return UploadedFile(filename=file.filename, sha256=sha256.hexdigest(), size=len(buffer), data=bytes(buffer), content_type=file.content_type)
+
+async def load_uploaded_documents(files: List[UploadFile]) -> List[Document]:
+    """
+    Read uploaded files and convert them into documents.
+
+    Args:
+        files (List[UploadFile]): The files of the request
+
+    Returns:
+        List[Document]: The documents of all files, in upload order
+
+    Raises:
+        HTTPException: 413 if a file exceeds MAX_UPLOAD_BYTES
+    """
+    uploads = await read_uploads(files)
+    # Convert uploaded files to Haystack documents off the event loop
+    return await run_in_executor(exec_load_uploaded_documents, uploads)
@@ -0,0 +1,20 @@
+"""
+Test configuration
+
+The tests run offline: OpenAI calls are answered by the fakes of tests/fakes.py, and the
+environment below is set before the service modules are imported, so that load_dotenv,
+which never overrides the environment, can't point them at a real API key.
+"""
+
+import os
+
+os.environ.update({
+    "OPENAI_API_KEY": "test-key",
+    # Nothing listens there: a call that escapes the fakes fails instead of reaching OpenAI
+    "OPENAI_BASE_URL": "http://127.0.0.1:9/v1",
+    "HAYSTACK_TELEMETRY_ENABLED": "False",
+    "JOB_WORKERS": "0",
+    "OPENAI_BUDGET_PROCESSES": "1",
+})
+# Metrics stay in the registry of the test process
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
@@ -0,0 +1,59 @@
+"""
+Fakes of the OpenAI API for the tests.
+
+FakeOpenAICall stands in for the call a pipeline makes through the OpenAI client: it answers
+with a reply, after the 429s it was told to answer first, and counts how often it was called.
+"""
+
+import asyncio
+from typing import Any, Optional
+import httpx
+import openai
+
+def rate_limit_error(retry_after: Optional[float] = None) -> openai.RateLimitError:
+    """
+    Build the error the OpenAI client raises for a 429.
+
+    Args:
+        retry_after: Value of the Retry-After header, if any
+
+    Returns:
+        openai.RateLimitError: The error, with its response
+    """
+    headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+    request = httpx.Request("POST", "http://127.0.0.1:9/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+class FakeOpenAICall:
+    """
+    An OpenAI call answering with a reply, after some 429s.
+
+    Attributes:
+        reply: What the call returns once it succeeds
+        rate_limits (int): 429s left to answer before succeeding
+        retry_after (Optional[float]): Retry-After of the 429s
+        delay (float): Seconds each call takes
+        calls (int): Number of calls started
+        cancelled (int): Number of calls cancelled while running
+    """
+
+    def __init__(self, reply: Any = "ok", rate_limits: int = 0, retry_after: Optional[float] = None, delay: float = 0.0):
+        self.reply = reply
+        self.rate_limits = rate_limits
+        self.retry_after = retry_after
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self) -> Any:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.rate_limits > 0:
+            self.rate_limits -= 1
+            raise rate_limit_error(self.retry_after)
+        return self.reply
@@ -0,0 +1,202 @@
+import asyncio
+import pytest
+from exec import AdmissionController, AdmissionRejected
+from routes import admission as admission_routes
+from routes.admission import AdmissionMiddleware
+
+def controller(**overrides):
+    options = dict(max_in_flight=1, max_cost=100, max_queue=4, queue_timeout=5)
+    return AdmissionController(**{**options, **overrides})
+
+async def settle():
+    """Let the tasks started so far run until they block."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+def test_waiting_requests_are_admitted_first_in_first_out():
+    async def run():
+        admission = controller()
+        ticket = await admission.acquire(1)
+        waiters = [asyncio.ensure_future(admission.acquire(1)) for _ in range(3)]
+        await settle()
+        order = []
+        for _ in waiters:
+            ticket.release()
+            await settle()
+            order += [index for index, waiter in enumerate(waiters) if waiter.done() and index not in order]
+            ticket = waiters[order[-1]].result()
+        ticket.release()
+        return order
+
+    assert asyncio.run(run()) == [0, 1, 2]
+
+def test_large_request_at_the_head_is_not_overtaken():
+    async def run():
+        admission = controller(max_in_flight=10, max_cost=10)
+        held = await admission.acquire(6)
+        large = asyncio.ensure_future(admission.acquire(8))
+        await settle()
+        small = asyncio.ensure_future(admission.acquire(1))
+        await settle()
+        overtaken = small.done()
+        held.release()
+        await settle()
+        return overtaken, large.done(), small.done()
+
+    assert asyncio.run(run()) == (False, True, True)
+
+def test_request_waiting_too_long_is_shed_with_503():
+    async def run():
+        admission = controller(queue_timeout=0.05)
+        held = await admission.acquire(1)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire(1)
+        held.release()
+        return admission, rejected.value
+
+    admission, rejected = asyncio.run(run())
+
+    assert (rejected.status_code, rejected.reason) == (503, "queue_timeout")
+    assert rejected.retry_after >= 1
+    assert admission.stats()["queue_depth"] == 0
+    assert admission.stats()["queue_timeout"] == 1
+
+def test_request_is_shed_with_429_when_the_queue_is_full():
+    async def run():
+        admission = controller(max_queue=1)
+        held = await admission.acquire(1)
+        waiter = asyncio.ensure_future(admission.acquire(1))
+        await settle()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire(1)
+        held.release()
+        (await waiter).release()
+        return admission, rejected.value
+
+    admission, rejected = asyncio.run(run())
+
+    assert (rejected.status_code, rejected.reason) == (429, "queue_full")
+    assert admission.stats()["queue_full"] == 1
+
+def test_request_admitted_as_it_gives_up_leaks_no_capacity():
+    async def run():
+        admission = controller()
+        held = await admission.acquire(1)
+        waiter = asyncio.ensure_future(admission.acquire(1))
+        await settle()
+        # The release admits the waiter before it gets to run its cancellation
+        held.release()
+        waiter.cancel()
+        try:
+            (await waiter).release()
+        except asyncio.CancelledError:
+            pass
+        return admission.stats()
+
+    stats = asyncio.run(run())
+
+    assert (stats["in_flight"], stats["cost_in_flight"], stats["queue_depth"]) == (0, 0, 0)
+
+def test_lowered_cost_admits_waiting_requests():
+    async def run():
+        admission = controller(max_in_flight=10, max_cost=10)
+        ticket = await admission.acquire(10)
+        waiter = asyncio.ensure_future(admission.acquire(4))
+        await settle()
+        waiting = not waiter.done()
+        ticket.resize(5)
+        await settle()
+        return waiting, waiter.done(), admission.stats()["cost_in_flight"]
+
+    assert asyncio.run(run()) == (True, True, 9)
+
+def test_release_is_idempotent():
+    async def run():
+        admission = controller()
+        ticket = await admission.acquire(3)
+        ticket.release()
+        ticket.release()
+        ticket.resize(8)
+        return admission.stats()
+
+    stats = asyncio.run(run())
+
+    assert (stats["in_flight"], stats["cost_in_flight"]) == (0, 0)
+
+def asgi_request(path, body_size=1024):
+    """The scope and receive callable of an upload request, counting the body messages read."""
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": path,
+        "headers": [(b"content-length", str(body_size).encode())],
+    }
+    reads = []
+
+    async def receive():
+        reads.append(path)
+        return {"type": "http.request", "body": b"x" * body_size, "more_body": False}
+
+    return scope, receive, reads
+
+class Response:
+    """The send callable of a request, keeping the status and headers of its response."""
+
+    def __init__(self):
+        self.status = None
+        self.headers = {}
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = {name.decode(): value.decode() for name, value in message["headers"]}
+
+def test_middleware_sheds_uploads_before_reading_their_body(monkeypatch):
+    admission = controller(max_queue=0)
+    monkeypatch.setattr(admission_routes, "get_admission_controller", lambda: admission)
+    tickets = []
+
+    async def app(scope, receive, send):
+        tickets.append(scope["state"]["admission"])
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        # The admission is held until the response is done
+        assert admission.stats()["in_flight"] == 1
+
+    async def run():
+        held = await admission.acquire(1)
+        scope, receive, reads = asgi_request("/process")
+        response = Response()
+        await AdmissionMiddleware(app)(scope, receive, response)
+        held.release()
+        admitted_scope, admitted_receive, admitted_reads = asgi_request("/process/stream")
+        await AdmissionMiddleware(app)(admitted_scope, admitted_receive, Response())
+        return response, reads, admitted_reads
+
+    response, reads, admitted_reads = asyncio.run(run())
+
+    assert response.status == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert reads == []
+    assert admitted_reads == ["/process/stream"]
+    assert len(tickets) == 1
+    assert admission.stats()["in_flight"] == 0
+
+def test_middleware_leaves_other_requests_alone(monkeypatch):
+    admission = controller(max_in_flight=1, max_queue=0)
+    monkeypatch.setattr(admission_routes, "get_admission_controller", lambda: admission)
+    served = []
+
+    async def app(scope, receive, send):
+        served.append(scope["path"])
+
+    async def run():
+        held = await admission.acquire(1)
+        for path in ("/jobs", "/health"):
+            scope, receive, _ = asgi_request(path)
+            await AdmissionMiddleware(app)(scope, receive, Response())
+        held.release()
+
+    asyncio.run(run())
+
+    assert served == ["/jobs", "/health"]
@@ -0,0 +1,48 @@
+from exec import merge_candidate_data
+from models import CandidateData, Experience
+
+def experience(company, title, start_date="01/2020", end_date="12/2021", description=None):
+    return Experience(company=company, title=title, start_date=start_date, end_date=end_date, description=description)
+
+def candidate(experiences, **contact):
+    fields = {"first_name": None, "last_name": None, "email": None, "phone": None, "linkedin": None}
+    return CandidateData(**{**fields, **contact}, experiences=experiences)
+
+def test_contact_fields_come_from_the_first_chunk_that_has_them():
+    merged = merge_candidate_data([
+        candidate([], email="first@example.com"),
+        candidate([], first_name="Ana", email="second@example.com"),
+    ])
+
+    assert merged.first_name == "Ana"
+    assert merged.email == "first@example.com"
+    assert merged.phone is None
+
+def test_same_experience_is_merged_across_chunks():
+    merged = merge_candidate_data([
+        candidate([experience("Acme Inc.", "Engineer", end_date="Present")]),
+        candidate([experience("acme inc", "ENGINEER", end_date="current", description="Built the billing service")]),
+    ])
+
+    assert len(merged.experiences) == 1
+    assert merged.experiences[0].company == "Acme Inc."
+    assert merged.experiences[0].description == "Built the billing service"
+
+def test_experiences_keep_chunk_order_and_drop_fragments():
+    merged = merge_candidate_data([
+        candidate([experience("Acme", "Engineer"), experience(None, None, description="tail of a cut experience")]),
+        candidate([experience("Globex", "Lead", start_date="01/2022", end_date="Present")]),
+        candidate([experience("Acme", "Engineer", start_date="01/2018", end_date="12/2019")]),
+    ])
+
+    assert [(item.company, item.start_date) for item in merged.experiences] == [
+        ("Acme", "01/2020"), ("Globex", "01/2022"), ("Acme", "01/2018")
+    ]
+
+def test_merge_is_deterministic():
+    parts = [
+        candidate([experience("Acme", "Engineer"), experience("Globex", "Lead")], last_name="Lopez"),
+        candidate([experience("Globex", "Lead", description="Led a team of four")]),
+    ]
+
+    assert merge_candidate_data(parts) == merge_candidate_data(parts)
@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from haystack import Document
+from exec.cascade import AssessmentCascade, KeywordMatcher
+from pipelines import KEYWORD_TIER
+
+RESUME = """Ana Lopez
+Education
+B.S. in Computer Science, 2015
+M.Sc. in Physics, 2017
+Skills
+• Python, PostgreSQL and K8s
+• Built CI/CD pipelines for the payments team.
+Interests
+I am always willing to go the extra mile. Wrote a node in our routing graph.
+No experience with Kubernetes operators. I haven't used Terraform.
+"""
+
+@pytest.fixture(scope="module")
+def matcher():
+    return KeywordMatcher([Document(content=RESUME)])
+
+def confirmed(matcher, requirement):
+    confidence, _ = matcher.match(requirement)
+    return confidence == 1.0
+
+@pytest.mark.parametrize("requirement", [
+    "Bachelor's degree in Computer Science",
+    "Degree in Computer Science",
+    "Master's degree in Physics",
+    "Python",
+    # Through their synonyms
+    "Kubernetes",
+    "Postgres",
+    "CI/CD pipelines",
+])
+def test_requirements_met_in_one_span_are_confirmed(matcher, requirement):
+    assert confirmed(matcher, requirement)
+
+@pytest.mark.parametrize("requirement", [
+    # A lower degree level never confirms a higher one
+    "PhD in Computer Science",
+    "Master's degree in Computer Science",
+    "Bachelor's degree in Physics",
+    # Ordinary words are not the technologies they abbreviate
+    "Experience with Go",
+    "Node.js",
+    "Machine learning",
+])
+def test_looser_spellings_confirm_nothing(matcher, requirement):
+    assert not confirmed(matcher, requirement)
+
+def test_unambiguous_spellings_of_short_names_are_matched():
+    matcher = KeywordMatcher([Document(content="Backend services in Golang and Node.js, ML models in production")])
+
+    assert confirmed(matcher, "Experience with Go")
+    assert confirmed(matcher, "Node.js")
+    # An ambiguous abbreviation in the documents is not trusted either
+    assert not confirmed(matcher, "Machine learning")
+
+@pytest.mark.parametrize("requirement", ["Kubernetes operators", "Terraform"])
+def test_negated_spans_confirm_nothing(matcher, requirement):
+    assert not confirmed(matcher, requirement)
+
+@pytest.mark.parametrize("requirement", ["5+ years of Python", "3-5 years with PostgreSQL", "Two years of Python"])
+def test_requirements_with_a_quantity_are_never_confirmed(matcher, requirement):
+    assert matcher.match(requirement) == (0.0, matcher.keywords(requirement))
+
+def test_keywords_must_share_a_span(matcher):
+    confidence, missing = matcher.match("Python payments")
+
+    assert confidence == 0.5
+    assert len(missing) == 1
+
+def screen(requirement):
+    async def run():
+        cascade = AssessmentCascade([Document(content=RESUME)], [KEYWORD_TIER])
+        await cascade.prepare()
+        return await cascade.screen(requirement)
+
+    return asyncio.run(run())
+
+def test_keyword_tier_settles_confirmed_requirements():
+    assessment = screen("Python")
+
+    assert (assessment.present_in_documents, assessment.inquiry) == (True, None)
+
+@pytest.mark.parametrize("requirement", ["PhD in Computer Science", "Experience with Go", "Terraform", "5+ years of Python"])
+def test_keyword_tier_escalates_everything_else(requirement):
+    assert screen(requirement) is None
+
+def test_keyword_tier_confidence_is_configurable(monkeypatch):
+    monkeypatch.setenv("ASSESSMENT_KEYWORD_MIN_CONFIDENCE", "0.5")
+
+    assert screen("Python payments") is not None
@@ -0,0 +1,121 @@
+import random
+from haystack import Document
+from pipelines import estimate_tokens, pack_documents, tokens_saved
+from pipelines.document_normalizer import (
+    RAW_TOKENS_META_KEY,
+    TRUNCATION_MARKER,
+    NearDuplicateIndex,
+    clean_document,
+    dedupe_documents,
+)
+
+WORDS = "python docker kubernetes terraform billing payments team lead migrated designed built reduced latency service api cloud data pipeline streaming customers growth".split()
+
+def text(seed, words=120):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randrange(50)) for _ in range(words))
+
+def paragraphs(seed, count, words=40):
+    return "\n\n".join(text(seed * 100 + index, words) for index in range(count))
+
+def test_near_identical_texts_are_duplicates():
+    index = NearDuplicateIndex(0.85)
+    original = text(1, 300)
+    edited = original.replace(original.split()[150], "changed", 1)
+
+    assert index.add(original, "original") is None
+    assert index.add(edited) == "original"
+    assert index.add(text(2, 300)) is None
+
+def test_texts_without_words_are_never_duplicates():
+    index = NearDuplicateIndex(0.85)
+
+    assert index.add("") is None
+    assert index.add("  ") is None
+
+def test_same_resume_in_two_formats_is_kept_once():
+    resume = paragraphs(1, 5)
+    documents = [
+        Document(content=resume, meta={"file_path": "resume.pdf", RAW_TOKENS_META_KEY: 500}),
+        Document(content=resume.replace("\n\n", "\n\n\n"), meta={"file_path": "resume.docx", RAW_TOKENS_META_KEY: 400}),
+        Document(content=paragraphs(2, 3), meta={"file_path": "portfolio.pdf"}),
+    ]
+
+    deduped, duplicate_documents, _ = dedupe_documents(documents, 0.85)
+
+    assert [document.meta["file_path"] for document in deduped] == ["resume.pdf", "portfolio.pdf"]
+    assert duplicate_documents == 1
+    # The tokens of the dropped copy are still reported as saved
+    assert deduped[0].meta[RAW_TOKENS_META_KEY] == 900
+
+def test_repeated_paragraphs_are_dropped_across_documents():
+    shared = text(7, 40)
+    documents = [
+        Document(content=f"{text(3, 40)}\n\n{shared}"),
+        Document(content=f"{shared}\n\n{text(4, 40)}\n\nShort line\n\nShort line"),
+    ]
+
+    deduped, duplicate_documents, duplicate_paragraphs = dedupe_documents(documents, 0.85)
+
+    assert (duplicate_documents, duplicate_paragraphs) == (0, 1)
+    assert deduped[0].content.count(shared) == 1
+    assert shared not in deduped[1].content
+    # Paragraphs too short to compare are kept
+    assert deduped[1].content.count("Short line") == 2
+
+def test_documents_within_the_budget_are_unchanged():
+    documents = [Document(content=paragraphs(1, 2)), Document(content=paragraphs(2, 2))]
+
+    assert pack_documents(documents, 10 ** 6) is documents
+    assert pack_documents(documents, 0) is documents
+
+def test_budget_is_shared_fairly():
+    small = Document(content=paragraphs(1, 1), meta={"file_path": "cover.pdf"})
+    large = [Document(content=paragraphs(seed, 30), meta={"file_path": f"{seed}.pdf"}) for seed in (2, 3)]
+    budget = 2000
+
+    packed = pack_documents([large[0], small, large[1]], budget)
+
+    # The small document keeps all its text, the large ones split what it leaves
+    assert packed[1] is small
+    share = (budget - estimate_tokens(small.content)) // 2
+    for document in (packed[0], packed[2]):
+        assert document.meta["truncated"] is True
+        assert document.content.endswith(TRUNCATION_MARKER)
+        assert share * 0.8 <= estimate_tokens(document.content) <= share
+    assert sum(estimate_tokens(document.content) for document in packed) <= budget
+
+def test_truncation_keeps_the_top_of_the_document():
+    document = Document(content=paragraphs(5, 20), meta={"file_path": "resume.pdf"})
+
+    (packed,) = pack_documents([document], 300)
+
+    kept = packed.content[:-len(TRUNCATION_MARKER)].strip()
+    assert document.content.startswith(kept)
+    assert packed.meta["file_path"] == "resume.pdf"
+
+def test_tokens_saved_counts_from_the_raw_text():
+    document = Document(content=paragraphs(6, 20), meta={RAW_TOKENS_META_KEY: 5000})
+
+    (packed,) = pack_documents([document], 300)
+
+    assert tokens_saved([packed]) == 5000 - estimate_tokens(packed.content)
+
+def test_hyphenation_is_joined_unless_the_word_is_hyphenated_elsewhere():
+    content = "A self-motivated engineer who deve-\nloped a state-of-the-\nart self-\nmotivated team"
+
+    cleaned, _ = clean_document(Document(content=content))
+
+    assert "developed" in cleaned.content
+    assert "state-of-the-art" in cleaned.content
+    assert cleaned.content.count("self-motivated") == 2
+
+def test_repeated_headers_and_page_numbers_are_stripped():
+    pages = [f"Ana Lopez - Resume\n{text(page, 60)}\nmore text\n\nPage {page} of 3" for page in range(1, 4)]
+
+    cleaned, removed = clean_document(Document(content="\f".join(pages)))
+
+    assert cleaned.content.count("Ana Lopez - Resume") == 1
+    assert "Page" not in cleaned.content
+    assert removed == 5
+    assert cleaned.meta[RAW_TOKENS_META_KEY] == estimate_tokens("\f".join(pages))
@@ -0,0 +1,49 @@
+import json
+import random
+import pytest
+from haystack import Document
+from benchmarks.fake_openai import fake_reply, malform
+from exec import assessment_inputs, candidate_data_inputs, render_prompt
+from models import RequirementAssessment
+from pipelines import get_format_instructions, parse_reply
+from pipelines.metered_generator_component import _to_openai_message
+
+# Prompt builder component of each pipeline
+PROMPT_COMPONENTS = {"candidate_data": "candidate_prompt", "assessment": "assessment_prompt"}
+
+DOCUMENTS = [Document(content="Ana Lopez\nana@example.com\nEngineer - Acme (01/2020 - 02/2022)\nPython and Docker")]
+
+def answer(pipeline_name, inputs):
+    """Render the prompt of a service pipeline and answer it with the fake OpenAI API."""
+    _, messages, model_class = render_prompt(pipeline_name, PROMPT_COMPONENTS[pipeline_name], inputs)
+    return json.dumps(fake_reply([_to_openai_message(message) for message in messages])), model_class
+
+def test_candidate_data_reply_parses_into_candidate_data():
+    content, model_class = answer("candidate_data", candidate_data_inputs(DOCUMENTS))
+
+    candidate, outcome = parse_reply(content, model_class)
+
+    assert outcome == "direct"
+    assert (candidate.first_name, candidate.last_name, candidate.email) == ("Ana", "Lopez", "ana@example.com")
+    assert [(item.company, item.title) for item in candidate.experiences] == [("Acme", "Engineer")]
+
+@pytest.mark.parametrize("requirement, present", [("Docker experience", True), ("Kubernetes certification", False)])
+def test_assessment_reply_parses_into_an_assessment(requirement, present):
+    format_instructions = get_format_instructions(RequirementAssessment)
+    content, model_class = answer("assessment", assessment_inputs(DOCUMENTS, requirement, format_instructions))
+
+    assessment, outcome = parse_reply(content, model_class)
+
+    assert outcome == "direct"
+    assert assessment.requirement == requirement
+    assert assessment.present_in_documents is present
+    assert (assessment.inquiry is None) is present
+
+@pytest.mark.parametrize("seed", range(4))
+def test_malformed_replies_are_repaired_locally(seed):
+    content, model_class = answer("candidate_data", candidate_data_inputs(DOCUMENTS))
+
+    candidate, outcome = parse_reply(malform(content, random.Random(seed)), model_class)
+
+    assert outcome == "repaired"
+    assert candidate.first_name == "Ana"
@@ -0,0 +1,130 @@
+import asyncio
+import time
+import pytest
+from haystack import Document
+from jobs import worker as job_worker
+from jobs.store import JobFile, JobStore
+from models import CandidateData, RequirementAssessment
+
+REQUIREMENTS = ["Python", "Docker", "Kubernetes"]
+
+@pytest.fixture
+def store():
+    store = JobStore(":memory:", lease_seconds=0.2, max_attempts=2)
+    yield store
+    store.close()
+
+def submit(store, requirements=REQUIREMENTS, idempotency_key=None):
+    files = [JobFile(filename="resume.pdf", sha256="abc", content_type="application/pdf", data=b"%PDF")]
+    job, _ = store.submit({"job_requirements": requirements}, files, idempotency_key=idempotency_key)
+    return job
+
+def assessment(requirement):
+    return {"requirement": requirement, "present_in_documents": True, "inquiry": None}
+
+def test_jobs_are_claimed_once_in_submission_order(store):
+    first = submit(store)
+    second = submit(store)
+
+    claims = [store.claim("worker-1"), store.claim("worker-2"), store.claim("worker-3")]
+
+    assert [job.id for job in claims[:2]] == [first.id, second.id]
+    assert claims[2] is None
+    assert store.get(first.id).status == "running"
+    assert store.get(first.id).attempts == 1
+
+def test_idempotent_submission_returns_the_same_job(store):
+    first = submit(store, idempotency_key="key")
+    files = [JobFile(filename="resume.pdf", sha256="abc", content_type="application/pdf", data=b"%PDF")]
+
+    again, created = store.submit({"job_requirements": REQUIREMENTS}, files, idempotency_key="key")
+
+    assert (again.id, created) == (first.id, False)
+
+def test_expired_lease_is_claimed_again_with_its_results(store):
+    job = submit(store)
+    store.claim("worker-1")
+    store.save_assessment(job.id, "worker-1", 0, assessment("Python"))
+
+    assert store.claim("worker-2") is None
+    time.sleep(0.3)
+    reclaimed = store.claim("worker-2")
+
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+    assert reclaimed.assessments == {0: assessment("Python")}
+
+def test_renewed_lease_keeps_the_job(store):
+    job = submit(store)
+    store.claim("worker-1")
+
+    for _ in range(3):
+        time.sleep(0.1)
+        assert store.renew(job.id, "worker-1")
+
+    assert store.claim("worker-2") is None
+
+def test_job_abandoned_too_often_fails(store):
+    job = submit(store)
+    for owner in ("worker-1", "worker-2"):
+        assert store.claim(owner).id == job.id
+        time.sleep(0.3)
+
+    assert store.claim("worker-3") is None
+    assert store.get(job.id).status == "failed"
+    assert store.files(job.id) == []
+
+def test_worker_that_lost_its_lease_writes_nothing(store):
+    job = submit(store)
+    store.claim("worker-1")
+    time.sleep(0.3)
+    store.claim("worker-2")
+
+    assert not store.renew(job.id, "worker-1")
+    store.save_assessment(job.id, "worker-1", 1, assessment("stale"))
+    store.finish(job.id, "worker-1")
+
+    assert store.get(job.id).status == "running"
+    assert store.get(job.id).assessments == {}
+    assert len(store.files(job.id)) == 1
+
+def test_released_job_gets_its_attempt_back(store):
+    job = submit(store)
+    store.claim("worker-1")
+
+    store.release(job.id, "worker-1")
+
+    assert (store.get(job.id).status, store.get(job.id).attempts) == ("queued", 0)
+
+def test_resumed_job_skips_finished_requirements(store, monkeypatch):
+    assessed = []
+    extracted = []
+
+    async def iter_assessments(documents, requirements, bypass_cache=False):
+        for position, requirement in enumerate(requirements):
+            assessed.append(requirement)
+            yield position, RequirementAssessment(**assessment(requirement))
+
+    async def exec_candidate_data(documents, bypass_cache=False):
+        extracted.append(documents)
+        return CandidateData(first_name="Ana", last_name=None, email=None, phone=None, linkedin=None, experiences=[])
+
+    monkeypatch.setattr(job_worker, "iter_assessments", iter_assessments)
+    monkeypatch.setattr(job_worker, "exec_candidate_data", exec_candidate_data)
+    monkeypatch.setattr(job_worker, "exec_load_uploaded_documents", lambda uploads: [Document(content="resume")])
+
+    job = submit(store)
+    store.claim("worker-1")
+    store.save_candidate_data(job.id, "worker-1", {"first_name": "Ana"})
+    store.save_assessment(job.id, "worker-1", 1, assessment("Docker"))
+    time.sleep(0.3)
+
+    asyncio.run(job_worker.run_job(store, store.claim("worker-2"), "worker-2"))
+
+    finished = store.get(job.id)
+    assert assessed == ["Python", "Kubernetes"]
+    assert extracted == []
+    assert finished.status == "succeeded"
+    assert sorted(finished.assessments) == [0, 1, 2]
+    assert finished.assessments[2] == assessment("Kubernetes")
+    assert store.files(job.id) == []
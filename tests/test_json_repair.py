@@ -0,0 +1,89 @@
+import json
+import pytest
+from models import BatchRequirementAssessment, RequirementAssessment
+from pipelines import LLMParseError, parse_reply
+from pipelines.json_repair import JsonObjectCollector, coerce_to_schema, extract_json_object, repair_json
+
+def repaired(text):
+    return json.loads(repair_json(text))
+
+def test_valid_json_is_unchanged():
+    text = '{"requirement": "Python", "present_in_documents": true, "inquiry": null}'
+
+    assert repaired(text) == json.loads(text)
+
+@pytest.mark.parametrize("text, expected", [
+    # Cut in a string
+    ('{"requirement": "Python", "inquiry": "Can you', {"requirement": "Python", "inquiry": "Can you"}),
+    # Cut after a key
+    ('{"requirement": "Python", "inquiry":', {"requirement": "Python", "inquiry": None}),
+    # Cut in nested containers
+    ('{"assessments": [{"index": 0, "requirement": "a"}, {"index": 1', {"assessments": [{"index": 0, "requirement": "a"}, {"index": 1}]}),
+])
+def test_truncated_replies_are_closed(text, expected):
+    assert repaired(text) == expected
+
+def test_single_quotes_and_python_literals_are_converted():
+    text = "{'requirement': 'Python', 'present_in_documents': True, 'inquiry': None}"
+
+    assert repaired(text) == {"requirement": "Python", "present_in_documents": True, "inquiry": None}
+
+@pytest.mark.parametrize("text", [
+    '{"requirement": "Python", "present_in_documents": true,}',
+    '{"requirement": "Python",, "present_in_documents": true}',
+    '{"requirement": "Python" "present_in_documents": true}',
+])
+def test_trailing_doubled_and_missing_commas_are_fixed(text):
+    assert repaired(text) == {"requirement": "Python", "present_in_documents": True}
+
+def test_unquoted_keys_comments_and_inner_quotes_are_fixed():
+    text = '{requirement: "It\'s "fine"", // the requirement\n "present_in_documents": yes}'
+
+    assert repaired(text) == {"requirement": 'It\'s "fine"', "present_in_documents": "yes"}
+
+def test_object_is_extracted_from_prose_and_fences():
+    reply = 'Here you go:\n```json\n{"requirement": "a}b", "inquiry": {"nested": true}}\n```\nAnything else?'
+
+    assert extract_json_object(reply) == '{"requirement": "a}b", "inquiry": {"nested": true}}'
+
+def test_collector_finds_the_end_of_a_streamed_object():
+    collector = JsonObjectCollector()
+
+    completed = [collector.feed(part) for part in ['Sure:\n```json\n{"a": ', '"}"', ', "b": {}}', '\n```']]
+
+    assert completed == [False, False, True, True]
+    assert collector.object_text == '{"a": "}", "b": {}}'
+
+def test_values_are_coerced_to_the_field_types():
+    value = {"Requirement": "Python", "present in documents": "Yes."}
+
+    assert coerce_to_schema(value, RequirementAssessment) == {
+        "requirement": "Python", "present_in_documents": True, "inquiry": None
+    }
+
+@pytest.mark.parametrize("reply", [
+    '```json\n{"requirement": "Python", "present_in_documents": true, "inquiry": null}\n```',
+    "Sure! {'requirement': 'Python', 'present_in_documents': True, 'inquiry': None,}",
+    '{"requirement": "Python", "present_in_documents": "no", "inquiry": "Which versions of Python have you',
+])
+def test_malformed_replies_parse_into_the_model(reply):
+    assessment, _ = parse_reply(reply, RequirementAssessment)
+
+    assert assessment.requirement == "Python"
+
+def test_truncated_batch_keeps_the_complete_assessments():
+    reply = (
+        '{"assessments": [{"index": 0, "requirement": "Python", "present_in_documents": true, "inquiry": null}, '
+        '{"index": 1, "requirement": "Docker", "present_in_documents": false, "inquiry": "Have you used Doc'
+    )
+
+    batch, outcome = parse_reply(reply, BatchRequirementAssessment)
+
+    assert outcome == "repaired"
+    assert [item.requirement for item in batch.assessments] == ["Python", "Docker"]
+
+def test_reply_without_json_raises():
+    with pytest.raises(LLMParseError) as error:
+        parse_reply("I cannot assess this requirement.", RequirementAssessment)
+
+    assert error.value.reply == "I cannot assess this requirement."
@@ -0,0 +1,92 @@
+import asyncio
+from prometheus_client import REGISTRY
+from exec import run_in_executor
+from observability import ObservabilityMiddleware, current_span, record_llm_usage, record_stage, span, stage
+from observability.metrics import RequestTimings, start_request_timings, stop_request_timings
+from routes.metrics import get_metrics
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_server_timing_sums_repeated_stages():
+    timings = RequestTimings()
+    timings.add("conversion", 0.25)
+    timings.add("openai", 1.0)
+    timings.add("openai", 0.5)
+    timings.count("tokens_saved", 2048)
+
+    assert timings.server_timing() == 'conversion;dur=250.0, openai;dur=1500.0;desc="x2", tokens_saved;desc="2048"'
+
+def test_stages_are_recorded_in_the_histogram_and_the_current_request():
+    before = sample("ats_stage_duration_seconds_count", stage="test_stage")
+    timings, token = start_request_timings()
+    try:
+        with stage("test_stage"):
+            pass
+    finally:
+        stop_request_timings(token)
+    record_stage("test_stage", 0.1)
+
+    assert sample("ats_stage_duration_seconds_count", stage="test_stage") == before + 2
+    assert timings.server_timing().startswith("test_stage;dur=")
+
+def test_spans_of_tasks_and_executor_threads_link_to_their_request():
+    async def assess():
+        with span("assessment") as assessment_span:
+            pipeline_span = await run_in_executor(current_span)
+            return assessment_span, pipeline_span
+
+    async def run():
+        with span("request") as request_span:
+            results = await asyncio.gather(assess(), assess())
+        return request_span, results
+
+    request_span, results = asyncio.run(run())
+
+    for assessment_span, pipeline_span in results:
+        assert assessment_span.trace_id == request_span.trace_id
+        assert assessment_span.parent_id == request_span.span_id
+        assert pipeline_span is assessment_span
+    assert current_span() is None
+
+def test_llm_tokens_are_counted_by_kind():
+    before = sample("ats_llm_tokens_total", model="gpt-test", kind="cached")
+
+    record_llm_usage("gpt-test", {"prompt_tokens": 1500, "completion_tokens": 20, "prompt_tokens_details": {"cached_tokens": 1024}})
+
+    assert sample("ats_llm_tokens_total", model="gpt-test", kind="cached") == before + 1024
+
+def test_middleware_measures_requests_and_sends_server_timing(monkeypatch):
+    monkeypatch.setenv("SERVER_TIMING_HEADER", "true")
+    in_flight = []
+    sent = []
+
+    async def app(scope, receive, send):
+        in_flight.append(sample("ats_requests_in_flight", route="unmatched"))
+        record_stage("openai", 0.5)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    before = sample("ats_request_duration_seconds_count", method="GET", route="unmatched", status="200")
+    scope = {"type": "http", "method": "GET", "path": "/anything", "headers": []}
+    asyncio.run(ObservabilityMiddleware(app)(scope, receive, send))
+
+    headers = dict(sent[0]["headers"])
+    assert headers[b"server-timing"] == b"openai;dur=500.0"
+    assert in_flight == [1]
+    assert sample("ats_requests_in_flight", route="unmatched") == 0
+    assert sample("ats_request_duration_seconds_count", method="GET", route="unmatched", status="200") == before + 1
+
+def test_metrics_endpoint_exports_the_stages_and_service_stats():
+    record_stage("conversion", 0.2)
+
+    body = asyncio.run(get_metrics()).body.decode()
+
+    assert 'ats_stage_duration_seconds_count{stage="conversion"}' in body
+    assert "ats_admission_in_flight" in body
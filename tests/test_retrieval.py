@@ -0,0 +1,98 @@
+import asyncio
+import importlib
+import threading
+from haystack import Document
+from models import RequirementAssessment
+from pipelines import retrieval
+from pipelines.retrieval import RequirementRetriever
+
+# The package re-exports a function named like this module
+exec_assessment_module = importlib.import_module("exec.exec_assessment")
+
+DOCUMENTS = [Document(content=" ".join(f"python docker kubernetes terraform aws line{index}" for index in range(300)))]
+
+def test_relevant_chunks_are_retrieved_within_the_budget():
+    retriever = RequirementRetriever(DOCUMENTS, chunk_words=50, chunk_overlap=5)
+    try:
+        chunks = retriever.retrieve("line42 kubernetes", top_k=3, token_budget=200)
+    finally:
+        retriever.close()
+
+    assert 1 <= len(chunks) <= 3
+    assert any("line42" in chunk.content for chunk in chunks)
+
+def test_closed_index_is_emptied_and_reused():
+    first = RequirementRetriever(DOCUMENTS, chunk_words=50, chunk_overlap=5)
+    index = first.document_store.index
+    first.close()
+    first.close()
+
+    second = RequirementRetriever([Document(content="go rust")], chunk_words=50, chunk_overlap=5)
+    try:
+        assert second.document_store.index == index
+        assert [chunk.content for chunk in second.document_store.filter_documents()] == ["go rust"]
+    finally:
+        second.close()
+
+def test_index_is_released_after_the_retrievals_still_running():
+    retriever = RequirementRetriever(DOCUMENTS, chunk_words=50, chunk_overlap=5)
+    index = retriever.document_store.index
+    started, finish = threading.Event(), threading.Event()
+    run = retriever.retriever.run
+
+    def slow_run(**kwargs):
+        started.set()
+        finish.wait(5)
+        return run(**kwargs)
+
+    retriever.retriever.run = slow_run
+    results = []
+    thread = threading.Thread(target=lambda: results.append(retriever.retrieve("kubernetes", top_k=3, token_budget=200)))
+    thread.start()
+    started.wait(5)
+
+    retriever.close()
+    held = index not in retrieval._free_indexes and retriever.document_store.count_documents() > 0
+    finish.set()
+    thread.join(5)
+
+    assert held
+    assert results[0] is not DOCUMENTS
+    assert index in retrieval._free_indexes
+    assert retriever.document_store.count_documents() == 0
+    # A closed retriever falls back to the full documents
+    assert retriever.retrieve("kubernetes", top_k=3, token_budget=200) is DOCUMENTS
+
+def test_assessments_are_done_before_the_retriever_closes(monkeypatch):
+    monkeypatch.setenv("ASSESSMENT_RETRIEVAL", "true")
+    monkeypatch.setenv("ASSESSMENT_CASCADE", "")
+    running = set()
+    open_at_close = []
+
+    async def process_requirement(documents, requirement, *args, **kwargs):
+        running.add(requirement)
+        try:
+            await asyncio.sleep(0 if requirement == "fast" else 10)
+            return RequirementAssessment(requirement=requirement, present_in_documents=True, inquiry=None)
+        finally:
+            running.discard(requirement)
+
+    close = RequirementRetriever.close
+
+    def recording_close(self):
+        open_at_close.append(set(running))
+        close(self)
+
+    monkeypatch.setattr(exec_assessment_module, "process_requirement", process_requirement)
+    monkeypatch.setattr(RequirementRetriever, "close", recording_close)
+
+    async def run():
+        assessments = exec_assessment_module.iter_assessments(DOCUMENTS, ["fast", "slow", "slower"])
+        first = await assessments.__anext__()
+        await assessments.aclose()
+        return first
+
+    index, assessment = asyncio.run(run())
+
+    assert (index, assessment.requirement) == (0, "fast")
+    assert open_at_close == [set()]
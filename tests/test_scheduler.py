@@ -0,0 +1,143 @@
+import asyncio
+import types
+import openai
+import pytest
+from exec import scheduler as scheduler_module
+from exec.scheduler import ModelScheduler, Priority, Scheduler, TokenBucket
+from tests.fakes import FakeOpenAICall
+
+class Clock:
+    """A monotonic clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler_module, "time", types.SimpleNamespace(monotonic=clock))
+    return clock
+
+def model_scheduler(**overrides):
+    options = dict(rpm=0, tpm=0, min_concurrency=1, max_concurrency=32, initial_concurrency=32, latency_target=0)
+    return ModelScheduler("gpt-test", **{**options, **overrides})
+
+def test_bucket_starts_full(clock):
+    bucket = TokenBucket(60)
+
+    assert bucket.wait_time(60) == 0
+
+def test_bucket_refills_at_its_per_minute_rate(clock):
+    bucket = TokenBucket(60)
+    bucket.consume(60)
+
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.advance(30)
+    assert bucket.wait_time(30) == 0
+    assert bucket.wait_time(31) == pytest.approx(1.0)
+
+def test_bucket_never_holds_more_than_its_capacity(clock):
+    bucket = TokenBucket(60)
+    bucket.consume(60)
+    clock.advance(3600)
+    bucket.consume(60)
+
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+
+def test_amounts_over_capacity_only_wait_for_a_full_bucket(clock):
+    bucket = TokenBucket(60)
+    bucket.consume(30)
+
+    assert bucket.wait_time(600) == pytest.approx(30.0)
+
+def test_zero_rate_is_unlimited(clock):
+    bucket = TokenBucket(0)
+    bucket.consume(10 ** 6)
+
+    assert bucket.wait_time(10 ** 6) == 0
+
+def test_429_halves_the_concurrency_limit_once_per_window(clock):
+    scheduler = model_scheduler()
+    scheduler.in_flight = 3
+
+    scheduler.release(throttled=True)
+    # Calls sent before the cut report the same congestion
+    scheduler.release(throttled=True)
+    assert scheduler.limit == 16
+
+    clock.advance(1.5)
+    scheduler.release(throttled=True)
+    assert scheduler.limit == 8
+
+def test_limit_never_drops_below_the_minimum(clock):
+    scheduler = model_scheduler(min_concurrency=4, initial_concurrency=5)
+    scheduler.in_flight = 1
+
+    scheduler.release(throttled=True)
+
+    assert scheduler.limit == 4
+
+def test_success_grows_the_limit_by_one_per_window(clock):
+    scheduler = model_scheduler(initial_concurrency=4)
+    scheduler.in_flight = 4
+
+    for _ in range(4):
+        scheduler.release(latency=0.1)
+
+    assert scheduler.limit == pytest.approx(5, abs=0.1)
+
+def test_slow_calls_count_as_congestion(clock):
+    scheduler = model_scheduler(initial_concurrency=8, latency_target=2)
+    scheduler.in_flight = 1
+
+    scheduler.release(latency=3)
+
+    assert scheduler.limit == 4
+    assert scheduler.stats()["slow"] == 1
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setenv("OPENAI_RETRY_BASE_DELAY", "0")
+    monkeypatch.setenv("OPENAI_MAX_CONCURRENCY", "8")
+
+def test_rate_limited_call_is_retried_with_a_halved_limit(no_backoff):
+    scheduler = Scheduler()
+    call = FakeOpenAICall(reply="assessment", rate_limits=1, retry_after=0)
+
+    result = asyncio.run(scheduler.run("gpt-test", 100, Priority.ASSESSMENT, call))
+
+    stats = scheduler.stats()["gpt-test"]
+    assert result == "assessment"
+    assert call.calls == 2
+    assert (stats["throttled"], stats["retries"], stats["errors"]) == (1, 1, 0)
+    assert stats["in_flight"] == 0
+    assert stats["concurrency_limit"] < 8
+
+def test_call_fails_once_out_of_retries(no_backoff, monkeypatch):
+    monkeypatch.setenv("OPENAI_MAX_RETRIES", "2")
+    scheduler = Scheduler()
+    call = FakeOpenAICall(rate_limits=10, retry_after=0)
+
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(scheduler.run("gpt-test", 100, Priority.ASSESSMENT, call))
+
+    stats = scheduler.stats()["gpt-test"]
+    assert call.calls == 3
+    assert (stats["retries"], stats["errors"], stats["in_flight"]) == (2, 1, 0)
+
+def test_retry_after_is_honoured(no_backoff):
+    async def run():
+        scheduler = Scheduler()
+        call = FakeOpenAICall(rate_limits=1, retry_after=0.3)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await scheduler.run("gpt-test", 100, Priority.ASSESSMENT, call)
+        return loop.time() - started
+
+    assert asyncio.run(run()) >= 0.3
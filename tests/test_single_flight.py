@@ -0,0 +1,86 @@
+import asyncio
+import openai
+import pytest
+from exec import SingleFlight
+from tests.fakes import FakeOpenAICall
+
+async def settle():
+    """Let the tasks started so far run until they block."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+def test_identical_calls_share_one_computation():
+    async def run():
+        flight = SingleFlight("test")
+        call = FakeOpenAICall(reply="shared", delay=0.05)
+        results = await asyncio.gather(*(flight.run("prompt", call) for _ in range(3)))
+        return flight, call, results
+
+    flight, call, results = asyncio.run(run())
+
+    assert results == ["shared"] * 3
+    assert call.calls == 1
+    assert flight.stats() == {"leaders": 1, "followers": 2, "in_flight": 0}
+
+def test_computation_survives_its_leader_leaving():
+    async def run():
+        flight = SingleFlight("test")
+        call = FakeOpenAICall(reply="shared", delay=0.05)
+        leader = asyncio.ensure_future(flight.run("prompt", call))
+        follower = asyncio.ensure_future(flight.run("prompt", call))
+        await settle()
+        leader.cancel()
+        return call, await follower
+
+    call, result = asyncio.run(run())
+
+    assert result == "shared"
+    assert (call.calls, call.cancelled) == (1, 0)
+
+def test_computation_is_cancelled_when_the_last_waiter_leaves():
+    async def run():
+        flight = SingleFlight("test")
+        call = FakeOpenAICall(delay=10)
+        waiters = [asyncio.ensure_future(flight.run("prompt", call)) for _ in range(2)]
+        await settle()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await settle()
+        return flight, call
+
+    flight, call = asyncio.run(run())
+
+    assert (call.calls, call.cancelled) == (1, 1)
+    assert flight.stats()["in_flight"] == 0
+
+def test_every_waiter_gets_the_error():
+    async def run():
+        flight = SingleFlight("test")
+        call = FakeOpenAICall(rate_limits=1, delay=0.01)
+        return await asyncio.gather(*(flight.run("prompt", call) for _ in range(2)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+
+    assert isinstance(errors[0], openai.RateLimitError)
+    assert errors[0] is errors[1]
+
+def test_finished_computation_is_not_reused():
+    async def run():
+        flight = SingleFlight("test")
+        call = FakeOpenAICall()
+        await flight.run("prompt", call)
+        await flight.run("prompt", call)
+        return call
+
+    assert asyncio.run(run()).calls == 2
+
+@pytest.mark.parametrize("enabled, calls", [(True, 1), (False, 2)])
+def test_disabled_flight_runs_every_call(enabled, calls):
+    async def run():
+        flight = SingleFlight("test", enabled=enabled)
+        call = FakeOpenAICall(delay=0.01)
+        await asyncio.gather(flight.run("prompt", call), flight.run("prompt", call))
+        return call
+
+    assert asyncio.run(run()).calls == calls
@@ -0,0 +1,113 @@
+import importlib
+import types
+import pytest
+from haystack import Document
+from cache import TieredCache
+from cache.document_cache import cache_documents, get_cached_documents, hash_file
+
+# The package re-exports objects named like these modules
+document_cache_module = importlib.import_module("cache.document_cache")
+tiered_cache_module = importlib.import_module("cache.tiered_cache")
+
+class Clock:
+    """A wall clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tiered_cache_module, "time", types.SimpleNamespace(time=clock))
+    return clock
+
+@pytest.fixture(params=["memory", "disk"])
+def tier(request, tmp_path):
+    """Path of the disk tier, None to test the memory tier alone."""
+    return str(tmp_path / "cache.sqlite") if request.param == "disk" else None
+
+def test_entries_expire_after_the_ttl(clock, tier):
+    cache = TieredCache("test", ttl=60, path=tier)
+    cache.put("key", "value")
+
+    clock.advance(59)
+    assert cache.get("key") == "value"
+    clock.advance(2)
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+def test_zero_ttl_never_expires(clock):
+    cache = TieredCache("test", ttl=0)
+    cache.put("key", "value")
+
+    clock.advance(10 ** 9)
+
+    assert cache.get("key") == "value"
+
+def test_least_recently_used_entry_is_evicted_by_count(clock):
+    cache = TieredCache("test", max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+
+    cache.put("c", "3")
+
+    assert [cache.get(key) for key in ("a", "b", "c")] == ["1", None, "3"]
+    assert cache.stats()["evictions"] == 1
+
+def test_entries_are_evicted_by_size(clock):
+    cache = TieredCache("test", max_bytes=10)
+    cache.put("a", "x" * 4)
+    cache.put("b", "x" * 4)
+
+    cache.put("c", "x" * 4)
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 8
+
+def test_value_larger_than_the_cache_is_not_stored(clock):
+    cache = TieredCache("test", max_bytes=10)
+    cache.put("a", "x" * 4)
+
+    cache.put("big", "x" * 11)
+
+    assert cache.get("big") is None
+    assert cache.get("a") == "x" * 4
+
+def test_disk_tier_evicts_the_least_recently_accessed_by_size(clock, tmp_path):
+    cache = TieredCache("test", max_entries=1, max_bytes=10, path=str(tmp_path / "cache.sqlite"))
+    for key in ("a", "b"):
+        clock.advance(1)
+        cache.put(key, "x" * 4)
+    clock.advance(1)
+    cache.get("a")
+
+    clock.advance(1)
+    cache.put("c", "x" * 4)
+    reopened = TieredCache("test", max_bytes=10, path=str(tmp_path / "cache.sqlite"))
+
+    assert [reopened.get(key) for key in ("a", "b", "c")] == ["x" * 4, None, "x" * 4]
+
+def test_disk_hits_are_promoted_to_memory(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    TieredCache("test", path=path).put("key", "value")
+    cache = TieredCache("test", path=path)
+
+    assert (cache.get("key"), cache.get("key")) == ("value", "value")
+    assert (cache.stats()["disk_hits"], cache.stats()["memory_hits"]) == (1, 1)
+
+def test_cached_documents_carry_the_filename_of_the_current_upload(monkeypatch):
+    monkeypatch.setattr(document_cache_module, "document_cache", TieredCache("documents"))
+    file_hash = hash_file(b"%PDF resume")
+    cache_documents(file_hash, [Document(content="resume", meta={"file_path": "alice.pdf", "page_count": 2})])
+
+    (document,) = get_cached_documents(file_hash, {"file_path": "bob.pdf"})
+
+    assert document.meta == {"file_path": "bob.pdf", "page_count": 2}
+    assert "alice" not in document_cache_module.document_cache.get(file_hash)
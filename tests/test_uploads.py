@@ -0,0 +1,100 @@
+import asyncio
+import os
+from typing import List
+import httpx
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from starlette.formparsers import MultiPartParser
+from routes.uploads import UploadLimitMiddleware, read_uploads
+
+def create_app():
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware)
+    received = []
+
+    @app.post("/upload")
+    async def upload(files: List[UploadFile] = File(...)):
+        # Whether Starlette spooled each file to disk while parsing the form
+        spooled = [file.file._rolled for file in files]
+        uploads = await read_uploads(files)
+        received.extend(uploads)
+        return {"sizes": [upload.size for upload in uploads], "spooled": spooled}
+
+    return app, received
+
+def post(app, **request):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/upload", **request)
+
+    return asyncio.run(run())
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setenv("MAX_REQUEST_BYTES", str(64 * 1024))
+    monkeypatch.setenv("MAX_UPLOAD_BYTES", str(16 * 1024))
+
+def test_uploads_within_the_limits_are_read(limits):
+    app, received = create_app()
+
+    response = post(app, files=[("files", ("a.pdf", b"a" * 1000)), ("files", ("b.pdf", b"b" * 2000))])
+
+    assert response.status_code == 200
+    assert response.json()["sizes"] == [1000, 2000]
+    assert [upload.filename for upload in received] == ["a.pdf", "b.pdf"]
+
+def test_content_length_over_the_limit_is_rejected_before_the_body_is_read(limits):
+    app, received = create_app()
+    chunks_read = []
+
+    async def body():
+        for _ in range(100):
+            chunks_read.append(1)
+            yield b"x" * 1024
+
+    response = post(app, content=body(), headers={"Content-Length": str(100 * 1024), "Content-Type": "multipart/form-data; boundary=x"})
+
+    assert response.status_code == 413
+    assert received == []
+    assert len(chunks_read) <= 1
+
+def test_streamed_body_crossing_the_limit_is_cut(limits):
+    app, received = create_app()
+    chunks_read = []
+    preamble = b'--x\r\nContent-Disposition: form-data; name="files"; filename="big.pdf"\r\nContent-Type: application/pdf\r\n\r\n'
+
+    async def body():
+        yield preamble
+        for _ in range(1000):
+            chunks_read.append(1)
+            yield b"x" * 1024
+        yield b"\r\n--x--\r\n"
+
+    # No Content-Length: the body is chunked, and only its bytes tell it is too large
+    response = post(app, content=body(), headers={"Content-Type": "multipart/form-data; boundary=x"})
+
+    assert response.status_code == 413
+    assert received == []
+    assert len(chunks_read) < 100
+
+def test_file_over_the_upload_limit_is_rejected(limits):
+    app, received = create_app()
+
+    response = post(app, files=[("files", ("small.pdf", b"a" * 1000)), ("files", ("big.pdf", b"b" * 20 * 1024))])
+
+    assert response.status_code == 413
+    assert "big.pdf" in response.json()["detail"]
+    assert received == []
+
+def test_spill_threshold_comes_from_the_environment():
+    assert MultiPartParser.max_file_size == int(os.getenv("UPLOAD_SPILL_BYTES", str(8 * 1024 * 1024)))
+
+def test_files_under_the_spill_threshold_stay_in_memory(limits, monkeypatch):
+    monkeypatch.setattr(MultiPartParser, "max_file_size", 12 * 1024)
+    app, _ = create_app()
+
+    response = post(app, files=[("files", ("resume.pdf", b"a" * 10 * 1024)), ("files", ("scan.pdf", b"b" * 14 * 1024))])
+
+    assert response.status_code == 200
+    assert response.json()["spooled"] == [False, True]